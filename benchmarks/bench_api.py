@@ -0,0 +1,226 @@
+"""Benchmark the functions of BAMapi.api against a local stand-in server.
+
+Usage:
+    python benchmarks/bench_api.py [--requests 200] [--workers 8] [--latency 0.005]
+                                   [--rows 100] [--p204 0] [--p401 0] [--p429 0]
+                                   [--modes sequential,threaded,async]
+                                   [--output results.json] [--baseline previous.json]
+
+Each function is called `requests` times (one call per business day of 2023) in each mode:
+sequentially, from a pool of `workers` threads, and concurrently on an event loop through
+AsyncBAMClient (requires httpx). The throughput (requests per second), the latency percentiles
+and the peak memory allocated (tracemalloc) of each run are printed and saved as JSON. In the
+async mode, the latency of a call includes the time spent waiting for a free concurrency slot.
+
+Given the results of a previous run (--baseline), the script exits with status 1 if the
+throughput of any run dropped by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from server import StandInServer
+
+from BAMapi import api
+from BAMapi.client import BAMClient, set_default_client
+from BAMapi.metrics import QUANTILES, _quantile
+from BAMapi.utils import _business_days
+
+
+DAYS = _business_days("2023-01-02", "2023-12-29")
+
+KEYS = {
+    "marche_adjud_des_BT": "bench-key",
+    "marche_des_changes": "bench-key",
+    "marche_obligataire": "bench-key",
+}
+
+# The arguments of each benchmarked function, for the i-th call.
+FUNCTIONS: Dict[str, Callable[[int], Tuple]] = {
+    "cours_BBE": lambda i: ("EUR", DAYS[i % len(DAYS)]),
+    "cours_virement": lambda i: ("EUR", DAYS[i % len(DAYS)]),
+    "courbe_BDT": lambda i: (DAYS[i % len(DAYS)],),
+    "resultat_oprts_politique_monetaire": lambda i: ("2023-01-02", DAYS[i % len(DAYS)]),
+    "resultats_emissions_BT": lambda i: (DAYS[i % len(DAYS)],),
+    "resultats_oprts_echange_BT": lambda i: (DAYS[i % len(DAYS)],),
+}
+
+MODES = ("sequential", "threaded", "async")
+
+
+def _timed(call: Callable[[], Any], errors: Dict[str, int]) -> float:
+    started = time.perf_counter()
+    try:
+        call()
+    except Exception as e:
+        errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+    return time.perf_counter() - started
+
+
+async def _timed_async(call: Callable[[], Any], errors: Dict[str, int]) -> float:
+    started = time.perf_counter()
+    try:
+        await call()
+    except Exception as e:
+        errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+    return time.perf_counter() - started
+
+
+def _run(name: str, mode: str, n: int, workers: int, base_url: str) -> Tuple[List[float], Dict]:
+    """Call a function n times in a mode, and return the latencies and the errors."""
+    errors: Dict[str, int] = {}
+    arguments = FUNCTIONS[name]
+
+    if mode == "async":
+        from BAMapi.aio import AsyncBAMClient
+
+        async def main() -> List[float]:
+            async with AsyncBAMClient(
+                keys=KEYS, concurrency=workers, coalesce=False, base_url=base_url
+            ) as client:
+                method = getattr(client, name)
+                return await asyncio.gather(
+                    *(_timed_async(lambda i=i: method(*arguments(i)), errors) for i in range(n))
+                )
+
+        return list(asyncio.run(main())), errors
+
+    function = getattr(api, name)
+    calls = [lambda i=i: function(*arguments(i)) for i in range(n)]
+
+    if mode == "sequential":
+        return [_timed(call, errors) for call in calls], errors
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda call: _timed(call, errors), calls)), errors
+
+
+def benchmark(name: str, mode: str, args: argparse.Namespace, base_url: str) -> Dict:
+    started = time.perf_counter()
+    latencies, errors = _run(name, mode, args.requests, args.workers, base_url)
+    seconds = time.perf_counter() - started
+
+    # A second, shorter run measures the memory, as tracemalloc slows the calls down.
+    tracemalloc.start()
+    _run(name, mode, min(args.requests, 50), args.workers, base_url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "function": name,
+        "mode": mode,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "rps": len(latencies) / seconds,
+        "latency": {
+            **{f"p{round(q * 100)}": _quantile(ordered, q) for q in QUANTILES},
+            "mean": mean(ordered),
+            "max": ordered[-1],
+        },
+        "peak_memory_bytes": peak,
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Return the runs whose throughput dropped by more than `tolerance` since the baseline."""
+    previous = {(run["function"], run["mode"]): run["rps"] for run in baseline["results"]}
+
+    regressions = []
+    for run in results:
+        before = previous.get((run["function"], run["mode"]))
+        if before and run["rps"] < before * (1 - tolerance):
+            regressions.append(
+                f"{run['function']} ({run['mode']}): {before:.0f} -> {run['rps']:.0f} req/s"
+            )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--p204", type=float, default=0.0)
+    parser.add_argument("--p401", type=float, default=0.0)
+    parser.add_argument("--p429", type=float, default=0.0)
+    parser.add_argument("--functions", default=",".join(FUNCTIONS))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    if "async" in modes:
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            print("httpx is not installed: skipping the async mode")
+            modes.remove("async")
+
+    results = []
+    with StandInServer(args.latency, args.rows, args.p204, args.p401, args.p429) as server:
+        set_default_client(
+            BAMClient(
+                keys=KEYS,
+                pool_maxsize=args.workers,
+                coalesce=False,
+                base_url=server.url,
+            )
+        )
+
+        for name in args.functions.split(","):
+            for mode in modes:
+                run = benchmark(name, mode, args, server.url)
+                results.append(run)
+
+                latency = run["latency"]
+                print(
+                    f"{name:>36} {mode:>10}: {run['rps']:8.0f} req/s   "
+                    f"p50 {latency['p50'] * 1e3:6.1f} ms   p99 {latency['p99'] * 1e3:6.1f} ms   "
+                    f"peak {run['peak_memory_bytes'] / 1e6:6.1f} MB"
+                    + (f"   errors {run['errors']}" if run["errors"] else "")
+                )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "arguments": {
+                key: str(value) if isinstance(value, Path) else value
+                for key, value in vars(args).items()
+            },
+        },
+        "results": results,
+    }
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results saved to {args.output}")
+
+    if args.baseline is not None:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the JSON decoders of BAMapi.decoders on recorded payloads.
+
+Usage:
+    python benchmarks/bench_decoders.py [--repeat 20] [--scale 1000]
+
+The recorded payload (tests/samples/sample_cours_bbe.json) is replicated `scale` times to
+mimic a bulk pull, then decoded with each installed backend, both into dictionaries and
+into typed records.
+"""
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from BAMapi.decoders import BACKENDS, decode_records, get_decoder
+from BAMapi.records import FXRate
+
+
+SAMPLE = Path(__file__).parents[1] / "tests" / "samples" / "sample_cours_bbe.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = json.loads(SAMPLE.read_bytes()) * args.scale
+    payload = json.dumps(rows).encode()
+
+    print(f"payload: {len(rows)} rows, {len(payload) / 1e6:.1f} MB")
+
+    timings = {}
+    for backend in BACKENDS:
+        try:
+            decoder = get_decoder(backend)
+        except ImportError:
+            print(f"{backend:>8}: not installed")
+            continue
+
+        raw = min(timeit.repeat(lambda: decoder(payload), number=1, repeat=args.repeat))
+        typed = min(
+            timeit.repeat(
+                lambda: decode_records(payload, FXRate, decoder),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        timings[backend] = raw
+
+        print(f"{backend:>8}: {raw * 1e3:8.2f} ms (dicts)   {typed * 1e3:8.2f} ms (records)")
+
+    for backend, raw in timings.items():
+        if backend != "json":
+            print(f"{backend} speed-up over json: x{timings['json'] / raw:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Local stand-in for BAM's API, serving recorded payloads for every endpoint of BAMapi.constants.API.
+
+Usage:
+    python benchmarks/server.py [--port 8080] [--latency 0.02] [--rows 500] [--p429 0.05]
+
+    >>> with StandInServer(latency=0.01, p429=0.05) as server:
+    ...     client = BAMClient(base_url=server.url)
+
+The responses of cours_BBE are the recorded sample of tests/samples; the other endpoints serve
+the responses documented in BAMapi.api. The number of rows of each payload can be scaled, and
+a share of the requests can be answered with a 204, 401 or 429 status code.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from BAMapi.constants import API
+
+
+SAMPLE = Path(__file__).parents[1] / "tests" / "samples" / "sample_cours_bbe.json"
+
+# The responses documented in BAMapi.api, for the endpoints without a recorded sample.
+PAYLOADS: Dict[str, List[Dict]] = {
+    "cours_virement": [
+        {"date": "2023-05-11T12:30:00", "libDevise": "EUR", "moyen": 10.9884, "uniteDevise": 1},
+        {"date": "2023-05-11T12:30:00", "libDevise": "CAD", "moyen": 7.5001, "uniteDevise": 1},
+        {"date": "2023-05-11T12:30:00", "libDevise": "USD", "moyen": 10.0319, "uniteDevise": 1},
+    ],
+    "courbe_BDT": [
+        {
+            "dateEcheance": "2046-02-19",
+            "dateValeur": "2018-12-28",
+            "dateCourbe": "2019-01-02",
+            "tmp": 4.326,
+            "volume": 195.25,
+        },
+        {
+            "dateEcheance": "2036-12-04",
+            "dateValeur": "2018-12-31",
+            "dateCourbe": "2019-01-02",
+            "tmp": 3.762,
+            "volume": 32.95,
+        },
+        {
+            "dateEcheance": "2033-07-18",
+            "dateValeur": "2018-12-27",
+            "dateCourbe": "2019-01-02",
+            "tmp": 3.704,
+            "volume": 155.11,
+        },
+    ],
+    "oprts_de_PM": [
+        {
+            "dateAdjudication": "2023-01-04",
+            "dateValeur": "2023-01-05",
+            "dateEcheance": "2023-01-12",
+            "instrument": "avances à 7 jours",
+            "mntDemande": 56990.0,
+            "mntServi": 56990.0,
+            "taux": 2.5,
+        }
+    ],
+    "emissions_de_BT": [
+        {
+            "dateReglement": "2022-04-04T00:00:00",
+            "maturite": "2 ans",
+            "caracteristique": "16/09/2024,1.85",
+            "mntPropose": 1560.0,
+            "tauxPrixMin": 99.62,
+            "tauxPrixMax": 99.92,
+            "mntAdjuge": 0.0,
+            "tauxPrixlimite": 0.0,
+            "tauxPrixMoyenPondere": 0.0,
+        }
+    ],
+    "oprts_rachat_de_BT": [],
+    "oprts_echange_de_BT": [
+        {
+            "maturite": "5 ans",
+            "dateReglement": "2023-04-25T00:00:00",
+            "dateEcheance": "2024-04-15T00:00:00",
+            "tauxNominal": 2.85,
+            "mntPropose": 855.0,
+            "mntRetenu": 855.0,
+            "maturiteRemp": "2 ans",
+            "dateEcheanceRemp": "2025-09-15T00:00:00",
+            "tauxNominallRemp": 3.9,
+            "prixMin": 99.74,
+            "prixMax": 99.75,
+            "mntRetenuRemp": 852.3,
+            "pmp": 100.42,
+        }
+    ],
+}
+
+
+def _payloads(rows: Optional[int]) -> Dict[str, bytes]:
+    """Encode the payload of each endpoint, repeating its records up to `rows` records."""
+    records = dict(PAYLOADS, cours_BBE=json.loads(SAMPLE.read_bytes()))
+
+    payloads = {}
+    for endpoint, url in API.items():
+        body = records[endpoint]
+        if rows is not None and body:
+            body = list(islice(cycle(body), rows))
+
+        payloads[urlsplit(url).path] = json.dumps(body, ensure_ascii=False).encode()
+
+    return payloads
+
+
+class StandInServer:
+    """Threaded HTTP server mimicking the endpoints of BAM's API.
+
+    Args:
+        latency:
+          The number of seconds waited before answering each request. The default value is 0.
+
+        rows:
+          The number of records of each payload. The default value is None (the recorded payloads).
+
+        p204, p401, p429:
+          The share of the requests answered with a 204 (No Content), 401 (invalid key) or
+          429 (rate limit exceeded) status code. The default values are 0.
+
+        seed:
+          The seed of the draws of the injected status codes. The default value is 0.
+
+        host, port:
+          The address of the server. The default port (0) is any free port.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rows: Optional[int] = None,
+        p204: float = 0.0,
+        p401: float = 0.0,
+        p429: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.p204 = p204
+        self.p401 = p401
+        self.p429 = p429
+        self.payloads = _payloads(rows)
+        self.statuses: Counter = Counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server, to be given to BAMClient(base_url=...)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _draw(self) -> int:
+        with self._lock:
+            draw = self._random.random()
+
+        if draw < self.p401:
+            return 401
+        if draw < self.p401 + self.p429:
+            return 429
+        if draw < self.p401 + self.p429 + self.p204:
+            return 204
+        return 200
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # The headers and the body are written separately: without TCP_NODELAY, the body
+            # would wait for the delayed ACK of the client.
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                path = urlsplit(self.path).path
+                body = server.payloads.get(path)
+
+                if body is None:
+                    status = 404
+                elif not self.headers.get("Ocp-Apim-Subscription-Key"):
+                    status = 401
+                else:
+                    status = server._draw()
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if status == 401:
+                    body = b'{"statusCode": 401, "message": "Access denied due to invalid subscription key."}'
+                elif status == 429:
+                    body = b'{"statusCode": 429, "message": "Rate limit is exceeded. Try again in 0 seconds."}'
+                elif status in (204, 404):
+                    body = b""
+
+                with server._lock:
+                    server.statuses[status] += 1
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "StandInServer":
+        """Serve the requests from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve the requests from the current thread, until it is interrupted (Ctrl+C)."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--p204", type=float, default=0.0)
+    parser.add_argument("--p401", type=float, default=0.0)
+    parser.add_argument("--p429", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.latency, args.rows, args.p204, args.p401, args.p429, port=args.port
+    )
+    print(f"Serving BAM's API on {server.url}")
+
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,45 @@ from BAMapi.api import (
     _base_foreign_exchange_rates,
     cours_BBE,
     cours_virement,
+    cours_BBE_range,
+    cours_virement_range,
+    poll_cours_BBE,
+    poll_cours_virement,
+    cours_BBE_converter,
+    cours_virement_converter,
     courbe_BDT,
+    courbe_BDT_curve,
+    courbe_BDT_panel,
     resultat_oprts_politique_monetaire,
+    resultat_oprts_politique_monetaire_chunked,
+    iter_resultat_oprts_politique_monetaire,
     resultats_emissions_BT,
     resultats_oprts_echange_BT,
 )
 
+from BAMapi.aio import AsyncBAMClient
+from BAMapi.cache import MemoryCache, SQLiteCache, TieredCache
+from BAMapi.columnar import ColumnarResult
+from BAMapi.fx import FXConverter
+from BAMapi.decoders import get_decoder, decode_records
+from BAMapi.client import BAMClient, get_default_client, set_default_client
+from BAMapi.conditional import PollResult, Validators
 from BAMapi.constants import INSTRUMENTS, API
+from BAMapi.curve import BDTCurve, BDTPanel
+from BAMapi.keypool import KeyPool
+from BAMapi.metrics import MetricsAggregator, RequestEvent
+from BAMapi.records import (
+    FXRate,
+    BDTPoint,
+    PMOperation,
+    BTIssuance,
+    BTExchange,
+    RECORD_TYPES,
+    to_records,
+)
+from BAMapi.prefetch import Prefetcher
+from BAMapi.ratelimit import RateLimiter, TokenBucket
+from BAMapi.snapshot import FXSnapshots
+from BAMapi.store import SyncStore
+from BAMapi.transport import RecordingTransport, ReplayTransport
 from BAMapi.exceptions import *
@@ -0,0 +1,315 @@
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Union
+
+from BAMapi.cache import _normalize_querystring
+from BAMapi.constants import API
+from BAMapi.decoders import DecoderT, get_decoder
+from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
+from BAMapi.keypool import KeyPool, _as_keys, _freeze_keys, _stored_keys
+from BAMapi.ratelimit import RateLimiter, _backoff_delay
+from BAMapi.singleflight import AsyncSingleFlight
+from BAMapi.utils import (
+    _check_bam_response,
+    _rebase_url,
+    _foreign_exchange_rates_querystring,
+    _courbe_BDT_querystring,
+    _oprts_politique_monetaire_querystring,
+    _emissions_BT_querystring,
+    _oprts_echange_BT_querystring,
+)
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+RETRUNED_T = List[Dict]
+
+
+class AsyncBAMClient:
+    """Asyncio client exposing awaitable equivalents of the BAMapi.api functions.
+
+    All the requests sent by a client share one httpx connection pool, and at most
+    `concurrency` of them are in flight at the same time, which allows an event loop
+    to fan out hundreds of calls with asyncio.gather:
+
+        >>> async with AsyncBAMClient(concurrency=20) as client:
+        ...     rates = await asyncio.gather(
+        ...         *(client.cours_BBE("EUR", date) for date in dates)
+        ...     )
+
+    The httpx package is required: pip install httpx.
+
+    Args:
+        keys:
+          A mapping of the API key of each service (refer to BAMapi.set_api_keys), or of a sequence
+          of its keys, such as (primary, secondary). If no mapping is provided, the keys stored by
+          BAMapi.set_api_keys are used.
+
+        max_connections:
+          The maximum number of connections of the pool. The default value is 100.
+
+        max_keepalive_connections:
+          The maximum number of idle connections kept alive. The default value is 20.
+
+        concurrency:
+          The maximum number of concurrent requests. The default value is 10.
+
+        timeout:
+          The timeout (in seconds) of each GET request. The default value is 10.
+
+        rate_limiter:
+          An optional BAMapi.ratelimit.RateLimiter, which paces the requests sent with each
+          subscription key. The default value is None.
+
+        max_retries:
+          The number of times a request is retried after exceeding the rate limit (status code 429)
+          before RateLimitExceededError is raised. The default value is 3.
+
+        backoff_factor:
+          The base delay (in seconds) of the jittered exponential backoff between retries, used when
+          the API does not tell how long to wait. The default value is 0.5.
+
+        coalesce:
+          Whether identical requests (same url, subscription key and query string) awaited concurrently
+          are coalesced into a single request, whose response is shared by all the callers.
+          The default value is True.
+
+        decoder:
+          The JSON decoder of the responses: the name of a backend of BAMapi.decoders ("orjson",
+          "msgspec" or "json") or a function decoding bytes. If no decoder is provided, the fastest
+          installed backend is used.
+
+        key_pool:
+          The BAMapi.keypool.KeyPool spreading the requests over the keys of each service, and
+          taking a failing key out of the rotation. The default value is KeyPool().
+
+        base_url:
+          An optional URL replacing https://api.centralbankofmorocco.ma/ in the requests, such as the
+          one of a local stand-in server (refer to benchmarks/server.py). The default value is None.
+
+    Raise:
+        ImportError: httpx is not installed.
+    """
+
+    def __init__(
+        self,
+        keys: Optional[Mapping[str, Union[str, Sequence[str]]]] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        concurrency: int = 10,
+        timeout: float = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        coalesce: bool = True,
+        decoder: Union[str, DecoderT, None] = None,
+        key_pool: Optional[KeyPool] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError(
+                "AsyncBAMClient requires the httpx package. Please install it with: pip install httpx"
+            ) from e
+
+        self.keys = _freeze_keys(keys) if keys is not None else None
+        self.key_pool = key_pool if key_pool is not None else KeyPool()
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._single_flight = AsyncSingleFlight() if coalesce else None
+        self.decoder = decoder if callable(decoder) else get_decoder(decoder)
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=timeout,
+        )
+        self._semaphore: Optional["asyncio.Semaphore"] = None
+
+    def _sub_keys(self, service: str) -> Sequence[str]:
+        # The explicit keys take precedence over the config file and the environment variables.
+        if self.keys is not None and self.keys.get(service):
+            return self.keys[service]
+
+        return _stored_keys(service)
+
+    async def get(
+        self, sub_key: Union[str, Sequence[str]], url: str, querystring: dict
+    ) -> RETRUNED_T:
+        """Send a GET request to BAM's API through the shared connection pool.
+
+        A request exceeding the rate limit is retried up to `max_retries` times, and identical
+        concurrent requests are coalesced.
+
+        Args:
+            sub_key:
+              The subscription key for the given service, or a sequence of its keys over which
+              the requests are spread (refer to BAMapi.keypool.KeyPool).
+
+            url:
+              The endpoint of the service.
+
+            querystring:
+              The query string of the URL.
+
+        Returns:
+            The query output could be either a list of dictionaries or an empty list.
+            A GET response with a status code of 204 (No Content) is returned as an empty list.
+
+        Raise:
+            InvalidAPIKeys: Invalid API key(s).
+            RateLimitExceededError: Rate limit on GET requests has exceeded.
+            Possibly any exception that has httpx.HTTPError as a base.
+        """
+        if self._single_flight is None:
+            return await self._retry(sub_key, url, querystring)
+
+        key = (url, sub_key, _normalize_querystring(querystring))
+        return await self._single_flight.do(
+            key, lambda: self._retry(sub_key, url, querystring)
+        )
+
+    async def _retry(
+        self, sub_key: Union[str, Sequence[str]], url: str, querystring: dict
+    ) -> RETRUNED_T:
+        import asyncio
+
+        keys = _as_keys(sub_key)
+        tried: List[str] = []
+        attempt = 0
+
+        while True:
+            key = self.key_pool.next_key(keys, tried)
+            tried.append(key)
+
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve(key))
+
+            try:
+                response = await self._send(key, url, querystring)
+            except (InvalidAPIKeys, RateLimitExceededError) as e:
+                if self.key_pool.fail_over(keys, tried, key, e):
+                    continue
+
+                if isinstance(e, InvalidAPIKeys) or attempt >= self.max_retries:
+                    raise e
+
+                delay = _backoff_delay(attempt, self.backoff_factor, e.retry_after)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.penalize(key, delay)
+
+                await asyncio.sleep(delay)
+                attempt += 1
+                tried = []
+                continue
+
+            self.key_pool.report_success(key)
+            return response
+
+    async def _send(self, sub_key: str, url: str, querystring: dict) -> RETRUNED_T:
+        if self._semaphore is None:
+            import asyncio
+
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        headers = {
+            "Ocp-Apim-Subscription-Key": f"{sub_key}",
+        }
+
+        async with self._semaphore:
+            response = await self.http.get(
+                _rebase_url(url, self.base_url), headers=headers, params=querystring
+            )
+
+        _check_bam_response(response)
+
+        if response.status_code == 204:
+            return []
+
+        return self.decoder(response.content)
+
+    # Marché des changes:
+
+    async def _base_foreign_exchange_rates(
+        self, url: str, currency_label: str = "", date_time: str = ""
+    ) -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api._base_foreign_exchange_rates."""
+        querystring = _foreign_exchange_rates_querystring(currency_label, date_time)
+
+        return await self.get(self._sub_keys("marche_des_changes"), url, querystring)
+
+    async def cours_BBE(
+        self, currency_label: str = "", date_time: str = ""
+    ) -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api.cours_BBE."""
+        return await self._base_foreign_exchange_rates(
+            API["cours_BBE"], currency_label, date_time
+        )
+
+    async def cours_virement(
+        self, currency_label: str = "", date_time: str = ""
+    ) -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api.cours_virement."""
+        return await self._base_foreign_exchange_rates(
+            API["cours_virement"], currency_label, date_time
+        )
+
+    # Marché obligataire:
+
+    async def courbe_BDT(self, date: str = "") -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api.courbe_BDT."""
+        querystring = _courbe_BDT_querystring(date)
+
+        return await self.get(
+            self._sub_keys("marche_obligataire"), API["courbe_BDT"], querystring
+        )
+
+    # Marché des adjudications des bons du Trésor:
+
+    async def resultat_oprts_politique_monetaire(
+        self,
+        date_adjudication_du: str,
+        date_adjudication_au: str = "",
+        instrument: str = "",
+    ) -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api.resultat_oprts_politique_monetaire."""
+        querystring = _oprts_politique_monetaire_querystring(
+            date_adjudication_du, date_adjudication_au, instrument
+        )
+
+        return await self.get(
+            self._sub_keys("marche_adjud_des_BT"), API["oprts_de_PM"], querystring
+        )
+
+    async def resultats_emissions_BT(self, date_reglement: str) -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api.resultats_emissions_BT."""
+        querystring = _emissions_BT_querystring(date_reglement)
+
+        return await self.get(
+            self._sub_keys("marche_adjud_des_BT"), API["emissions_de_BT"], querystring
+        )
+
+    async def resultats_oprts_echange_BT(self, date_reglement: str) -> RETRUNED_T:
+        """Awaitable equivalent of BAMapi.api.resultats_oprts_echange_BT."""
+        querystring = _oprts_echange_BT_querystring(date_reglement)
+
+        return await self.get(
+            self._sub_keys("marche_adjud_des_BT"),
+            API["oprts_echange_de_BT"],
+            querystring,
+        )
+
+    async def aclose(self) -> None:
+        """Close every connection held by the client."""
+        await self.http.aclose()
+
+    async def __aenter__(self) -> "AsyncBAMClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
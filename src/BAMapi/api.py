@@ -1,15 +1,38 @@
 import configparser
-from datetime import datetime
-from typing import Union, Dict, Any, List
+import itertools
+import time
+from datetime import date
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from pathlib import Path
 
-from BAMapi.constants import INSTRUMENTS, API, KEYS
+from BAMapi import constants
+from BAMapi.constants import INSTRUMENTS, API
+from BAMapi.client import get_default_client
+from BAMapi.conditional import PollResult
+from BAMapi.curve import TENORS, BDTCurve, BDTPanel
+from BAMapi.fx import FXConverter
+from BAMapi.ratelimit import _backoff_delay
+from BAMapi.records import PMOperation
 from BAMapi.utils import (
-    _base_bam_api_get_request,
-    _is_valid_date_string,
+    _foreign_exchange_rates_querystring,
+    _courbe_BDT_querystring,
+    _business_days,
     _check_currency_label,
+    _date_windows,
     _search_instruments_const,
-    _load_api_keys,
+    _initiate_config_file,
 )
 
 
@@ -22,16 +45,25 @@ def set_api_keys(
     marche_adjud_des_BT: str = "",
     marche_des_changes: str = "",
     marche_obligataire: str = "",
+    marche_adjud_des_BT_secondary: str = "",
+    marche_des_changes_secondary: str = "",
+    marche_obligataire_secondary: str = "",
 ) -> bool:
     """Set API key(s).
 
-    This function is designed to store primary API keys for each provided service.
+    This function is designed to store the API keys for each provided service.
     It is important to note that each service has its own unique set of API keys, with two types of
-    keys available for each service: primary keys and secondary keys.
+    keys available for each service: primary keys and secondary keys. When both keys of a service
+    are stored, the requests are spread over them, and a key rejected by the API (InvalidAPIKeys)
+    or exceeding its rate limit (RateLimitExceededError) fails over to the other one (refer to
+    BAMapi.keypool.KeyPool).
 
     To overwrite a specific key, it is sufficient to call the function with the appropriate new key for
     the given service(s).
 
+    The stored keys are shared by the functions of this module. To use several sets of keys in
+    parallel, such as one per tenant, give each set to its own BAMapi.BAMClient(keys=...) instead.
+
     Args:
         marche_adjud_des_BT:
           The primary API key associated with the "Marché des adjudications des bons du Trésor" service.
@@ -42,14 +74,18 @@ def set_api_keys(
         marche_obligataire:
           The primary API key associated with the "Marché obligataire" service.
 
+        marche_adjud_des_BT_secondary, marche_des_changes_secondary, marche_obligataire_secondary:
+          The secondary API keys associated with the same services.
+
     Returns:
-        bool: If the key(s) have been successfully preserved, the function will return a Boolean value of True.
+        bool: If the key(s) have been successfully preserved, the function will return a Boolean
+          value of True.
     """
 
-    global KEYS
-
     config_file_path = _FILE_PATH.with_name("config.ini")
 
+    _initiate_config_file()
+
     config = configparser.ConfigParser()
     config.read(config_file_path)
 
@@ -60,17 +96,31 @@ def set_api_keys(
     if marche_obligataire:
         config["APIkeys"]["marche_obligataire"] = marche_obligataire
 
+    # The config files created before the secondary keys lack their section.
+    if not config.has_section("SecondaryAPIkeys"):
+        config["SecondaryAPIkeys"] = {service: "" for service in config["APIkeys"]}
+
+    if marche_adjud_des_BT_secondary:
+        config["SecondaryAPIkeys"]["marche_adjud_des_BT"] = marche_adjud_des_BT_secondary
+    if marche_des_changes_secondary:
+        config["SecondaryAPIkeys"]["marche_des_changes"] = marche_des_changes_secondary
+    if marche_obligataire_secondary:
+        config["SecondaryAPIkeys"]["marche_obligataire"] = marche_obligataire_secondary
+
     with open(config_file_path, "w") as f:
         config.write(f)
 
-    KEYS = _load_api_keys()
+    constants._reset_api_keys()
 
     return True
 
 
 def display_api_keys() -> None:
-    """Exhibit the API keys provided by the user."""
-    print(KEYS)
+    """Exhibit the API keys provided by the user, followed by the secondary ones if any."""
+    print(constants.KEYS)
+
+    if any(constants.SECONDARY_KEYS.values()):
+        print(constants.SECONDARY_KEYS)
 
 
 # ===============================
@@ -108,15 +158,9 @@ def _base_foreign_exchange_rates(
         RateLimitExceededError: Rate limit on GET requests has exceeded.
         Possibly any exception that has requests.exceptions.RequestException as a base.
     """
-    _is_valid_date_string(date_time, ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S.%fZ'"])
-    _check_currency_label(currency_label)
-
-    querystring = {
-        "libDevise": currency_label,
-        "date": date_time,
-    }
-
-    return _base_bam_api_get_request(KEYS["marche_des_changes"], url, querystring)
+    return get_default_client()._base_foreign_exchange_rates(
+        url, currency_label, date_time
+    )
 
 
 def cours_BBE(currency_label: str = "", date_time: str = "") -> RETRUNED_T:
@@ -219,6 +263,210 @@ def cours_virement(currency_label: str = "", date_time: str = "") -> RETRUNED_T:
     )
 
 
+def _foreign_exchange_rates_range(
+    url: str,
+    start: str,
+    end: str,
+    currencies: Union[str, Iterable[str]] = "",
+    max_workers: int = 8,
+) -> Iterator[Tuple[str, RETRUNED_T]]:
+    """Fetch the exchange rates of every business day of a date range in parallel.
+
+    Args:
+        url:
+          The targeted service endpoint (Product: Marché des changes)
+
+        start:
+          The first day of the range, in the ISO 8601 date format ('%Y-%m-%d').
+
+        end:
+          The last day of the range (included), in the ISO 8601 date format ('%Y-%m-%d').
+
+        currencies:
+          A currency label, such as EUR, or an iterable of currency labels. If no currency
+          is provided, the exchange rates of all available currencies are retrieved.
+          The default value is "".
+
+        max_workers:
+          The maximum number of requests sent concurrently. The default value is 8.
+
+    Returns:
+        A generator of (date, exchange rates) tuples, in date order. The days on which
+        the API returns no quotes (status code 204) are skipped. At most 2 * max_workers days
+        are requested ahead of the consumer, and the requests not sent yet are cancelled
+        when the generator is closed.
+
+    Raise:
+        ValueError: Invalid input(s), raised by the call itself.
+        InvalidAPIKeys: Invalid API key(s).
+        RateLimitExceededError: Rate limit on GET requests has exceeded.
+        Possibly any exception that has requests.exceptions.RequestException as a base.
+    """
+    if isinstance(currencies, str):
+        currencies = [currencies] if currencies else []
+    currencies = set(currencies)
+
+    for currency_label in currencies:
+        _check_currency_label(currency_label)
+
+    days = _business_days(start, end)
+
+    # A single currency is filtered by the API, several ones are picked out of the full table.
+    currency_label = next(iter(currencies)) if len(currencies) == 1 else ""
+
+    client = get_default_client()
+    sub_key = client._sub_keys("marche_des_changes")
+
+    def fetch(day: str) -> RETRUNED_T:
+        querystring = _foreign_exchange_rates_querystring(currency_label, day)
+        return client.get(sub_key, url, querystring)
+
+    # The inputs are validated above, when the function is called, rather than on the first next().
+    return _iter_foreign_exchange_rates(fetch, days, currencies, max_workers)
+
+
+def _iter_foreign_exchange_rates(
+    fetch: Callable[[str], RETRUNED_T],
+    days: List[str],
+    currencies: Set[str],
+    max_workers: int,
+) -> Iterator[Tuple[str, RETRUNED_T]]:
+    """Yield the exchange rates of the days, keeping at most 2 * max_workers requests in flight."""
+    from collections import deque
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    remaining = iter(days)
+    in_flight: Deque[Tuple[str, "Future[RETRUNED_T]"]] = deque()
+
+    try:
+        while True:
+            for day in itertools.islice(remaining, 2 * max_workers - len(in_flight)):
+                in_flight.append((day, executor.submit(fetch, day)))
+
+            if not in_flight:
+                return
+
+            day, future = in_flight.popleft()
+            rates = future.result()
+
+            if len(currencies) > 1:
+                rates = [rate for rate in rates if rate["libDevise"] in currencies]
+
+            if rates:
+                yield day, rates
+    finally:
+        # Closed early, or failed: the requests not sent yet are dropped.
+        for _, future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def cours_BBE_range(
+    start: str,
+    end: str,
+    currencies: Union[str, Iterable[str]] = "",
+    max_workers: int = 8,
+) -> Iterator[Tuple[str, RETRUNED_T]]:
+    """Les cours des billets de Banque étrangers of every business day between two dates.
+
+    The days of the range are fetched concurrently, and yielded in date order as
+    (date, exchange rates) tuples. Week-ends, the 25th and 26th of December and the days on which
+    the API returns no quotes (public holidays) are skipped. For example:
+
+        >>> for day, rates in bam.cours_BBE_range("2023-05-01", "2023-05-31", ["EUR", "USD"]):
+        ...     print(day, rates)
+
+    Refer to BAMapi.api._foreign_exchange_rates_range for the arguments and the raised exceptions,
+    and to BAMapi.api.cours_BBE for the format of the exchange rates.
+    """
+    return _foreign_exchange_rates_range(
+        API["cours_BBE"], start, end, currencies, max_workers
+    )
+
+
+def cours_virement_range(
+    start: str,
+    end: str,
+    currencies: Union[str, Iterable[str]] = "",
+    max_workers: int = 8,
+) -> Iterator[Tuple[str, RETRUNED_T]]:
+    """Les cours virements of every business day between two dates.
+
+    Refer to BAMapi.api.cours_BBE_range.
+    """
+    return _foreign_exchange_rates_range(
+        API["cours_virement"], start, end, currencies, max_workers
+    )
+
+
+def poll_cours_BBE(currency_label: str = "", date_time: str = "") -> PollResult:
+    """Les cours des billets de Banque étrangers, along with whether they changed since the last poll.
+
+    Meant for polling the exchange rates during the day: the client keeps the validators of the
+    latest response to each query (the ETag and Last-Modified headers, if any, else the hash of
+    the body). The request is conditional, and an unchanged body is not decoded again. For example:
+
+        >>> result = bam.poll_cours_BBE()
+        >>> if result.changed:
+        ...     recompute(result.data)
+
+    Refer to BAMapi.api.cours_BBE for the arguments and the raised exceptions.
+
+    Returns:
+        A BAMapi.conditional.PollResult: the exchange rates (data), and whether they changed
+        (changed). The first poll of a query is always a change.
+    """
+    return get_default_client().poll_cours_BBE(currency_label, date_time)
+
+
+def poll_cours_virement(currency_label: str = "", date_time: str = "") -> PollResult:
+    """Les cours virements, along with whether they changed since the last poll.
+
+    Refer to BAMapi.api.poll_cours_BBE.
+    """
+    return get_default_client().poll_cours_virement(currency_label, date_time)
+
+
+def cours_BBE_converter(date_time: str = "") -> FXConverter:
+    """Currency converter built out of the exchange rates of foreign banknotes of a day.
+
+    The full table of cours_BBE is fetched once per publication date, and converted into the cross
+    rates of every pair of currencies, MAD included. The converter is kept by the client, so that
+    the conversions of a day never send another request. For example:
+
+        >>> converter = bam.cours_BBE_converter("2023-05-12")
+        >>> converter.convert(amounts, "EUR", "USD")
+        >>> converter.convert(amounts, from_currencies, to_currencies, side="buy")
+
+    The numpy package is required. Refer to BAMapi.fx.FXConverter for the sides of the rates.
+
+    Args:
+        date_time:
+          The date (and time) of the exchange rates, refer to BAMapi.api.cours_BBE.
+          The default value is "" (empty string).
+
+    Returns:
+        A BAMapi.fx.FXConverter.
+
+    Raise:
+        ValueError: Invalid input(s), or no exchange rates were published on the date.
+        InvalidAPIKeys: Invalid API key(s).
+        RateLimitExceededError: Rate limit on GET requests has exceeded.
+        Possibly any exception that has requests.exceptions.RequestException as a base.
+    """
+    return get_default_client().cours_BBE_converter(date_time)
+
+
+def cours_virement_converter(date_time: str = "") -> FXConverter:
+    """Currency converter built out of the transfer exchange rates of a day.
+
+    cours_virement only quotes mid rates, hence the buy and sell sides of the converter are the
+    mid rates. Refer to BAMapi.api.cours_BBE_converter.
+    """
+    return get_default_client().cours_virement_converter(date_time)
+
+
 # Marché obligataire:
 
 
@@ -262,15 +510,101 @@ def courbe_BDT(date: str = "") -> RETRUNED_T:
         RateLimitExceededError: Rate limit on GET requests has exceeded.
         Possibly any exception that has requests.exceptions.RequestException as a base.
     """
-    _is_valid_date_string(date, "%Y-%m-%d")
+    return get_default_client().courbe_BDT(date)
 
-    querystring = {
-        "dateCourbe": date,
-    }
 
-    return _base_bam_api_get_request(
-        KEYS["marche_obligataire"], API["courbe_BDT"], querystring
-    )
+def courbe_BDT_curve(date: str = "") -> BDTCurve:
+    """Reference curve of the Treasury bills (BDT) of a date, ready for vectorized interpolation.
+
+    The curve is built out of the response of courbe_BDT, and kept by the client per dateCourbe:
+    the curve of a date is fetched and sorted once, and its models are fitted once. For example:
+
+        >>> curve = bam.courbe_BDT_curve("2019-01-02")
+        >>> curve.rates_at(curve.year_fractions(maturity_dates), method="svensson")
+
+    The numpy package is required. Refer to BAMapi.curve.BDTCurve for the interpolation methods.
+
+    Args:
+        date:
+          The date of the curve, refer to BAMapi.api.courbe_BDT. The default value is "" (empty string).
+
+    Returns:
+        A BAMapi.curve.BDTCurve.
+
+    Raise:
+        ValueError: Invalid input(s), or no curve was published on the date.
+        InvalidAPIKeys: Invalid API key(s).
+        RateLimitExceededError: Rate limit on GET requests has exceeded.
+        Possibly any exception that has requests.exceptions.RequestException as a base.
+    """
+    return get_default_client().courbe_BDT_curve(date)
+
+
+def courbe_BDT_panel(
+    start: str,
+    end: str,
+    tenors: Sequence[float] = TENORS,
+    method: str = "linear",
+    panel: Optional[BDTPanel] = None,
+    max_workers: int = 8,
+) -> BDTPanel:
+    """History of the reference curve of the Treasury bills (BDT) between two dates.
+
+    The curves of the business days of the range are fetched concurrently, and stored as a
+    BAMapi.curve.BDTPanel: a dates × tenors matrix of rates, plus the raw points of every curve.
+    Week-ends are not requested, and the days without a curve (status code 204) are skipped.
+    Given an existing panel, only the days it lacks are requested, for instance to extend a
+    history day after day (the numpy package is required):
+
+        >>> panel = bam.courbe_BDT_panel("2020-01-01", "2023-12-31")
+        >>> panel = bam.courbe_BDT_panel("2024-01-01", "2024-01-31", panel=panel)
+
+    Args:
+        start:
+          The first day of the range, in the ISO 8601 date format ('%Y-%m-%d').
+
+        end:
+          The last day of the range (included), in the ISO 8601 date format ('%Y-%m-%d').
+
+        tenors:
+          The tenors (in years) at which the rates of each curve are interpolated.
+          Ignored if a panel is given. The default value is BAMapi.curve.TENORS.
+
+        method:
+          The interpolation method, refer to BAMapi.curve.BDTCurve.rates_at. The default value is "linear".
+
+        panel:
+          A panel to extend with the curves of the range. The default value is None.
+
+        max_workers:
+          The maximum number of requests sent concurrently. The default value is 8.
+
+    Returns:
+        A BAMapi.curve.BDTPanel.
+
+    Raise:
+        ValueError: Invalid input(s).
+        InvalidAPIKeys: Invalid API key(s).
+        RateLimitExceededError: Rate limit on GET requests has exceeded.
+        Possibly any exception that has requests.exceptions.RequestException as a base.
+    """
+    days = _business_days(start, end, fx=False)
+    if panel is not None:
+        tenors = panel.tenors
+        days = [day for day in days if day not in panel]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = get_default_client()
+    sub_key = client._sub_keys("marche_obligataire")
+
+    def fetch(day: str) -> RETRUNED_T:
+        return client.get(sub_key, API["courbe_BDT"], _courbe_BDT_querystring(day))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        curves = BDTPanel.from_responses(executor.map(fetch, days), tenors, method)
+
+    return curves if panel is None else panel.extend(curves)
 
 
 # Marché des adjudications des bons du Trésor:
@@ -339,19 +673,154 @@ def resultat_oprts_politique_monetaire(
         RateLimitExceededError: Rate limit on GET requests has exceeded.
         Possibly any exception that has requests.exceptions.RequestException as a base.
     """
-    _is_valid_date_string(date_adjudication_du, "%Y-%m-%d")
-    _is_valid_date_string(date_adjudication_au, "%Y-%m-%d")
+    return get_default_client().resultat_oprts_politique_monetaire(
+        date_adjudication_du, date_adjudication_au, instrument
+    )
+
 
-    instrument = _search_instruments_const(instrument)
+def resultat_oprts_politique_monetaire_chunked(
+    date_adjudication_du: str,
+    date_adjudication_au: str = "",
+    instruments: Union[str, Iterable[str]] = "",
+    chunk_days: int = 90,
+    max_workers: int = 4,
+    max_retries: int = 2,
+) -> RETRUNED_T:
+    """Résultat des opérations de la politique monétaire, fetched in parallel chunks.
 
-    querystring = {
-        "dateAdjudicationDu": date_adjudication_du,
-        "dateAdjudicationAu": date_adjudication_au,
-        "instrument": instrument,
-    }
+    The range of adjudication dates is split into windows of `chunk_days` days, and optionally
+    into one request per instrument. The chunks are fetched concurrently, each one being retried
+    on its own when it fails, then merged in date order without duplicates. This keeps large
+    ranges from timing out as a single slow request.
 
-    return _base_bam_api_get_request(
-        KEYS["marche_adjud_des_BT"], API["oprts_de_PM"], querystring
+    Args:
+        date_adjudication_du:
+            Date Adjudication Du Format(AAAA-MM-JJ)
+
+        date_adjudication_au :optional:
+            Date Adjudication Au Format(AAAA-MM-JJ). The default value is today.
+
+        instruments :optional:
+          The name or acronym of an instrument, or an iterable of them, in which case each
+          instrument is requested separately (refer to BAMapi.INSTRUMENTS). If no instrument is
+          provided, the operations of all instruments are retrieved.
+
+        chunk_days :optional:
+          The number of days covered by each request. The default value is 90.
+
+        max_workers :optional:
+          The maximum number of requests sent concurrently. The default value is 4.
+
+        max_retries :optional:
+          The number of times a chunk is retried, after an exponential backoff, when it times
+          out, fails to connect or gets a 5XX status code. The default value is 2.
+
+    Returns:
+        Refer to BAMapi.api.resultat_oprts_politique_monetaire.
+
+    Raise:
+        ValueError: Invalid input(s).
+        InvalidAPIKeys: Invalid API key(s).
+        RateLimitExceededError: Rate limit on GET requests has exceeded.
+        Possibly any exception that has requests.exceptions.RequestException as a base.
+    """
+    date_adjudication_au = date_adjudication_au or date.today().isoformat()
+
+    if max_retries < 0:
+        raise ValueError("The number of retries must be a non-negative integer.")
+
+    if isinstance(instruments, str):
+        instruments = [instruments]
+    instruments = [_search_instruments_const(instrument) for instrument in instruments]
+    if not instruments:
+        raise ValueError(
+            "At least one instrument must be provided, or an empty string for all of them."
+        )
+
+    chunks = [
+        (du, au, instrument)
+        for du, au in _date_windows(
+            date_adjudication_du, date_adjudication_au, chunk_days
+        )
+        for instrument in instruments
+    ]
+
+    # requests is imported on first use, to keep "import BAMapi" fast.
+    from concurrent.futures import ThreadPoolExecutor
+    from requests.exceptions import ConnectionError, HTTPError, Timeout
+
+    backoff_factor = get_default_client().backoff_factor
+
+    def fetch(chunk: Tuple[str, str, str]) -> RETRUNED_T:
+        attempt = 0
+        while True:
+            try:
+                return resultat_oprts_politique_monetaire(*chunk)
+            except (Timeout, ConnectionError, HTTPError) as e:
+                # Only the transient failures are retried: a 4XX status code would fail again.
+                transient = not isinstance(e, HTTPError) or (
+                    e.response is not None and e.response.status_code >= 500
+                )
+                if not transient or attempt >= max_retries:
+                    raise e
+
+                time.sleep(_backoff_delay(attempt, backoff_factor))
+                attempt += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(fetch, chunks))
+
+    seen = set()
+    operations = []
+    for operation in (operation for result in results for operation in result):
+        key = tuple(sorted(operation.items()))
+        if key not in seen:
+            seen.add(key)
+            operations.append(operation)
+
+    # Stable sort: the operations of a day keep the order of the API.
+    operations.sort(key=lambda operation: operation.get("dateAdjudication", ""))
+
+    return operations
+
+
+def iter_resultat_oprts_politique_monetaire(
+    date_adjudication_du: str,
+    date_adjudication_au: str = "",
+    instrument: str = "",
+    typed: bool = False,
+) -> Iterator[Union[Dict[str, Union[str, int, float]], PMOperation]]:
+    """Résultat des opérations de la politique monétaire, streamed one operation at a time.
+
+    The response is decoded while it is downloaded, so that the memory footprint stays flat
+    for large ranges of adjudication dates and the operations can be processed before the
+    download ends:
+
+        >>> for operation in bam.iter_resultat_oprts_politique_monetaire("2015-01-01", typed=True):
+        ...     print(operation.dateAdjudication, operation.taux)
+
+    Args:
+        date_adjudication_du, date_adjudication_au, instrument:
+            Refer to BAMapi.api.resultat_oprts_politique_monetaire.
+
+        typed :optional:
+            Whether the operations are yielded as BAMapi.records.PMOperation records instead of
+            dictionaries. The default value is False.
+
+    Returns:
+        A generator of operations.
+
+    Raise:
+        ValueError: Invalid input(s).
+        InvalidAPIKeys: Invalid API key(s).
+        RateLimitExceededError: Rate limit on GET requests has exceeded.
+        Possibly any exception that has requests.exceptions.RequestException as a base.
+    """
+    return get_default_client().iter_resultat_oprts_politique_monetaire(
+        date_adjudication_du,
+        date_adjudication_au,
+        instrument,
+        record_type=PMOperation if typed else None,
     )
 
 
@@ -392,13 +861,7 @@ def resultats_emissions_BT(date_reglement: str) -> RETRUNED_T:
         Possibly any exception that has requests.exceptions.RequestException as a base.
     """
 
-    _is_valid_date_string(date_reglement, "%Y-%m-%d", True)
-
-    querystring = {"dateReglement": date_reglement}
-
-    return _base_bam_api_get_request(
-        KEYS["marche_adjud_des_BT"], API["emissions_de_BT"], querystring
-    )
+    return get_default_client().resultats_emissions_BT(date_reglement)
 
 
 def resultats_oprts_echange_BT(date_reglement: str) -> RETRUNED_T:
@@ -433,11 +896,4 @@ def resultats_oprts_echange_BT(date_reglement: str) -> RETRUNED_T:
         Possibly any exception that has requests.exceptions.RequestException as a base.
 
     """
-    _is_valid_date_string(date_reglement, "%Y-%m-%d")
-
-    querystring = {
-        "dateReglement": date_reglement,
-    }
-    return _base_bam_api_get_request(
-        KEYS["marche_adjud_des_BT"], API["oprts_echange_de_BT"], querystring
-    )
+    return get_default_client().resultats_oprts_echange_BT(date_reglement)
@@ -0,0 +1,389 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as daytime, timedelta, tzinfo
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Union
+
+from BAMapi.constants import API
+
+
+# The query string parameters holding the date of the requested data.
+DATE_PARAMETERS = frozenset(
+    {
+        "date",
+        "dateCourbe",
+        "dateAdjudicationDu",
+        "dateAdjudicationAu",
+        "dateReglement",
+    }
+)
+
+# The time zone of the publication times, which are Casablanca times whatever the host's.
+TIMEZONE = "Africa/Casablanca"
+
+# The (Casablanca) time of the day at which each endpoint publishes new data.
+PUBLICATION_TIMES = MappingProxyType(
+    {
+        "cours_BBE": daytime(8, 30),
+        "cours_virement": daytime(12, 30),
+        "courbe_BDT": daytime(0, 0),
+    }
+)
+
+_ENDPOINTS = {url: name for name, url in API.items()}
+
+
+def _endpoint_name(url: str) -> str:
+    """Map the URL of an endpoint onto its name in BAMapi.constants.API."""
+    return _ENDPOINTS.get(url, url)
+
+
+@lru_cache(maxsize=None)
+def _timezone() -> tzinfo:
+    if sys.version_info >= (3, 9):
+        from zoneinfo import ZoneInfo
+    else:  # pragma: no cover
+        from backports.zoneinfo import ZoneInfo
+
+    return ZoneInfo(TIMEZONE)
+
+
+def _now() -> datetime:
+    """Return the current time in Casablanca, as an aware datetime (refer to TIMEZONE)."""
+    return datetime.now(_timezone())
+
+
+def _in_timezone(now: datetime) -> datetime:
+    """Convert an aware datetime to Casablanca time. A naive one is taken as Casablanca time."""
+    return now.astimezone(_timezone()) if now.tzinfo is not None else now
+
+
+def _normalize_querystring(querystring: dict) -> str:
+    """Serialize a query string independently of the order of its parameters."""
+    return json.dumps(sorted(querystring.items()), ensure_ascii=False)
+
+
+def _is_historical(querystring: dict, today: Optional[date] = None) -> bool:
+    """Whether a query targets data that has been published for good.
+
+    This is the case when every date parameter of the query string is set to a day
+    before today. An empty date parameter stands for today (or an open-ended range).
+    """
+    today = today or _now().date()
+
+    dates = [value for key, value in querystring.items() if key in DATE_PARAMETERS]
+
+    if not dates:
+        return False
+
+    for value in dates:
+        if not value:
+            return False
+        try:
+            if date.fromisoformat(value[:10]) >= today:
+                return False
+        except ValueError:
+            return False
+
+    return True
+
+
+def _next_publication(
+    endpoint: str, now: Optional[datetime] = None
+) -> Optional[datetime]:
+    """Return the next time at which an endpoint publishes new data, if it is known.
+
+    An aware now is converted to Casablanca time, a naive one is taken as Casablanca time.
+    """
+    if endpoint not in PUBLICATION_TIMES:
+        return None
+
+    now = _in_timezone(now) if now is not None else _now()
+    publication = datetime.combine(now.date(), PUBLICATION_TIMES[endpoint], now.tzinfo)
+
+    if publication <= now:
+        publication += timedelta(days=1)
+
+    return publication
+
+
+class SQLiteCache:
+    """Persistent cache of the API responses, stored in a SQLite database.
+
+    The responses are keyed on the name of the endpoint (refer to BAMapi.constants.API) and
+    the normalized query string. Historical data never changes once published, so the
+    responses to past-dated queries never expire. The responses to the other queries,
+    such as the ones with an empty date or today's date, expire after `ttl` seconds.
+
+        >>> client = bam.BAMClient(cache=SQLiteCache("~/.cache/bamapi.sqlite"))
+
+    Args:
+        path:
+          The path of the database file. It is created if it does not exist.
+
+        ttl:
+          The time to live (in seconds) of the responses to non-historical queries.
+          The default value is 300.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = 300) -> None:
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+
+        import sqlite3
+
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "endpoint TEXT NOT NULL, "
+            "query TEXT NOT NULL, "
+            "expires REAL, "
+            "payload TEXT NOT NULL, "
+            "PRIMARY KEY (endpoint, query))"
+        )
+        self._connection.commit()
+
+    def get(self, url: str, querystring: dict) -> Optional[List[Dict]]:
+        """Return the cached response to a query, or None if it is missing or expired."""
+        key = (_endpoint_name(url), _normalize_querystring(querystring))
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT expires, payload FROM responses WHERE endpoint = ? AND query = ?", key
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            expires, payload = row
+            if expires is not None and expires <= time.time():
+                self._connection.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND query = ?", key
+                )
+                self._connection.commit()
+                return None
+
+        return json.loads(payload)
+
+    def set(self, url: str, querystring: dict, response: List[Dict]) -> None:
+        """Store the response to a query, and purge the expired ones."""
+        now = time.time()
+        expires = None if _is_historical(querystring) else now + self.ttl
+
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (
+                    _endpoint_name(url),
+                    _normalize_querystring(querystring),
+                    expires,
+                    json.dumps(response, ensure_ascii=False),
+                ),
+            )
+            self._connection.commit()
+
+    def invalidate(
+        self, url: Optional[str] = None, querystring: Optional[dict] = None
+    ) -> None:
+        """Remove cached responses.
+
+        Args:
+            url:
+              The endpoint whose responses are removed. If no URL is provided, the whole
+              cache is cleared.
+
+            querystring:
+              The query string of the single response to remove. If no query string is
+              provided, all the responses of the endpoint are removed.
+        """
+        with self._lock:
+            if url is None:
+                self._connection.execute("DELETE FROM responses")
+            elif querystring is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND query = ?",
+                    (_endpoint_name(url), _normalize_querystring(querystring)),
+                )
+            else:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE endpoint = ?", (_endpoint_name(url),)
+                )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        with self._lock:
+            self._connection.close()
+
+
+class MemoryCache:
+    """In-process LRU cache of the API responses.
+
+    The cache holds at most `maxsize` responses, and evicts the least recently used one
+    when it is full. The responses to past-dated queries never expire. The other ones
+    expire at the next publication time of their endpoint (refer to PUBLICATION_TIMES):
+    08:30 for cours_BBE, 12:30 for cours_virement and midnight for courbe_BDT. The responses
+    of the other endpoints expire after `ttl` seconds.
+
+    Note that the cached lists are shared between the callers, and must not be modified.
+
+        >>> client = bam.BAMClient(cache=MemoryCache(maxsize=256))
+
+    Args:
+        maxsize:
+          The maximum number of cached responses. The default value is 1024.
+
+        ttl:
+          The time to live (in seconds) of the responses of the endpoints without a known
+          publication time. The default value is 300.
+
+        ttls:
+          An optional mapping of endpoint names (refer to BAMapi.constants.API) to time to
+          live (in seconds), which overrides the default expiration policy of these endpoints.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300,
+        ttls: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # (endpoint, normalized query string) -> (expiration timestamp, response)
+        self._responses: OrderedDict = OrderedDict()
+
+    def _expires(self, endpoint: str, querystring: dict) -> Optional[float]:
+        if endpoint in self.ttls:
+            return time.time() + self.ttls[endpoint]
+
+        if _is_historical(querystring):
+            return None
+
+        publication = _next_publication(endpoint)
+        if publication is not None:
+            return publication.timestamp()
+
+        return time.time() + self.ttl
+
+    def get(self, url: str, querystring: dict) -> Optional[List[Dict]]:
+        """Return the cached response to a query, or None if it is missing or expired."""
+        key = (_endpoint_name(url), _normalize_querystring(querystring))
+
+        with self._lock:
+            item = self._responses.get(key)
+
+            if item is not None and item[0] is not None and item[0] <= time.time():
+                del self._responses[key]
+                item = None
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, url: str, querystring: dict, response: List[Dict]) -> None:
+        """Store the response to a query."""
+        endpoint = _endpoint_name(url)
+        key = (endpoint, _normalize_querystring(querystring))
+        expires = self._expires(endpoint, querystring)
+
+        with self._lock:
+            self._responses[key] = (expires, response)
+            self._responses.move_to_end(key)
+
+            while len(self._responses) > self.maxsize:
+                self._responses.popitem(last=False)
+
+    def invalidate(
+        self, url: Optional[str] = None, querystring: Optional[dict] = None
+    ) -> None:
+        """Remove cached responses.
+
+        Args:
+            url:
+              The endpoint whose responses are removed. If no URL is provided, the whole
+              cache is cleared.
+
+            querystring:
+              The query string of the single response to remove. If no query string is
+              provided, all the responses of the endpoint are removed.
+        """
+        with self._lock:
+            if url is None:
+                self._responses.clear()
+                return
+
+            endpoint = _endpoint_name(url)
+
+            if querystring is not None:
+                key = (endpoint, _normalize_querystring(querystring))
+                self._responses.pop(key, None)
+                return
+
+            for key in [key for key in self._responses if key[0] == endpoint]:
+                del self._responses[key]
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit and miss counters and the current size of the cache."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class TieredCache:
+    """Chain several caches, such as a MemoryCache in front of a SQLiteCache.
+
+    A historical response found in a slower cache is copied to the faster ones placed
+    before it. The other responses are not, as their expiration time would be reset.
+
+        >>> cache = TieredCache(MemoryCache(), SQLiteCache("bamapi.sqlite"))
+
+    Args:
+        caches:
+          The caches, from the fastest to the slowest.
+    """
+
+    def __init__(self, *caches) -> None:
+        self.caches = caches
+
+    def get(self, url: str, querystring: dict) -> Optional[List[Dict]]:
+        """Return the cached response to a query from the first cache holding it."""
+        for index, cache in enumerate(self.caches):
+            response = cache.get(url, querystring)
+            if response is not None:
+                if _is_historical(querystring):
+                    for faster in self.caches[:index]:
+                        faster.set(url, querystring, response)
+                return response
+        return None
+
+    def set(self, url: str, querystring: dict, response: List[Dict]) -> None:
+        """Store the response to a query in every cache."""
+        for cache in self.caches:
+            cache.set(url, querystring, response)
+
+    def invalidate(
+        self, url: Optional[str] = None, querystring: Optional[dict] = None
+    ) -> None:
+        """Remove cached responses from every cache (refer to MemoryCache.invalidate)."""
+        for cache in self.caches:
+            cache.invalidate(url, querystring)
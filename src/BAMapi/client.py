@@ -0,0 +1,694 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from BAMapi.cache import _endpoint_name, _normalize_querystring
+from BAMapi.conditional import PollResult, Validators
+from BAMapi.constants import API
+from BAMapi.curve import BDTCurve
+from BAMapi.decoders import DecoderT, get_decoder
+from BAMapi.fx import FXConverter
+from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
+from BAMapi.keypool import KeyPool, _as_keys, _freeze_keys, _stored_keys
+from BAMapi.metrics import RequestEvent
+from BAMapi.ratelimit import RateLimiter, _backoff_delay
+from BAMapi.singleflight import SingleFlight
+from BAMapi.snapshot import FX_ENDPOINTS, FXSnapshots
+from BAMapi.utils import (
+    _base_bam_api_get_request,
+    _base_bam_api_stream_request,
+    _iter_json_array,
+    _rebase_url,
+    _foreign_exchange_rates_querystring,
+    _courbe_BDT_querystring,
+    _oprts_politique_monetaire_querystring,
+    _emissions_BT_querystring,
+    _oprts_echange_BT_querystring,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# The number of queries whose validators are kept by a client, refer to BAMClient.poll.
+VALIDATORS_MAXSIZE = 1024
+
+# The number of BDT curves and FX converters kept by a client, refer to BAMClient.courbe_BDT_curve.
+ANALYTICS_MAXSIZE = 64
+
+
+class BAMClient:
+    """HTTP client that keeps a pool of persistent connections to BAM's API.
+
+    Every request sent through the same client reuses the TCP/TLS connections held by its
+    underlying ``requests.Session``, which spares the handshake cost on consecutive calls.
+
+    A client holds its own API keys and resources, and exposes the functions of BAMapi.api as
+    methods. Clients of several tenants can therefore be used in parallel, without any global
+    state or disk write:
+
+        >>> tenant = BAMClient(keys={"marche_des_changes": "XXXXXXXXXXXXXXXX"}, cache=MemoryCache())
+        >>> tenant.cours_BBE("EUR")
+
+    Args:
+        pool_connections:
+          The number of distinct hosts for which connection pools are cached. The default value is 10.
+
+        pool_maxsize:
+          The maximum number of connections kept alive per host. The default value is 10.
+
+        pool_block:
+          Whether to block when no free connection is available for a host instead of opening
+          an extra, non-pooled one. The default value is False.
+
+        keep_alive:
+          Whether connections are kept open between requests. If False, the
+          "Connection: close" header is sent with every request. The default value is True.
+
+        timeout:
+          The timeout (in seconds) of each GET request. The default value is 10.
+
+        cache:
+          An optional cache of the responses, such as BAMapi.cache.MemoryCache or SQLiteCache. The cached
+          responses are returned without sending any request. The default value is None.
+
+        rate_limiter:
+          An optional BAMapi.ratelimit.RateLimiter, which paces the requests sent with each
+          subscription key. The default value is None.
+
+        max_retries:
+          The number of times a request is retried after exceeding the rate limit (status code 429)
+          before RateLimitExceededError is raised. The default value is 3.
+
+        backoff_factor:
+          The base delay (in seconds) of the jittered exponential backoff between retries, used when
+          the API does not tell how long to wait. The default value is 0.5.
+
+        coalesce:
+          Whether identical requests (same url, subscription key and query string) made concurrently
+          from several threads are coalesced into a single request, whose response is shared by all
+          the callers. The default value is True.
+
+        fx_snapshots:
+          Whether the exchange rates of a single currency are looked up in the full table of all
+          currencies, fetched once per (endpoint, date), instead of being requested one by one.
+          Either a boolean or a BAMapi.snapshot.FXSnapshots instance. The default value is False.
+
+        decoder:
+          The JSON decoder of the responses: the name of a backend of BAMapi.decoders ("orjson",
+          "msgspec" or "json") or a function decoding bytes. If no decoder is provided, the fastest
+          installed backend is used.
+
+        keys:
+          A mapping of the API key of each service (refer to BAMapi.set_api_keys), or of a sequence of
+          its keys, such as (primary, secondary). The mapping is copied, so that the keys of a client
+          cannot change. The services missing from the mapping fall back to the keys stored by
+          BAMapi.set_api_keys. The default value is None.
+
+        session:
+          An optional requests.Session, used as is instead of a new pooled session. The client does
+          not close a session it did not create. The default value is None.
+
+        key_pool:
+          The BAMapi.keypool.KeyPool spreading the requests over the keys of each service, and
+          taking a failing key out of the rotation. The default value is KeyPool().
+
+        hooks:
+          A sequence of functions called with a BAMapi.metrics.RequestEvent after each request,
+          such as a BAMapi.metrics.MetricsAggregator. The requests are only timed when at least
+          one hook is installed. The exceptions raised by a hook are logged and ignored.
+          The default value is ().
+
+        base_url:
+          An optional URL replacing https://api.centralbankofmorocco.ma/ in the requests, such as the
+          one of a local stand-in server (refer to benchmarks/server.py). The default value is None.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        timeout: float = 10,
+        cache: Optional[Any] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        coalesce: bool = True,
+        fx_snapshots: Union[bool, FXSnapshots] = False,
+        decoder: Union[str, DecoderT, None] = None,
+        keys: Optional[Mapping[str, Union[str, Sequence[str]]]] = None,
+        session: Optional[Any] = None,
+        key_pool: Optional[KeyPool] = None,
+        hooks: Sequence[Callable[[RequestEvent], None]] = (),
+        base_url: Optional[str] = None,
+    ) -> None:
+        self.keys = _freeze_keys(keys) if keys is not None else None
+        self.hooks = list(hooks)
+        self.base_url = base_url
+        self.key_pool = key_pool if key_pool is not None else KeyPool()
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._single_flight = SingleFlight() if coalesce else None
+
+        if fx_snapshots is True:
+            fx_snapshots = FXSnapshots()
+        self.fx_snapshots = fx_snapshots or None
+
+        # (url, normalized query string) -> Validators
+        self._validators_lock = threading.Lock()
+        self._validators: OrderedDict = OrderedDict()
+
+        # (endpoint, date) -> BDTCurve or FXConverter
+        self._analytics_lock = threading.Lock()
+        self._analytics: OrderedDict = OrderedDict()
+
+        self.decoder = decoder if callable(decoder) else get_decoder(decoder)
+
+        self._owns_session = session is None
+        if session is not None:
+            self.session = session
+            return
+
+        # requests is imported by the first client rather than by `import BAMapi`.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def _sub_keys(self, service: str) -> Tuple[str, ...]:
+        # The explicit keys take precedence over the config file and the environment variables.
+        if self.keys is not None and self.keys.get(service):
+            return self.keys[service]
+
+        return _stored_keys(service)
+
+    def get(
+        self, sub_key: Union[str, Sequence[str]], url: str, querystring: dict
+    ) -> List[Dict]:
+        """Send a GET request to BAM's API through the pooled session, unless the response is cached.
+
+        Refer to BAMapi.utils._base_bam_api_get_request for the arguments, the returned value
+        and the raised exceptions. The sub_key argument can also be a sequence of keys of the
+        same service, such as (primary, secondary), over which the requests are spread by the
+        key pool of the client.
+        """
+        if (
+            self.fx_snapshots is not None
+            and url in FX_ENDPOINTS
+            and querystring.get("libDevise")
+        ):
+            return self.fx_snapshots.lookup(
+                lambda table_querystring: self.get(sub_key, url, table_querystring),
+                url,
+                querystring["libDevise"],
+                querystring.get("date", ""),
+            )
+
+        if self.cache is not None:
+            response = self.cache.get(url, querystring)
+            if response is not None:
+                if self.hooks:
+                    self._emit(
+                        RequestEvent(_endpoint_name(url), querystring, cache_hit=True)
+                    )
+                return response
+
+        if self._single_flight is None:
+            return self._fetch(sub_key, url, querystring)
+
+        key = (url, sub_key, _normalize_querystring(querystring))
+        return self._single_flight.do(
+            key, lambda: self._fetch(sub_key, url, querystring)
+        )
+
+    def _fetch(
+        self,
+        sub_key: Union[str, Sequence[str]],
+        url: str,
+        querystring: dict,
+        cache: bool = True,
+        validators: Optional[Validators] = None,
+        outcome: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict]:
+        timings: Optional[Dict[str, Any]] = {"attempts": 0} if self.hooks else None
+
+        if timings is not None:
+            started = time.perf_counter()
+            connections = self._connections(url)
+
+        def request(key: str) -> List[Dict]:
+            if timings is not None:
+                timings["attempts"] += 1
+
+            return _base_bam_api_get_request(
+                key,
+                _rebase_url(url, self.base_url),
+                querystring,
+                session=self.session,
+                timeout=self.timeout,
+                decoder=self.decoder,
+                timings=timings,
+                validators=validators,
+                outcome=outcome,
+            )
+
+        try:
+            response = self._send(sub_key, request)
+        except Exception as e:
+            if timings is not None:
+                self._report(url, querystring, timings, started, connections, e)
+            raise e
+
+        if cache and self.cache is not None:
+            self.cache.set(url, querystring, response)
+
+        if timings is not None:
+            self._report(url, querystring, timings, started, connections)
+
+        return response
+
+    def poll(
+        self, sub_key: Union[str, Sequence[str]], url: str, querystring: dict
+    ) -> PollResult:
+        """Send a GET request to BAM's API, and tell whether its data changed since the previous poll.
+
+        The validators of the latest response to each query (refer to BAMapi.conditional.Validators)
+        make the request conditional, and spare decoding an unchanged body. The cache is bypassed
+        by the request, and updated with its response. Refer to BAMClient.get for the arguments.
+
+        Returns:
+            A BAMapi.conditional.PollResult: the data, and whether it changed. The first poll of a
+            query is always a change.
+        """
+        key = (url, _normalize_querystring(querystring))
+
+        with self._validators_lock:
+            validators = self._validators.get(key)
+            if validators is None:
+                validators = self._validators[key] = Validators()
+            self._validators.move_to_end(key)
+            while len(self._validators) > VALIDATORS_MAXSIZE:
+                self._validators.popitem(last=False)
+
+        outcome: Dict[str, Any] = {}
+        data = self._fetch(sub_key, url, querystring, validators=validators, outcome=outcome)
+
+        return PollResult(data, outcome["changed"])
+
+    def _connections(self, url: str) -> Optional[int]:
+        """Return the number of connections opened so far by the pool of the host of a URL.
+
+        The URL of an endpoint is rebased on base_url first, as the requests are.
+        """
+        url = _rebase_url(url, self.base_url)
+        try:
+            pool = self.session.get_adapter(url).poolmanager.connection_from_url(url)
+            return pool.num_connections
+        except Exception:
+            # A session provided by the caller may not be pooled by urllib3.
+            return None
+
+    def _report(
+        self,
+        url: str,
+        querystring: dict,
+        timings: Dict[str, Any],
+        started: float,
+        connections: Optional[int],
+        error: Optional[Exception] = None,
+    ) -> None:
+        reused_connection = None
+        if connections is not None:
+            reused_connection = self._connections(url) == connections
+
+        self._emit(
+            RequestEvent(
+                _endpoint_name(url),
+                querystring,
+                cache_hit=False,
+                status_code=timings.get("status_code"),
+                retries=max(0, timings["attempts"] - 1),
+                reused_connection=reused_connection,
+                ttfb=timings.get("ttfb"),
+                download=timings.get("download"),
+                decode=timings.get("decode"),
+                size=timings.get("size"),
+                total=time.perf_counter() - started,
+                error=type(error).__name__ if error is not None else None,
+            )
+        )
+
+    def _emit(self, event: RequestEvent) -> None:
+        # A failing hook is logged, and does not fail the request.
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("The request hook %r failed.", hook)
+
+    def _send(
+        self, sub_key: Union[str, Sequence[str]], request: Callable[[str], T]
+    ) -> T:
+        """Send a request with one of the keys of a service.
+
+        A key rejected by the API or exceeding its rate limit fails over to the other keys of the
+        service. The request is retried with backoff while the rate limit of every key is exceeded.
+        """
+        keys = _as_keys(sub_key)
+        tried: List[str] = []
+        attempt = 0
+
+        while True:
+            key = self.key_pool.next_key(keys, tried)
+            tried.append(key)
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(key)
+
+            try:
+                response = request(key)
+            except (InvalidAPIKeys, RateLimitExceededError) as e:
+                if self.key_pool.fail_over(keys, tried, key, e):
+                    continue
+
+                if isinstance(e, InvalidAPIKeys) or attempt >= self.max_retries:
+                    raise e
+
+                delay = _backoff_delay(attempt, self.backoff_factor, e.retry_after)
+
+                if self.rate_limiter is not None:
+                    # The other threads sharing the key hold back as well.
+                    self.rate_limiter.penalize(key, delay)
+
+                time.sleep(delay)
+                attempt += 1
+                tried = []
+                continue
+
+            self.key_pool.report_success(key)
+            return response
+
+    def stream(
+        self,
+        sub_key: Union[str, Sequence[str]],
+        url: str,
+        querystring: dict,
+        record_type: Optional[Type] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[Any]:
+        """Stream the records of a response as they are downloaded.
+
+        The body is decoded one record at a time, which keeps the memory footprint flat for
+        large responses and lets the processing start before the download ends. The streamed
+        responses bypass the cache.
+
+        Args:
+            sub_key:
+              The subscription key for the given service, or a sequence of its keys.
+
+            url:
+              The endpoint of the service.
+
+            querystring:
+              The query string of the URL.
+
+            record_type:
+              An optional record type of BAMapi.records, such as PMOperation, into which each
+              record is converted. The default value is None (dictionaries).
+
+            chunk_size:
+              The size (in bytes) of the chunks read from the connection. The default value is 65536.
+
+        Returns:
+            A generator of records. A response with a status code of 204 (No Content) yields nothing.
+
+        Raise:
+            Refer to BAMapi.utils._base_bam_api_get_request.
+        """
+        response = self._send(
+            sub_key,
+            lambda key: _base_bam_api_stream_request(
+                key,
+                _rebase_url(url, self.base_url),
+                querystring,
+                session=self.session,
+                timeout=self.timeout,
+            ),
+        )
+
+        try:
+            if response.status_code == 204:
+                return
+
+            for record in _iter_json_array(response.iter_content(chunk_size)):
+                yield record if record_type is None else record_type.from_dict(record)
+        finally:
+            response.close()
+
+    # Marché des changes:
+
+    def _base_foreign_exchange_rates(
+        self, url: str, currency_label: str = "", date_time: str = ""
+    ) -> List[Dict]:
+        """Equivalent of BAMapi.api._base_foreign_exchange_rates."""
+        querystring = _foreign_exchange_rates_querystring(currency_label, date_time)
+
+        return self.get(self._sub_keys("marche_des_changes"), url, querystring)
+
+    def cours_BBE(self, currency_label: str = "", date_time: str = "") -> List[Dict]:
+        """Equivalent of BAMapi.api.cours_BBE."""
+        return self._base_foreign_exchange_rates(
+            API["cours_BBE"], currency_label, date_time
+        )
+
+    def cours_virement(
+        self, currency_label: str = "", date_time: str = ""
+    ) -> List[Dict]:
+        """Equivalent of BAMapi.api.cours_virement."""
+        return self._base_foreign_exchange_rates(
+            API["cours_virement"], currency_label, date_time
+        )
+
+    def cours_BBE_converter(self, date_time: str = "") -> FXConverter:
+        """Equivalent of BAMapi.api.cours_BBE_converter."""
+        return self._fx_converter("cours_BBE", date_time)
+
+    def cours_virement_converter(self, date_time: str = "") -> FXConverter:
+        """Equivalent of BAMapi.api.cours_virement_converter."""
+        return self._fx_converter("cours_virement", date_time)
+
+    def poll_cours_BBE(self, currency_label: str = "", date_time: str = "") -> PollResult:
+        """Equivalent of BAMapi.api.poll_cours_BBE."""
+        querystring = _foreign_exchange_rates_querystring(currency_label, date_time)
+
+        return self.poll(self._sub_keys("marche_des_changes"), API["cours_BBE"], querystring)
+
+    def poll_cours_virement(
+        self, currency_label: str = "", date_time: str = ""
+    ) -> PollResult:
+        """Equivalent of BAMapi.api.poll_cours_virement."""
+        querystring = _foreign_exchange_rates_querystring(currency_label, date_time)
+
+        return self.poll(
+            self._sub_keys("marche_des_changes"), API["cours_virement"], querystring
+        )
+
+    def _fx_converter(self, endpoint: str, date_time: str) -> FXConverter:
+        """Return the converter of the full table of exchange rates of an endpoint.
+
+        The latest ANALYTICS_MAXSIZE converters are kept per publication date, the date of the
+        returned rates: a date requested before its publication, which returns the table of the
+        previous day, is not pinned to it.
+        """
+        if date_time:
+            converter = self._recall((endpoint, date_time[:10]))
+            if converter is not None:
+                return converter
+
+        rates = self._base_foreign_exchange_rates(API[endpoint], "", date_time)
+        if not rates:
+            raise ValueError(f"No exchange rates were published on {date_time or 'the day'}.")
+
+        key = (endpoint, rates[0]["date"][:10])
+        converter = self._recall(key)
+
+        return (
+            converter
+            if converter is not None
+            else self._remember(key, FXConverter.from_records(rates))
+        )
+
+    # Marché obligataire:
+
+    def courbe_BDT(self, date: str = "") -> List[Dict]:
+        """Equivalent of BAMapi.api.courbe_BDT."""
+        querystring = _courbe_BDT_querystring(date)
+
+        return self.get(
+            self._sub_keys("marche_obligataire"), API["courbe_BDT"], querystring
+        )
+
+    def courbe_BDT_curve(self, date: str = "") -> BDTCurve:
+        """Equivalent of BAMapi.api.courbe_BDT_curve.
+
+        The latest ANALYTICS_MAXSIZE curves are kept per dateCourbe, along with their fitted models.
+        """
+        if date:
+            curve = self._recall(("courbe_BDT", date[:10]))
+            if curve is not None:
+                return curve
+
+        records = self.courbe_BDT(date)
+        if not records:
+            raise ValueError(f"No BDT curve was published on {date or 'the previous day'}.")
+
+        key = ("courbe_BDT", records[0]["dateCourbe"][:10])
+        curve = self._recall(key)
+
+        return curve if curve is not None else self._remember(key, BDTCurve.from_records(records))
+
+    def _recall(self, key: Tuple[str, str]) -> Any:
+        with self._analytics_lock:
+            value = self._analytics.get(key)
+            if value is not None:
+                self._analytics.move_to_end(key)
+            return value
+
+    def _remember(self, key: Tuple[str, str], value: T) -> T:
+        with self._analytics_lock:
+            value = self._analytics.setdefault(key, value)
+            self._analytics.move_to_end(key)
+            while len(self._analytics) > ANALYTICS_MAXSIZE:
+                self._analytics.popitem(last=False)
+            return value
+
+    # Marché des adjudications des bons du Trésor:
+
+    def resultat_oprts_politique_monetaire(
+        self,
+        date_adjudication_du: str,
+        date_adjudication_au: str = "",
+        instrument: str = "",
+    ) -> List[Dict]:
+        """Equivalent of BAMapi.api.resultat_oprts_politique_monetaire."""
+        querystring = _oprts_politique_monetaire_querystring(
+            date_adjudication_du, date_adjudication_au, instrument
+        )
+
+        return self.get(
+            self._sub_keys("marche_adjud_des_BT"), API["oprts_de_PM"], querystring
+        )
+
+    def iter_resultat_oprts_politique_monetaire(
+        self,
+        date_adjudication_du: str,
+        date_adjudication_au: str = "",
+        instrument: str = "",
+        record_type: Optional[Type] = None,
+    ) -> Iterator[Any]:
+        """Equivalent of BAMapi.api.iter_resultat_oprts_politique_monetaire.
+
+        The operations are converted into record_type (such as BAMapi.records.PMOperation) if provided.
+        """
+        querystring = _oprts_politique_monetaire_querystring(
+            date_adjudication_du, date_adjudication_au, instrument
+        )
+
+        return self.stream(
+            self._sub_keys("marche_adjud_des_BT"),
+            API["oprts_de_PM"],
+            querystring,
+            record_type,
+        )
+
+    def resultats_emissions_BT(self, date_reglement: str) -> List[Dict]:
+        """Equivalent of BAMapi.api.resultats_emissions_BT."""
+        querystring = _emissions_BT_querystring(date_reglement)
+
+        return self.get(
+            self._sub_keys("marche_adjud_des_BT"), API["emissions_de_BT"], querystring
+        )
+
+    def resultats_oprts_echange_BT(self, date_reglement: str) -> List[Dict]:
+        """Equivalent of BAMapi.api.resultats_oprts_echange_BT."""
+        querystring = _oprts_echange_BT_querystring(date_reglement)
+
+        return self.get(
+            self._sub_keys("marche_adjud_des_BT"),
+            API["oprts_echange_de_BT"],
+            querystring,
+        )
+
+    def close(self) -> None:
+        """Close every connection held by the client, unless its session was provided."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> "BAMClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+_DEFAULT_CLIENT: Optional[BAMClient] = None
+_DEFAULT_CLIENT_LOCK = threading.Lock()
+
+
+def get_default_client() -> BAMClient:
+    """Return the client shared by the top-level functions of BAMapi.api."""
+    global _DEFAULT_CLIENT
+
+    client = _DEFAULT_CLIENT
+    if client is None:
+        # Concurrent first calls share a single client, and a single session.
+        with _DEFAULT_CLIENT_LOCK:
+            if _DEFAULT_CLIENT is None:
+                _DEFAULT_CLIENT = BAMClient()
+            client = _DEFAULT_CLIENT
+
+    return client
+
+
+def set_default_client(client: BAMClient) -> None:
+    """Replace the client shared by the top-level functions of BAMapi.api.
+
+    Args:
+        client:
+          A BAMClient instance, for instance one with a larger connection pool.
+    """
+    global _DEFAULT_CLIENT
+
+    with _DEFAULT_CLIENT_LOCK:
+        _DEFAULT_CLIENT = client
@@ -0,0 +1,140 @@
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+
+# The fields holding a date (or a date and time), converted to datetime64.
+DATE_FIELDS = frozenset(
+    {
+        "date",
+        "dateCourbe",
+        "dateValeur",
+        "dateEcheance",
+        "dateAdjudication",
+        "dateReglement",
+        "dateEcheanceRemp",
+    }
+)
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Columnar results require the numpy package. Please install it with: pip install numpy"
+        ) from e
+    return numpy
+
+
+def _column(np: Any, field: str, values: List[Any]) -> Any:
+    """Convert the values of a field into a typed array."""
+    if field in DATE_FIELDS:
+        return np.array(
+            [value if value else "NaT" for value in values], dtype="datetime64[s]"
+        )
+
+    present = [value for value in values if value is not None]
+
+    if present and all(
+        isinstance(value, int) and not isinstance(value, bool) for value in present
+    ):
+        if len(present) == len(values):
+            return np.array(values, dtype=np.int64)
+        return np.array(values, dtype=np.float64)
+
+    if present and all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in present
+    ):
+        return np.array(values, dtype=np.float64)
+
+    return np.array(["" if value is None else value for value in values], dtype=str)
+
+
+class ColumnarResult:
+    """Columnar representation of an API response: one typed NumPy array per field.
+
+    Storing a response as a handful of arrays, instead of a list of small dictionaries repeating
+    the same keys, cuts the memory footprint of large responses and the cost of converting them.
+    The date fields (refer to DATE_FIELDS) are stored as datetime64, the numeric ones as int64 or
+    float64 (missing values become NaN) and the others as strings. For example:
+
+        >>> result = ColumnarResult.from_records(
+        ...     bam.resultat_oprts_politique_monetaire("2020-01-01", "2023-01-01")
+        ... )
+        >>> result["taux"].mean()
+        >>> result.to_pandas()
+
+    The numpy package is required, and pandas for to_pandas.
+
+    Args:
+        columns:
+          A mapping of field names to arrays of the same length.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Mapping[str, Any]) -> None:
+        self.columns: Dict[str, Any] = dict(columns)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "ColumnarResult":
+        """Build a columnar result out of a list of dictionaries, such as a raw API response."""
+        np = _import_numpy()
+
+        records = list(records)
+
+        fields: Dict[str, None] = {}
+        for record in records:
+            fields.update(dict.fromkeys(record))
+
+        return cls(
+            {
+                field: _column(np, field, [record.get(field) for record in records])
+                for field in fields
+            }
+        )
+
+    @classmethod
+    def from_json(cls, payload: Union[str, bytes]) -> "ColumnarResult":
+        """Build a columnar result out of the raw JSON body of an API response."""
+        return cls.from_records(json.loads(payload) if payload else [])
+
+    @property
+    def fields(self) -> List[str]:
+        """The names of the fields."""
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, field: str) -> Any:
+        return self.columns[field]
+
+    def __repr__(self) -> str:
+        return f"ColumnarResult(rows={len(self)}, fields={self.fields})"
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Return the arrays of the fields, without copying them."""
+        return dict(self.columns)
+
+    def to_pandas(self, index: Optional[str] = None) -> Any:
+        """Return a pandas DataFrame backed by the arrays of the fields.
+
+        Args:
+            index:
+              The optional field used as the index of the DataFrame.
+        """
+        import pandas
+
+        frame = pandas.DataFrame(self.columns, copy=False)
+
+        if index is not None:
+            frame = frame.set_index(index)
+
+        return frame
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Convert the result back into a list of dictionaries, with the dates as datetime objects."""
+        columns = {field: array.tolist() for field, array in self.columns.items()}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
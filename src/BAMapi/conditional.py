@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class PollResult(NamedTuple):
+    """Response to a poll of BAM's API (refer to BAMClient.poll).
+
+    changed is False when the data is the same as the one of the previous poll of the same query,
+    in which case data is the very list returned by that poll.
+    """
+
+    data: List[Dict]
+    changed: bool
+
+
+def _digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class Validators:
+    """Validators of the latest response to a query, to detect whether its data changed.
+
+    The ETag and Last-Modified headers of the response are sent back with the next request of the
+    query (If-None-Match and If-Modified-Since), so that a server supporting them answers with a
+    304 (Not Modified) status code and no body. Otherwise, the hash of the body is compared with
+    the one of the previous response. In both cases, an unchanged body is not decoded again.
+    """
+
+    __slots__ = ("etag", "last_modified", "digest", "records", "_lock")
+
+    def __init__(self) -> None:
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.digest: Optional[bytes] = None
+        self.records: Optional[List[Dict]] = None
+
+        self._lock = threading.Lock()
+
+    def headers(self) -> Dict[str, str]:
+        """Return the conditional headers of the next request."""
+        headers = {}
+
+        if self.records is not None:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def resolve(
+        self, response: Any, decode: Callable[[], List[Dict]]
+    ) -> Tuple[List[Dict], bool]:
+        """Return the records of a response and whether they changed, decoding its body only if it did.
+
+        Both are read under the lock of the validators, so that concurrent requests of the same
+        query each get their own outcome.
+
+        Args:
+            response:
+              The response to the request, already checked by BAMapi.utils._check_bam_response.
+
+            decode:
+              The function decoding the body of the response.
+
+        Raise:
+            ValueError: A 304 (Not Modified) status code, whereas no records were received before.
+        """
+        with self._lock:
+            if response.status_code == 304:
+                if self.records is None:
+                    raise ValueError(
+                        "The API answered 304 (Not Modified) to a query without previous response."
+                    )
+                return self.records, False
+
+            digest = _digest(response.content or b"")
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+
+            if self.records is not None and digest == self.digest:
+                return self.records, False
+
+            self.records = [] if response.status_code == 204 else decode()
+            self.digest = digest
+
+            return self.records, True
@@ -1,11 +1,15 @@
 from types import MappingProxyType
+from typing import Any, Dict, Optional
 
 from BAMapi.utils import _load_api_keys
 
 
 BASE_URL = "https://api.centralbankofmorocco.ma/"
 
-KEYS = _load_api_keys()
+# The API keys are loaded on first access of KEYS and SECONDARY_KEYS (refer to __getattr__),
+# not at import time.
+_KEYS: Optional[Dict[str, str]] = None
+_SECONDARY_KEYS: Optional[Dict[str, str]] = None
 
 INSTRUMENTS = MappingProxyType(
     {
@@ -31,3 +35,44 @@ API = MappingProxyType(
         "oprts_echange_de_BT": BASE_URL + "adju/Version1/api/TELADJEchange",
     }
 )
+
+
+def _get_api_keys() -> Dict[str, str]:
+    """Return the API keys, loading them on the first call (refer to BAMapi.utils._load_api_keys)."""
+    global _KEYS
+
+    if _KEYS is None:
+        _KEYS = _load_api_keys()
+
+    return _KEYS
+
+
+def _get_secondary_api_keys() -> Dict[str, str]:
+    """Return the secondary API keys, loading them on the first call."""
+    global _SECONDARY_KEYS
+
+    if _SECONDARY_KEYS is None:
+        _SECONDARY_KEYS = _load_api_keys(secondary=True)
+
+    return _SECONDARY_KEYS
+
+
+def _reset_api_keys() -> None:
+    """Forget the loaded API keys, so that the next access of KEYS reloads them."""
+    global _KEYS, _SECONDARY_KEYS
+
+    _KEYS = None
+    _SECONDARY_KEYS = None
+    # A value assigned to KEYS would shadow __getattr__.
+    globals().pop("KEYS", None)
+    globals().pop("SECONDARY_KEYS", None)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "KEYS":
+        return _get_api_keys()
+
+    if name == "SECONDARY_KEYS":
+        return _get_secondary_api_keys()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,528 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from BAMapi.columnar import _import_numpy
+
+
+METHODS = ("linear", "cubic", "nelson_siegel", "svensson")
+
+# The decay parameters (in years) tried when fitting Nelson-Siegel and Svensson curves.
+TAU_GRID = (
+    0.1, 0.15, 0.25, 0.35, 0.5, 0.75, 1.0, 1.5, 2.0, 2.5,
+    3.0, 4.0, 5.0, 6.5, 8.0, 10.0, 12.5, 15.0, 20.0, 30.0,
+)
+
+DAYS_PER_YEAR = 365.0
+
+# The standard tenors of BDTPanel, in years: 13, 26 and 52 weeks, then 2 to 30 years.
+TENORS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0)
+
+
+def _points(np: Any, records: Iterable[Mapping[str, Any]]) -> Tuple[str, Any, Any, Any]:
+    """Return the date, and the maturities (in years), rates and volumes sorted by maturity, of a curve.
+
+    Raise:
+        ValueError: No record, or records of several dates.
+    """
+    records = list(records)
+    dates = {record["dateCourbe"][:10] for record in records}
+    if len(dates) != 1:
+        raise ValueError(
+            f"The records must belong to a single curve, got the dates: {sorted(dates)}."
+        )
+
+    date = dates.pop()
+    days = np.array(
+        [record["dateEcheance"][:10] for record in records], dtype="datetime64[D]"
+    ) - np.datetime64(date, "D")
+
+    maturities = days.astype(np.float64) / DAYS_PER_YEAR
+    rates = np.array([record["tmp"] for record in records], dtype=np.float64)
+    volumes = np.array([record.get("volume") or 0.0 for record in records], dtype=np.float64)
+
+    order = np.argsort(maturities, kind="stable")
+    return date, maturities[order], rates[order], volumes[order]
+
+
+def _loadings(np: Any, maturities: Any, tau: float) -> Tuple[Any, Any]:
+    """Return the slope and curvature loadings of Nelson-Siegel, for maturities in years."""
+    x = np.asarray(maturities, dtype=np.float64) / tau
+    small = x < 1e-8
+    x = np.where(small, 1.0, x)
+
+    decay = np.exp(-x)
+    slope = np.where(small, 1.0, (1.0 - decay) / x)
+    curvature = np.where(small, 0.0, slope - decay)
+
+    return slope, curvature
+
+
+def _design(np: Any, maturities: Any, taus: Tuple[float, ...]) -> Any:
+    """Return the design matrix of a Nelson-Siegel (one tau) or Svensson (two taus) curve."""
+    columns = [np.ones(np.shape(maturities))]
+    for i, tau in enumerate(taus):
+        slope, curvature = _loadings(np, maturities, tau)
+        columns.extend([slope, curvature] if i == 0 else [curvature])
+
+    return np.stack(columns, axis=-1)
+
+
+def _fit_parametric(
+    np: Any, maturities: Any, rates: Any, svensson: bool
+) -> Tuple[Any, Tuple[float, ...]]:
+    """Fit the betas by least squares for each tau of the grid, and keep the best fit."""
+    grid: List[Tuple[float, ...]]
+    if svensson:
+        grid = [(t1, t2) for t1 in TAU_GRID for t2 in TAU_GRID if t1 < t2]
+    else:
+        grid = [(tau,) for tau in TAU_GRID]
+
+    def fit(taus: Tuple[float, ...]) -> Tuple[float, Any, Tuple[float, ...]]:
+        design = _design(np, maturities, taus)
+        betas = np.linalg.lstsq(design, rates, rcond=None)[0]
+        return float(np.sum((design @ betas - rates) ** 2)), betas, taus
+
+    _, betas, taus = min((fit(taus) for taus in grid), key=lambda fitted: fitted[0])
+
+    return betas, taus
+
+
+def _second_derivatives(np: Any, x: Any, y: Any) -> Any:
+    """Return the second derivatives of the natural cubic spline through the points (x, y)."""
+    n = len(x)
+    m = np.zeros(n)
+    if n < 3:
+        return m
+
+    h = np.diff(x)
+    slopes = np.diff(y) / h
+
+    system = np.zeros((n - 2, n - 2))
+    index = np.arange(n - 2)
+    system[index, index] = 2.0 * (h[:-1] + h[1:])
+    system[index[1:], index[:-1]] = h[1:-1]
+    system[index[:-1], index[1:]] = h[1:-1]
+
+    m[1:-1] = np.linalg.solve(system, 6.0 * np.diff(slopes))
+    return m
+
+
+class BDTCurve:
+    """Reference curve of the Treasury bills (BDT), built out of a response of courbe_BDT.
+
+    The points of the response are sorted by maturity once and for all, so that the rates of
+    any number of maturities are interpolated in a single vectorized call:
+
+        >>> curve = BDTCurve.from_records(bam.courbe_BDT("2019-01-02"))
+        >>> curve.rates_at([0.25, 1, 5, 10], method="cubic")
+
+    The maturities are expressed in years (actual/365) since the date of the curve (dateCourbe).
+    Several points of the same maturity are merged into their volume-weighted average rate.
+
+    Four methods are available:
+        linear: linear interpolation between the points.
+        cubic: natural cubic spline through the points.
+        nelson_siegel: Nelson-Siegel model, fitted by least squares on the points.
+        svensson: Svensson model, fitted by least squares on the points.
+
+    The interpolations (linear and cubic) extend the rates of the shortest and longest maturities
+    flat beyond the points; the fitted models extrapolate. A model is fitted once per curve, on its
+    first use. The numpy package is required.
+
+    Args:
+        maturities:
+          The maturities of the points, in years.
+
+        rates:
+          The rates (tmp) of the points, in percent.
+
+        volumes:
+          The volumes of the points, weighting the rates of a same maturity. The default value is
+          None (equal weights).
+
+        date:
+          The date of the curve (dateCourbe). The default value is None.
+
+    Raise:
+        ValueError: The curve has no point.
+    """
+
+    __slots__ = ("date", "maturities", "rates", "_fits")
+
+    def __init__(
+        self,
+        maturities: Iterable[float],
+        rates: Iterable[float],
+        volumes: Optional[Iterable[float]] = None,
+        date: Optional[str] = None,
+    ) -> None:
+        np = _import_numpy()
+
+        times = np.asarray(list(maturities), dtype=np.float64)
+        values = np.asarray(list(rates), dtype=np.float64)
+        if volumes is None:
+            sizes = np.ones_like(values)
+        else:
+            sizes = np.nan_to_num(np.asarray(list(volumes), dtype=np.float64))
+
+        if not len(times) or not len(times) == len(values) == len(sizes):
+            raise ValueError("The curve must have as many maturities as rates, and at least one.")
+
+        # Equal weights for the maturities whose points all have a null volume.
+        unique, inverse = np.unique(times, return_inverse=True)
+        weights = np.bincount(inverse, weights=sizes, minlength=len(unique))
+        counts = np.bincount(inverse, minlength=len(unique))
+        sizes = np.where(weights[inverse] > 0, sizes, 1.0)
+        weights = np.where(weights > 0, weights, counts)
+
+        self.date = date
+        self.maturities = unique
+        self.rates = np.bincount(inverse, weights=values * sizes, minlength=len(unique)) / weights
+        self._fits: Dict[str, Any] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "BDTCurve":
+        """Build a curve out of the records returned by courbe_BDT.
+
+        Raise:
+            ValueError: No record, or records of several dates.
+        """
+        date, maturities, rates, volumes = _points(_import_numpy(), records)
+        return cls(maturities, rates, volumes, date=date)
+
+    def __len__(self) -> int:
+        return len(self.maturities)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(date={self.date!r}, points={len(self)})"
+
+    def year_fractions(self, dates: Any) -> Any:
+        """Return the maturities (in years) of dates, such as the maturity dates of bonds."""
+        np = _import_numpy()
+
+        if self.date is None:
+            raise ValueError("The curve has no date.")
+
+        days = np.asarray(dates, dtype="datetime64[D]") - np.datetime64(self.date[:10], "D")
+        return days.astype(np.float64) / DAYS_PER_YEAR
+
+    def parameters(self, method: str) -> Dict[str, Any]:
+        """Return the fitted parameters of a model: the betas and the taus.
+
+        Args:
+            method:
+              Either nelson_siegel or svensson.
+        """
+        if method not in ("nelson_siegel", "svensson"):
+            raise ValueError(f"{method} is not a parametric model.")
+
+        betas, taus = self._fit(method)
+        return {"betas": tuple(betas.tolist()), "taus": taus}
+
+    def _fit(self, method: str) -> Any:
+        fit = self._fits.get(method)
+        if fit is not None:
+            return fit
+
+        np = _import_numpy()
+
+        if method == "cubic":
+            fit = _second_derivatives(np, self.maturities, self.rates)
+        elif method in ("nelson_siegel", "svensson"):
+            svensson = method == "svensson"
+            if len(self) < (4 if svensson else 3):
+                raise ValueError(f"Not enough points to fit a {method} curve: {len(self)}.")
+            fit = _fit_parametric(np, self.maturities, self.rates, svensson)
+        else:
+            raise ValueError(f"Invalid method: {method}. Choose among {', '.join(METHODS)}.")
+
+        self._fits[method] = fit
+        return fit
+
+    def rates_at(self, maturities: Any, method: str = "linear") -> Any:
+        """Return the rates of maturities, in percent.
+
+        Args:
+            maturities:
+              A maturity or an array of maturities, in years.
+
+            method:
+              The interpolation method, among METHODS. The default value is "linear".
+
+        Returns:
+            A float for a single maturity, else an array of the shape of `maturities`.
+
+        Raise:
+            ValueError: Invalid method, or not enough points to fit the model.
+        """
+        np = _import_numpy()
+
+        t = np.asarray(maturities, dtype=np.float64)
+        x, y = self.maturities, self.rates
+
+        if method == "linear":
+            rates = np.interp(t, x, y)
+        elif method == "cubic":
+            m = self._fit(method)
+            if len(x) < 2:
+                rates = np.full(t.shape, y[0])
+            else:
+                t = np.clip(t, x[0], x[-1])
+                i = np.clip(np.searchsorted(x, t), 1, len(x) - 1)
+                h = x[i] - x[i - 1]
+                a = (x[i] - t) / h
+                b = (t - x[i - 1]) / h
+                rates = (
+                    a * y[i - 1]
+                    + b * y[i]
+                    + ((a ** 3 - a) * m[i - 1] + (b ** 3 - b) * m[i]) * h ** 2 / 6.0
+                )
+        else:
+            betas, taus = self._fit(method)
+            rates = _design(np, t, taus) @ betas
+
+        return float(rates) if np.ndim(rates) == 0 else rates
+
+
+class BDTPanel:
+    """History of the BDT reference curve: one row of rates per date, at standard tenors.
+
+    A panel stores the curves of many dates as a few arrays instead of one list of dictionaries
+    per date. The rates of each curve are interpolated (refer to BDTCurve) at the same tenors into
+    a dates × tenors matrix, and the raw points of all the curves are stored end to end, the points
+    of the i-th date spanning the rows offsets[i] to offsets[i + 1] of the points arrays:
+
+        >>> panel = bam.courbe_BDT_panel("2020-01-01", "2023-12-31")
+        >>> panel.rates[:, panel.tenors == 10.0]
+        >>> panel.slice("2023-01-01", "2023-06-30").to_pandas()
+        >>> panel.curve("2023-05-12").rates_at(7.5, method="cubic")
+
+    The dates are sorted, so that slicing a date range costs two binary searches and returns
+    views of the arrays. The numpy package is required, and pandas for to_pandas.
+
+    Args:
+        dates:
+          The dates of the curves, as a sorted datetime64[D] array.
+
+        tenors:
+          The tenors of the columns of `rates`, in years.
+
+        rates:
+          The rates of each date (row) at each tenor (column), in percent.
+
+        offsets:
+          The first row of the points of each date, followed by the number of points.
+
+        maturities, point_rates, volumes:
+          The maturities (in years), rates and volumes of the points.
+    """
+
+    __slots__ = ("dates", "tenors", "rates", "offsets", "maturities", "point_rates", "volumes")
+
+    def __init__(
+        self,
+        dates: Any,
+        tenors: Any,
+        rates: Any,
+        offsets: Any,
+        maturities: Any,
+        point_rates: Any,
+        volumes: Any,
+    ) -> None:
+        self.dates = dates
+        self.tenors = tenors
+        self.rates = rates
+        self.offsets = offsets
+        self.maturities = maturities
+        self.point_rates = point_rates
+        self.volumes = volumes
+
+    @classmethod
+    def from_responses(
+        cls,
+        responses: Iterable[Sequence[Mapping[str, Any]]],
+        tenors: Sequence[float] = TENORS,
+        method: str = "linear",
+    ) -> "BDTPanel":
+        """Build a panel out of responses of courbe_BDT.
+
+        The empty responses are skipped, as well as the curves whose date (dateCourbe) was already
+        given by a previous response.
+
+        Args:
+            responses:
+              The responses of courbe_BDT, one per date.
+
+            tenors:
+              The tenors of the rates matrix, in years. The default value is TENORS.
+
+            method:
+              The interpolation method of the rates at the tenors, refer to BDTCurve.rates_at.
+              The default value is "linear".
+        """
+        np = _import_numpy()
+
+        curves: Dict[str, Tuple[Any, Any, Any]] = {}
+        for records in responses:
+            if records:
+                date, maturities, rates, volumes = _points(np, records)
+                curves.setdefault(date, (maturities, rates, volumes))
+
+        tenors = np.asarray(tenors, dtype=np.float64)
+        dates = sorted(curves)
+        points = [curves[date] for date in dates]
+
+        rates = np.empty((len(dates), len(tenors)))
+        for i, (date, (maturities, point_rates, volumes)) in enumerate(zip(dates, points)):
+            curve = BDTCurve(maturities, point_rates, volumes, date=date)
+            rates[i] = curve.rates_at(tenors, method)
+
+        return cls._concatenate(np, np.array(dates, dtype="datetime64[D]"), tenors, rates, points)
+
+    @staticmethod
+    def _concatenate(
+        np: Any, dates: Any, tenors: Any, rates: Any, points: List[Tuple[Any, Any, Any]]
+    ) -> "BDTPanel":
+        counts = [len(maturities) for maturities, _, _ in points]
+        offsets = np.zeros(len(points) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        columns = [
+            np.concatenate([point[i] for point in points]) if points else np.empty(0)
+            for i in range(3)
+        ]
+
+        return BDTPanel(dates, tenors, rates, offsets, *columns)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return f"{type(self).__name__}(dates=0)"
+        return (
+            f"{type(self).__name__}(dates={len(self)}, "
+            f"from={self.dates[0]}, to={self.dates[-1]}, points={len(self.maturities)})"
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of the arrays of the panel."""
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def _index(self, date: str) -> int:
+        np = _import_numpy()
+
+        day = np.datetime64(date[:10], "D")
+        i = int(np.searchsorted(self.dates, day))
+        if i == len(self.dates) or self.dates[i] != day:
+            raise KeyError(date)
+
+        return i
+
+    def __contains__(self, date: str) -> bool:
+        try:
+            self._index(date)
+        except KeyError:
+            return False
+        return True
+
+    def points(self, date: str) -> Tuple[Any, Any, Any]:
+        """Return the maturities, rates and volumes of the points of a date, as views.
+
+        Raise:
+            KeyError: The panel has no curve on the date.
+        """
+        i = self._index(date)
+        start, stop = self.offsets[i], self.offsets[i + 1]
+
+        return (
+            self.maturities[start:stop],
+            self.point_rates[start:stop],
+            self.volumes[start:stop],
+        )
+
+    def curve(self, date: str) -> BDTCurve:
+        """Return the BDTCurve of a date, built out of its points.
+
+        Raise:
+            KeyError: The panel has no curve on the date.
+        """
+        return BDTCurve(*self.points(date), date=date[:10])
+
+    def slice(self, start: str = "", end: str = "") -> "BDTPanel":
+        """Return the panel of the dates between start and end (both included), as views.
+
+        Args:
+            start:
+              The first date, in the ISO 8601 date format. The default value is "" (the first date).
+
+            end:
+              The last date, in the ISO 8601 date format. The default value is "" (the last date).
+        """
+        np = _import_numpy()
+
+        i = int(np.searchsorted(self.dates, np.datetime64(start[:10], "D"))) if start else 0
+        j = (
+            int(np.searchsorted(self.dates, np.datetime64(end[:10], "D"), side="right"))
+            if end
+            else len(self.dates)
+        )
+        j = max(i, j)
+
+        offsets = self.offsets[i : j + 1]
+        first, last = offsets[0], offsets[-1]
+
+        return BDTPanel(
+            self.dates[i:j],
+            self.tenors,
+            self.rates[i:j],
+            offsets - first,
+            self.maturities[first:last],
+            self.point_rates[first:last],
+            self.volumes[first:last],
+        )
+
+    def extend(self, other: "BDTPanel") -> "BDTPanel":
+        """Return a panel holding the curves of both panels, in date order.
+
+        The curves of `other` whose date is already in the panel are left out.
+
+        Raise:
+            ValueError: The panels have different tenors.
+        """
+        np = _import_numpy()
+
+        if not np.array_equal(self.tenors, other.tenors):
+            raise ValueError("The panels must have the same tenors.")
+
+        new = np.flatnonzero(~np.isin(other.dates, self.dates))
+        dates = np.concatenate([self.dates, other.dates[new]])
+        order = np.argsort(dates, kind="stable")
+
+        rows = [(self, i) for i in range(len(self))] + [(other, i) for i in new]
+        points = []
+        for k in order:
+            panel, i = rows[k]
+            start, stop = panel.offsets[i], panel.offsets[i + 1]
+            points.append(
+                (
+                    panel.maturities[start:stop],
+                    panel.point_rates[start:stop],
+                    panel.volumes[start:stop],
+                )
+            )
+
+        rates = np.concatenate([self.rates, other.rates[new]])[order]
+
+        return self._concatenate(np, dates[order], self.tenors, rates, points)
+
+    def to_pandas(self) -> Any:
+        """Return the rates as a pandas DataFrame, indexed by date, with one column per tenor."""
+        import pandas
+
+        return pandas.DataFrame(
+            self.rates,
+            index=pandas.DatetimeIndex(self.dates, name="dateCourbe"),
+            columns=pandas.Index(self.tenors, name="tenor"),
+            copy=False,
+        )
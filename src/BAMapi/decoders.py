@@ -0,0 +1,107 @@
+import json
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from BAMapi.records import _RecordType
+
+
+DecoderT = Callable[[Union[bytes, str]], Any]
+
+# The supported backends, from the fastest to the slowest.
+BACKENDS = ("orjson", "msgspec", "json")
+
+# The backends of decode_records: msgspec only pays off when it decodes into a schema.
+RECORD_BACKENDS = ("orjson", "json")
+
+
+def _load_backend(name: str) -> DecoderT:
+    if name == "orjson":
+        import orjson
+
+        return orjson.loads
+
+    if name == "msgspec":
+        import msgspec
+
+        return msgspec.json.Decoder().decode
+
+    if name == "json":
+        return json.loads
+
+    raise ValueError(
+        f"Unknown JSON decoder {name}. Please use one of the following decoders: {BACKENDS}."
+    )
+
+
+def get_decoder(name: Optional[str] = None) -> DecoderT:
+    """Return a function decoding a JSON body.
+
+    Args:
+        name:
+          The name of the backend: "orjson", "msgspec" or "json" (the standard library).
+          If no name is provided, the fastest installed backend is used.
+
+    Raise:
+        ValueError: Unknown backend.
+        ImportError: The backend is not installed.
+    """
+    if name is not None:
+        return _load_backend(name)
+
+    return _fastest_backend(BACKENDS)
+
+
+def _fastest_backend(backends: Sequence[str]) -> DecoderT:
+    for backend in backends:
+        try:
+            return _load_backend(backend)
+        except ImportError:
+            pass
+
+    # Unreachable: the standard library backend is always available.
+    return json.loads  # pragma: no cover
+
+
+R = TypeVar("R")
+
+
+def decode_records(
+    payload: Union[bytes, str],
+    record_type: "_RecordType[R]",
+    decoder: Optional[DecoderT] = None,
+) -> List[R]:
+    """Decode a JSON body into a list of typed records (refer to BAMapi.records).
+
+    The body is decoded into dictionaries by orjson when it is installed, and by the standard
+    library otherwise, then each dictionary is converted by record_type.from_dict. msgspec is not
+    used by default: it cannot decode JSON objects into NamedTuples, and decoding into plain
+    dictionaries is not faster with it.
+
+    Args:
+        payload:
+          The raw body of a response.
+
+        record_type:
+          The record type of the endpoint, such as BAMapi.records.FXRate.
+
+        decoder:
+          The function decoding the body. The default value is orjson when it is installed,
+          and the standard library otherwise.
+    """
+    if not payload:
+        return []
+
+    rows: List[Dict[str, Any]] = (decoder or _fastest_backend(RECORD_BACKENDS))(payload)
+
+    from_dict = record_type.from_dict
+    return [from_dict(row) for row in rows]
@@ -1,6 +1,12 @@
+from typing import Optional
+
+
 class InvalidAPIKeys(Exception):
     pass
 
 
 class RateLimitExceededError(Exception):
-    pass
+    def __init__(self, message: str = "", retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        # The number of seconds to wait before retrying, when the API provides it.
+        self.retry_after = retry_after
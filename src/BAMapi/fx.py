@@ -0,0 +1,214 @@
+from typing import Any, Iterable, Mapping, Optional, Tuple, Union
+
+from BAMapi.columnar import _import_numpy
+
+
+# The currency in which BAM quotes the exchange rates.
+BASE_CURRENCY = "MAD"
+
+SIDES = ("mid", "buy", "sell")
+
+
+class FXConverter:
+    """Currency converter built out of a table of exchange rates of cours_BBE or cours_virement.
+
+    BAM quotes the price in dirhams of `uniteDevise` units of each currency (such as 100 NOK).
+    The converter brings every quote down to a single unit, then precomputes the dense matrix of
+    the cross rates of every pair of currencies (MAD included), so that converting any number of
+    amounts is a single vectorized lookup:
+
+        >>> converter = FXConverter.from_records(bam.cours_BBE(date_time="2023-05-12"))
+        >>> converter.convert([100.0, 2500.0], "EUR", "USD")
+        >>> converter.convert(amounts, from_currencies, to_currencies, side="buy")
+
+    Three matrices are available, the rate of the row currency expressed in the column currency:
+        mid: the mid rates (moyen, or the average of achatClientele and venteClientele).
+        buy: the rates at which the bank buys the row currency against the column one,
+          i.e. the amount received by a client selling one unit of the row currency.
+        sell: the rates at which the bank sells the row currency against the column one,
+          i.e. the amount paid by a client buying one unit of the row currency.
+
+    cours_virement only quotes mid rates, which the three matrices then share. The numpy package
+    is required.
+
+    Args:
+        currencies:
+          The labels of the currencies, MAD excluded.
+
+        mid, buy, sell:
+          The prices in dirhams of one unit of each currency.
+
+        date:
+          The date of the exchange rates. The default value is None.
+    """
+
+    __slots__ = ("date", "currencies", "_index", "_matrices")
+
+    def __init__(
+        self,
+        currencies: Iterable[str],
+        mid: Iterable[float],
+        buy: Iterable[float],
+        sell: Iterable[float],
+        date: Optional[str] = None,
+    ) -> None:
+        np = _import_numpy()
+
+        self.date = date
+        self.currencies: Tuple[str, ...] = (BASE_CURRENCY, *currencies)
+        self._index = {currency: i for i, currency in enumerate(self.currencies)}
+
+        if len(self._index) != len(self.currencies):
+            raise ValueError("The currencies must be unique.")
+
+        mids, buys, sells = (
+            np.concatenate([[1.0], np.asarray(list(prices), dtype=np.float64)])
+            for prices in (mid, buy, sell)
+        )
+        if not len(mids) == len(buys) == len(sells) == len(self.currencies):
+            raise ValueError("Every currency must have a mid, buy and sell price.")
+
+        # Converting a currency into itself is free of any spread.
+        self._matrices = {
+            "mid": mids[:, None] / mids[None, :],
+            "buy": buys[:, None] / sells[None, :],
+            "sell": sells[:, None] / buys[None, :],
+        }
+        for matrix in self._matrices.values():
+            np.fill_diagonal(matrix, 1.0)
+            matrix.flags.writeable = False
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "FXConverter":
+        """Build a converter out of a response of cours_BBE or cours_virement (all currencies).
+
+        The API may quote a currency several times: its first quote is kept.
+
+        Raise:
+            ValueError: No exchange rate.
+        """
+        records = list(records)
+        if not records:
+            raise ValueError("No exchange rate to build a converter from.")
+
+        currencies, mid, buy, sell = [], [], [], []
+        for record in records:
+            if record["libDevise"] in currencies or record["libDevise"] == BASE_CURRENCY:
+                continue
+
+            unit = record.get("uniteDevise") or 1
+
+            if "moyen" in record:
+                rates = (record["moyen"],) * 3
+            else:
+                buying, selling = record["achatClientele"], record["venteClientele"]
+                rates = ((buying + selling) / 2, buying, selling)
+
+            currencies.append(record["libDevise"])
+            mid.append(rates[0] / unit)
+            buy.append(rates[1] / unit)
+            sell.append(rates[2] / unit)
+
+        return cls(currencies, mid, buy, sell, date=records[0].get("date"))
+
+    def __len__(self) -> int:
+        return len(self.currencies)
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self._index
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(date={self.date!r}, currencies={len(self)})"
+
+    def matrix(self, side: str = "mid") -> Any:
+        """Return the read-only N×N matrix of the cross rates of a side, in the order of `currencies`.
+
+        Raise:
+            ValueError: Invalid side.
+        """
+        try:
+            return self._matrices[side]
+        except KeyError:
+            raise ValueError(f"Invalid side: {side}. Choose among {', '.join(SIDES)}.") from None
+
+    def _indices(self, np: Any, currencies: Union[str, Iterable[str]]) -> Any:
+        """Return the index of a currency, or the array of the indices of an array of currencies."""
+        if isinstance(currencies, str):
+            try:
+                return self._index[currencies]
+            except KeyError:
+                raise ValueError(f"Unknown currency: {currencies}.") from None
+
+        array = np.asarray(currencies)
+        if array.dtype.kind in "iu":
+            return array
+
+        # The labels are looked up once per distinct currency, however long the array.
+        labels, inverse = np.unique(array.astype(str), return_inverse=True)
+        return np.array([self._indices(np, str(label)) for label in labels], dtype=np.intp)[
+            inverse.reshape(array.shape)
+        ]
+
+    def codes(self, currencies: Union[str, Iterable[str]]) -> Any:
+        """Return the positions in `currencies` of labels, to be given to convert instead of the labels.
+
+        Looking up the labels of long arrays dominates the cost of a conversion: the codes of the
+        currencies of a book can be computed once, and reused for every conversion.
+
+        Raise:
+            ValueError: Unknown currency.
+        """
+        return self._indices(_import_numpy(), currencies)
+
+    def rate(self, from_currency: str, to_currency: str, side: str = "mid") -> float:
+        """Return the price in `to_currency` of one unit of `from_currency`.
+
+        Raise:
+            ValueError: Unknown currency or invalid side.
+        """
+        np = _import_numpy()
+
+        matrix = self.matrix(side)
+        return float(matrix[self._indices(np, from_currency), self._indices(np, to_currency)])
+
+    def convert(
+        self,
+        amounts: Any,
+        from_currency: Union[str, Iterable[str]],
+        to_currency: Union[str, Iterable[str]],
+        side: str = "mid",
+    ) -> Any:
+        """Convert amounts from a currency into another.
+
+        Args:
+            amounts:
+              An amount or an array of amounts, in `from_currency`.
+
+            from_currency, to_currency:
+              The label of a currency, or an array of labels (or of their codes) of the shape
+              of `amounts`.
+
+            side:
+              The cross rates to apply, among SIDES. The default value is "mid".
+
+        Returns:
+            A float for a single amount, else an array of the converted amounts.
+
+        Raise:
+            ValueError: Unknown currency or invalid side.
+        """
+        np = _import_numpy()
+
+        matrix = self.matrix(side)
+        rates = matrix[self._indices(np, from_currency), self._indices(np, to_currency)]
+        converted = np.multiply(amounts, rates)
+
+        return float(converted) if np.ndim(converted) == 0 else converted
+
+    def to_pandas(self, side: str = "mid") -> Any:
+        """Return the matrix of a side as a pandas DataFrame, indexed and labelled by currency."""
+        import pandas
+
+        return pandas.DataFrame(
+            self.matrix(side), index=self.currencies, columns=self.currencies, copy=False
+        )
@@ -0,0 +1,186 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
+
+
+def _as_keys(sub_key: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    """Return the keys of a service, given either a single key or a sequence of keys."""
+    if isinstance(sub_key, str):
+        return (sub_key,)
+    return tuple(sub_key)
+
+
+def _freeze_keys(
+    keys: Mapping[str, Union[str, Sequence[str]]]
+) -> Mapping[str, Tuple[str, ...]]:
+    """Return a read-only copy of the keys of each service, as tuples without empty keys."""
+    return MappingProxyType(
+        {
+            service: tuple(key for key in _as_keys(value) if key)
+            for service, value in keys.items()
+        }
+    )
+
+
+def _stored_keys(service: str) -> Tuple[str, ...]:
+    """Return the primary and secondary keys of a service stored by BAMapi.set_api_keys."""
+    # The keys can be overwritten at runtime by set_api_keys, hence the late lookup.
+    from BAMapi import constants
+
+    keys = (constants.KEYS[service], constants.SECONDARY_KEYS.get(service, ""))
+    return tuple(key for key in keys if key) or ("",)
+
+
+class KeyPool:
+    """Spread the requests of a service over its subscription keys, and track their health.
+
+    Each service of BAM's API issues a primary and a secondary key (refer to BAMapi.set_api_keys),
+    each with its own quota. The pool picks the keys of a service in turn (round robin), which
+    doubles the effective quota, and takes a failing key out of the rotation for a cool-down
+    period, during which the requests fail over to the other key.
+
+        >>> client = bam.BAMClient(key_pool=KeyPool(cooldown=600))
+
+    Args:
+        cooldown:
+          The number of seconds a key rejected by the API (status code 401) stays out of the
+          rotation. The default value is 300.
+
+        rate_limit_cooldown:
+          The number of seconds a key exceeding its rate limit (status code 429) stays out of the
+          rotation, when the API does not tell how long to wait. The default value is 1.
+    """
+
+    def __init__(self, cooldown: float = 300, rate_limit_cooldown: float = 1) -> None:
+        self.cooldown = cooldown
+        self.rate_limit_cooldown = rate_limit_cooldown
+
+        self._lock = threading.Lock()
+        self._turns: Dict[Tuple[str, ...], int] = {}
+        self._unhealthy_until: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+
+    def is_healthy(self, key: str) -> bool:
+        """Whether a key is in the rotation."""
+        with self._lock:
+            return self._unhealthy_until.get(key, 0.0) <= time.monotonic()
+
+    def choose(
+        self, keys: Sequence[str], exclude: Sequence[str] = ()
+    ) -> Optional[str]:
+        """Return the next healthy key of a service, in round robin order.
+
+        Args:
+            keys:
+              The keys of the service, such as (primary, secondary).
+
+            exclude:
+              The keys already tried by the current request.
+
+        Returns:
+            A key, or None if every key is either excluded or cooling down.
+        """
+        keys = tuple(keys)
+
+        with self._lock:
+            now = time.monotonic()
+            turn = self._turns.get(keys, 0)
+
+            for offset in range(len(keys)):
+                key = keys[(turn + offset) % len(keys)]
+
+                if key not in exclude and self._unhealthy_until.get(key, 0.0) <= now:
+                    self._turns[keys] = turn + offset + 1
+                    return key
+
+        return None
+
+    def next_key(self, keys: Sequence[str], tried: Sequence[str] = ()) -> str:
+        """Return the key to send a request with.
+
+        The next healthy key not tried yet by the request, or else the one whose cool-down ends first.
+        """
+        if len(keys) == 1:
+            return keys[0]
+
+        key = self.choose(keys, exclude=tried)
+        if key is not None:
+            return key
+
+        candidates = [key for key in keys if key not in tried] or list(keys)
+        with self._lock:
+            return min(candidates, key=lambda key: self._unhealthy_until.get(key, 0.0))
+
+    def fail_over(
+        self, keys: Sequence[str], tried: Sequence[str], key: str, error: Exception
+    ) -> bool:
+        """Take a key out of the rotation after an error, and tell whether to retry with another key.
+
+        Args:
+            keys:
+              The keys of the service.
+
+            tried:
+              The keys already tried by the request, including the failing one.
+
+            key:
+              The failing key.
+
+            error:
+              Either InvalidAPIKeys (status code 401) or RateLimitExceededError (status code 429).
+
+        Returns:
+            True if another key can be tried straight away. A rejected key fails over to any other
+            key, a rate limited one only to a healthy key: otherwise the caller backs off.
+        """
+        if len(keys) < 2:
+            return False
+
+        if isinstance(error, RateLimitExceededError):
+            retry_after = error.retry_after
+            self.report_failure(
+                key, self.rate_limit_cooldown if retry_after is None else retry_after
+            )
+            return any(other not in tried and self.is_healthy(other) for other in keys)
+
+        if isinstance(error, InvalidAPIKeys):
+            self.report_failure(key)
+            return any(other not in tried for other in keys)
+
+        return False
+
+    def report_failure(self, key: str, cooldown: Optional[float] = None) -> None:
+        """Take a key out of the rotation.
+
+        Args:
+            key:
+              The failing key.
+
+            cooldown:
+              The number of seconds the key stays out of the rotation. The default value is `cooldown`.
+        """
+        with self._lock:
+            until = time.monotonic() + (self.cooldown if cooldown is None else cooldown)
+            self._unhealthy_until[key] = max(self._unhealthy_until.get(key, 0.0), until)
+            self._failures[key] = self._failures.get(key, 0) + 1
+
+    def report_success(self, key: str) -> None:
+        """Put a key back into the rotation."""
+        with self._lock:
+            self._unhealthy_until.pop(key, None)
+            self._failures.pop(key, None)
+
+    def health(self) -> Dict[str, Dict[str, float]]:
+        """Return the number of consecutive failures and the remaining cool-down of each failing key."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                key: {
+                    "failures": self._failures[key],
+                    "cooldown": max(0.0, self._unhealthy_until.get(key, 0.0) - now),
+                }
+                for key in self._failures
+            }
@@ -0,0 +1,205 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence
+
+
+class RequestEvent(NamedTuple):
+    """Report of a request handled by a BAMClient, passed to the hooks of the client.
+
+    One event is reported per call of BAMClient.get that is either served from the cache or
+    sent to the API. The timings are in seconds.
+
+    requests does not expose the DNS resolution, connection and TLS handshake timings of a
+    request, hence they are always None. They are part of the time to first byte (ttfb) of the
+    requests opening a new connection (reused_connection is False).
+    """
+
+    endpoint: str
+    querystring: Dict
+    cache_hit: bool
+    status_code: Optional[int] = None
+    retries: int = 0
+    reused_connection: Optional[bool] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    ttfb: Optional[float] = None
+    download: Optional[float] = None
+    decode: Optional[float] = None
+    size: Optional[int] = None
+    total: float = 0.0
+    error: Optional[str] = None
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _quantile(ordered: Sequence[float], q: float) -> float:
+    """Return a quantile of sorted values, interpolating linearly between the closest ranks."""
+    if not ordered:
+        return float("nan")
+
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _EndpointMetrics:
+    __slots__ = ("latencies", "count", "total", "errors", "cache_hits", "retries", "size", "decode")
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.size = 0
+        self.decode = 0.0
+
+
+class MetricsAggregator:
+    """In-memory aggregator of RequestEvent, to be installed as a hook of a client.
+
+        >>> metrics = MetricsAggregator()
+        >>> client = bam.BAMClient(hooks=[metrics])
+        >>> client.courbe_BDT("2019-01-02")
+        >>> metrics.percentiles("courbe_BDT")
+        {'p50': 0.182, 'p95': 0.182, 'p99': 0.182}
+        >>> print(metrics.to_prometheus())
+
+    Args:
+        window:
+          The number of latest latencies kept per endpoint to compute the percentiles.
+          The counters are not windowed. The default value is 10000.
+    """
+
+    def __init__(self, window: int = 10000) -> None:
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointMetrics] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            metrics = self._endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self._endpoints[event.endpoint] = _EndpointMetrics(self.window)
+
+            if not event.cache_hit:
+                # The cache hits would pull the percentiles of the API's latency toward zero.
+                metrics.latencies.append(event.total)
+            metrics.count += 1
+            metrics.total += event.total
+            metrics.errors += event.error is not None
+            metrics.cache_hits += event.cache_hit
+            metrics.retries += event.retries
+            metrics.size += event.size or 0
+            metrics.decode += event.decode or 0.0
+
+    @property
+    def endpoints(self) -> List[str]:
+        """The names of the endpoints that reported at least one event."""
+        with self._lock:
+            return list(self._endpoints)
+
+    def percentiles(self, endpoint: str) -> Dict[str, float]:
+        """Return the median (p50), p95 and p99 latencies of an endpoint, in seconds.
+
+        The responses served by the cache are left out.
+        """
+        with self._lock:
+            ordered = sorted(self._endpoints[endpoint].latencies)
+
+        return {f"p{round(q * 100)}": _quantile(ordered, q) for q in QUANTILES}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return the percentiles and the counters of every endpoint."""
+        summary = {}
+
+        for endpoint in self.endpoints:
+            with self._lock:
+                metrics = self._endpoints[endpoint]
+                counters = {
+                    "count": metrics.count,
+                    "errors": metrics.errors,
+                    "cache_hits": metrics.cache_hits,
+                    "retries": metrics.retries,
+                    "bytes": metrics.size,
+                    "decode_seconds": metrics.decode,
+                }
+
+            summary[endpoint] = {**self.percentiles(endpoint), **counters}
+
+        return summary
+
+    def reset(self) -> None:
+        """Forget every event."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_prometheus(self, openmetrics: bool = False) -> str:
+        """Export the metrics in the Prometheus text exposition format.
+
+        Args:
+            openmetrics:
+              Whether to follow the OpenMetrics text format instead, whose counter families are
+              named without the _total suffix and which ends with "# EOF". The default value is False.
+        """
+        with self._lock:
+            endpoints = {
+                endpoint: (
+                    sorted(metrics.latencies),
+                    metrics.count,
+                    metrics.total,
+                    {
+                        "errors": metrics.errors,
+                        "cache_hits": metrics.cache_hits,
+                        "retries": metrics.retries,
+                        "response_bytes": metrics.size,
+                        "decode_seconds": metrics.decode,
+                    },
+                )
+                for endpoint, metrics in self._endpoints.items()
+            }
+
+        lines = [
+            "# HELP bamapi_request_duration_seconds Duration of the requests handled by BAMapi.",
+            "# TYPE bamapi_request_duration_seconds summary",
+        ]
+        for endpoint, (ordered, count, total, _) in endpoints.items():
+            label = f'endpoint="{_escape(endpoint)}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'bamapi_request_duration_seconds{{{label},quantile="{q}"}} '
+                    f"{_quantile(ordered, q)!r}"
+                )
+            lines.append(f"bamapi_request_duration_seconds_sum{{{label}}} {total!r}")
+            lines.append(f"bamapi_request_duration_seconds_count{{{label}}} {count}")
+
+        for counter, help_text in (
+            ("errors", "Requests that raised an exception."),
+            ("cache_hits", "Requests served from the cache."),
+            ("retries", "Requests retried after a 401 or 429 response."),
+            ("response_bytes", "Size of the response bodies."),
+            ("decode_seconds", "Time spent decoding the response bodies."),
+        ):
+            family = f"bamapi_{counter}" if openmetrics else f"bamapi_{counter}_total"
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} counter")
+            for endpoint, (_, _, _, counters) in endpoints.items():
+                lines.append(
+                    f'bamapi_{counter}_total{{endpoint="{_escape(endpoint)}"}} '
+                    f"{counters[counter]!r}"
+                )
+
+        if openmetrics:
+            lines.append("# EOF")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,294 @@
+import random
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from BAMapi.cache import PUBLICATION_TIMES, _in_timezone, _now
+from BAMapi.client import BAMClient, get_default_client
+from BAMapi.constants import API
+from BAMapi.exceptions import RateLimitExceededError
+from BAMapi.utils import _courbe_BDT_querystring, _foreign_exchange_rates_querystring
+
+
+# The service, the date field of the records and the lag (in days) of the data published on a day,
+# for each endpoint with a known publication time. The curve published on a day is the one of the
+# previous day.
+ENDPOINTS = {
+    "cours_BBE": ("marche_des_changes", "date", 0),
+    "cours_virement": ("marche_des_changes", "date", 0),
+    "courbe_BDT": ("marche_obligataire", "dateCourbe", 1),
+}
+
+SubscriberT = Callable[[str, List[Dict]], None]
+
+
+def _querystrings(endpoint: str, day: date) -> Tuple[dict, dict]:
+    """Return the query strings of the latest data of an endpoint: without a date, and with its date."""
+    if endpoint == "courbe_BDT":
+        return _courbe_BDT_querystring(), _courbe_BDT_querystring(day.isoformat())
+
+    return (
+        _foreign_exchange_rates_querystring(),
+        _foreign_exchange_rates_querystring("", day.isoformat()),
+    )
+
+
+class Prefetcher:
+    """Background thread fetching the new data of BAM's API as soon as it is published.
+
+    Each endpoint publishes its data at a known Casablanca time, whatever the time zone of the host
+    (refer to BAMapi.cache.PUBLICATION_TIMES): 08:30 for cours_BBE, 12:30 for cours_virement and
+    midnight for the curve of the previous day (courbe_BDT). From its publication time on, the
+    prefetcher polls the full table of each endpoint, with an exponential backoff, until the data
+    of the day appears. The data is then
+    stored in the cache of the client, so that the requests of the day are served without waiting
+    on the network, and passed to the subscribers:
+
+        >>> client = bam.BAMClient(cache=bam.MemoryCache())
+        >>> prefetcher = Prefetcher(client)
+        >>> prefetcher.subscribe(lambda endpoint, data: print(endpoint, len(data)))
+        >>> prefetcher.start()
+
+    The cached queries are the ones of the full table, with an empty date and with the date of
+    the data, such as bam.cours_BBE() and bam.cours_BBE(date_time="2023-05-12") (or any currency,
+    if the client has fx_snapshots). The first poll of each endpoint happens on start, to warm
+    the cache. The days without publication (week-ends) are not polled.
+
+    Args:
+        client:
+          The client whose cache is filled. The default value is the default client.
+
+        endpoints:
+          The names of the polled endpoints, among ENDPOINTS. The default value is all of them.
+
+        jitter:
+          The maximum number of seconds (drawn at random) by which the first poll after a
+          publication time is delayed, so that several processes do not poll at the same time.
+          The default value is 60.
+
+        backoff:
+          The number of seconds before the second poll, doubled after each poll finding no new
+          data. The default value is 30.
+
+        max_backoff:
+          The maximum number of seconds between two polls. The default value is 600.
+
+        deadline:
+          The number of seconds after a publication time after which the prefetcher stops polling,
+          until the next publication time. The default value is 10800 (3 hours).
+
+    Raise:
+        ValueError: The client has no cache, or an endpoint has no known publication time.
+    """
+
+    def __init__(
+        self,
+        client: Optional[BAMClient] = None,
+        endpoints: Iterable[str] = tuple(ENDPOINTS),
+        jitter: float = 60,
+        backoff: float = 30,
+        max_backoff: float = 600,
+        deadline: float = 10800,
+    ) -> None:
+        self.client = client if client is not None else get_default_client()
+        self.endpoints = tuple(endpoints)
+        self.jitter = jitter
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+        if self.client.cache is None:
+            raise ValueError("The client must have a cache to prefetch into.")
+
+        for endpoint in self.endpoints:
+            if endpoint not in ENDPOINTS:
+                raise ValueError(
+                    f"Invalid endpoint: {endpoint}. Choose among {', '.join(ENDPOINTS)}."
+                )
+
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._subscribers: List[Tuple[SubscriberT, Optional[Sequence[str]]]] = []
+        self._next_runs: Dict[str, datetime] = {}
+        self._attempts: Dict[str, int] = dict.fromkeys(self.endpoints, 0)
+        self._published: Dict[str, date] = {}
+        self._errors: Dict[str, str] = {}
+
+    def subscribe(
+        self, callback: SubscriberT, endpoints: Optional[Sequence[str]] = None
+    ) -> None:
+        """Call a function with the name of an endpoint and its data, whenever new data is published.
+
+        Args:
+            callback:
+              The function, called from the thread of the prefetcher. Its exceptions are ignored,
+              and reported by status.
+
+            endpoints:
+              The names of the endpoints of interest. The default value is None (all of them).
+        """
+        with self._lock:
+            self._subscribers.append((callback, endpoints))
+
+    @staticmethod
+    def _latest_publication(endpoint: str, now: datetime) -> datetime:
+        """Return the last publication time of an endpoint, at or before now (in Casablanca time)."""
+        publication = datetime.combine(now.date(), PUBLICATION_TIMES[endpoint], now.tzinfo)
+        if publication > now:
+            publication -= timedelta(days=1)
+        return publication
+
+    def _expected(self, endpoint: str, now: datetime) -> date:
+        """Return the date of the data of the last publication of an endpoint."""
+        lag = ENDPOINTS[endpoint][2]
+        return self._latest_publication(endpoint, now).date() - timedelta(days=lag)
+
+    def poll(self, endpoint: str, now: Optional[datetime] = None) -> bool:
+        """Fetch the latest data of an endpoint, and cache it if it is the one of the last publication.
+
+        The subscribers are notified once per publication.
+
+        Returns:
+            Whether the data of the last publication is available.
+
+        Raise:
+            InvalidAPIKeys: Invalid API key(s).
+            RateLimitExceededError: Rate limit on GET requests has exceeded.
+            Possibly any exception that has requests.exceptions.RequestException as a base.
+        """
+        now = _in_timezone(now) if now is not None else _now()
+        service, field, _ = ENDPOINTS[endpoint]
+        expected = self._expected(endpoint, now)
+        querystrings = _querystrings(endpoint, expected)
+
+        url = API[endpoint]
+        client = self.client
+        cache = client.cache
+        if cache is None:
+            raise ValueError("The client must have a cache to prefetch into.")
+
+        # The response is cached below only if it holds the new data.
+        data = client._fetch(client._sub_keys(service), url, querystrings[0], cache=False)
+
+        if not data or data[0].get(field, "")[:10] < expected.isoformat():
+            return False
+
+        for querystring in querystrings:
+            cache.set(url, querystring, data)
+            if client.fx_snapshots is not None and endpoint != "courbe_BDT":
+                client.fx_snapshots.cache.set(url, querystring, data)
+
+        with self._lock:
+            if self._published.get(endpoint) == expected:
+                return True
+            self._published[endpoint] = expected
+            subscribers = list(self._subscribers)
+
+        for callback, endpoints in subscribers:
+            if endpoints is None or endpoint in endpoints:
+                try:
+                    callback(endpoint, data)
+                except Exception as e:
+                    name = getattr(callback, "__name__", repr(callback))
+                    self._errors[endpoint] = f"{name}: {e!r}"
+
+        return True
+
+    def _jitter(self) -> timedelta:
+        return timedelta(seconds=self._random.uniform(0, self.jitter))
+
+    def _schedule(
+        self,
+        endpoint: str,
+        now: datetime,
+        available: bool,
+        retry_after: Optional[float] = None,
+    ) -> datetime:
+        """Return the time of the next poll of an endpoint, given the outcome of the last one."""
+        publication = self._latest_publication(endpoint, now)
+        expected = self._expected(endpoint, now)
+
+        if (
+            available
+            or expected.weekday() >= 5
+            or now >= publication + timedelta(seconds=self.deadline)
+        ):
+            self._attempts[endpoint] = 0
+            return publication + timedelta(days=1) + self._jitter()
+
+        delay = min(self.max_backoff, self.backoff * 2 ** self._attempts[endpoint])
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self._attempts[endpoint] += 1
+
+        return now + timedelta(seconds=delay)
+
+    def run_pending(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Poll the endpoints whose poll is due, and return the time of the next poll.
+
+        An aware now is converted to Casablanca time, a naive one is taken as Casablanca time.
+        """
+        now = _in_timezone(now) if now is not None else _now()
+
+        for endpoint in self.endpoints:
+            if self._next_runs.get(endpoint, now) > now:
+                continue
+
+            available, retry_after = False, None
+            self._errors.pop(endpoint, None)
+            if self._expected(endpoint, now).weekday() < 5:
+                try:
+                    available = self.poll(endpoint, now)
+                except RateLimitExceededError as e:
+                    retry_after = e.retry_after
+                    self._errors[endpoint] = repr(e)
+                except Exception as e:
+                    self._errors[endpoint] = repr(e)
+
+            self._next_runs[endpoint] = self._schedule(endpoint, now, available, retry_after)
+
+        return min(self._next_runs.values(), default=None)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            next_run = self.run_pending()
+            if next_run is None:
+                return
+            self._stop.wait(max(0.0, (next_run - _now()).total_seconds()))
+
+    def start(self) -> "Prefetcher":
+        """Poll the endpoints from a background (daemon) thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="bamapi-prefetcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background thread, and wait for its current poll to end."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self) -> "Prefetcher":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def status(self) -> Dict[str, Dict]:
+        """Return the next poll, the date of the latest data and the last error of each endpoint."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "next_run": self._next_runs.get(endpoint),
+                    "published": self._published.get(endpoint),
+                    "attempts": self._attempts[endpoint],
+                    "error": self._errors.get(endpoint),
+                }
+                for endpoint in self.endpoints
+            }
@@ -0,0 +1,122 @@
+import random
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+
+class TokenBucket:
+    """Token bucket spreading the requests sent with a subscription key over time.
+
+    Args:
+        rate:
+          The number of tokens (requests) added to the bucket per second.
+
+        capacity:
+          The maximum number of tokens of the bucket, in other words the size of the bursts
+          allowed after an idle period. The default value is max(rate, 1).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token, and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Take a token, blocking until it is available."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self, delay: float) -> None:
+        """Drain the bucket so that no token is available before `delay` seconds."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -delay * self.rate)
+
+
+class RateLimiter:
+    """One token bucket per subscription key.
+
+    Each service of BAM's API (refer to BAMapi.set_api_keys) has its own subscription key and
+    its own quota, hence its own bucket.
+
+        >>> client = bam.BAMClient(rate_limiter=RateLimiter(rate=5))
+
+    Args:
+        rate:
+          The number of requests per second allowed for each subscription key.
+
+        capacity:
+          The size of the bursts allowed for each subscription key. The default value is max(rate, 1).
+
+        rates:
+          An optional mapping of subscription keys to their own number of requests per second.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        rates: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.rates = dict(rates or {})
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, sub_key: str) -> TokenBucket:
+        """Return the bucket of a subscription key."""
+        with self._lock:
+            if sub_key not in self._buckets:
+                rate = self.rates.get(sub_key, self.rate)
+                self._buckets[sub_key] = TokenBucket(rate, self.capacity)
+            return self._buckets[sub_key]
+
+    def reserve(self, sub_key: str) -> float:
+        """Take a token for a subscription key, and return the number of seconds to wait before using it."""
+        return self.bucket(sub_key).reserve()
+
+    def acquire(self, sub_key: str) -> None:
+        """Take a token for a subscription key, blocking until it is available."""
+        self.bucket(sub_key).acquire()
+
+    def penalize(self, sub_key: str, delay: float) -> None:
+        """Hold back every request sent with a subscription key for `delay` seconds."""
+        self.bucket(sub_key).penalize(delay)
+
+
+def _backoff_delay(
+    attempt: int, backoff_factor: float, retry_after: Optional[float] = None
+) -> float:
+    """Return the delay before retrying a request that exceeded the rate limit.
+
+    The delay requested by the API (Retry-After) is honoured when it is known, otherwise it grows
+    exponentially with the number of attempts. A random jitter keeps the clients that hit the limit
+    at the same moment from retrying together.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, backoff_factor)
+
+    return random.uniform(0, backoff_factor * 2**attempt)
@@ -0,0 +1,246 @@
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import (
+    Any,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Protocol,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
+
+
+R = TypeVar("R")
+R_co = TypeVar("R_co", covariant=True)
+
+
+class _RecordType(Protocol[R_co]):
+    """A record type, such as FXRate: a class built from a dictionary of the API."""
+
+    def from_dict(self, record: Mapping[str, Any]) -> R_co:
+        ...  # pragma: no cover
+
+
+@overload
+def _parse_date(value: str) -> date:
+    ...  # pragma: no cover
+
+
+@overload
+def _parse_date(value: None) -> None:
+    ...  # pragma: no cover
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse the date part of an ISO 8601 string, such as '2023-04-25T00:00:00'."""
+    if not value:
+        return None
+    return date.fromisoformat(value[:10])
+
+
+@overload
+def _parse_datetime(value: str) -> datetime:
+    ...  # pragma: no cover
+
+
+@overload
+def _parse_datetime(value: None) -> None:
+    ...  # pragma: no cover
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 date and time string, such as '2023-05-11T08:30:00'."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+class FXRate(NamedTuple):
+    """Exchange rate of a currency (cours_BBE and cours_virement).
+
+    The banknote rates (cours_BBE) fill achatClientele and venteClientele,
+    the transfer rates (cours_virement) fill moyen.
+    """
+
+    date: datetime
+    libDevise: str
+    uniteDevise: int
+    achatClientele: Optional[float] = None
+    venteClientele: Optional[float] = None
+    moyen: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any]) -> "FXRate":
+        return cls(
+            _parse_datetime(record["date"]),
+            record["libDevise"],
+            record["uniteDevise"],
+            record.get("achatClientele"),
+            record.get("venteClientele"),
+            record.get("moyen"),
+        )
+
+
+class BDTPoint(NamedTuple):
+    """Point of the reference curve of the treasury bills (courbe_BDT).
+
+    The volume is denoted in units of millions of Moroccan Dirhams.
+    """
+
+    dateEcheance: date
+    dateValeur: date
+    dateCourbe: date
+    tmp: float
+    volume: float
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any]) -> "BDTPoint":
+        return cls(
+            _parse_date(record["dateEcheance"]),
+            _parse_date(record["dateValeur"]),
+            _parse_date(record["dateCourbe"]),
+            record["tmp"],
+            record["volume"],
+        )
+
+
+class PMOperation(NamedTuple):
+    """Monetary policy operation (resultat_oprts_politique_monetaire)."""
+
+    dateAdjudication: date
+    dateValeur: date
+    dateEcheance: date
+    instrument: str
+    mntDemande: float
+    mntServi: float
+    taux: float
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any]) -> "PMOperation":
+        return cls(
+            _parse_date(record["dateAdjudication"]),
+            _parse_date(record["dateValeur"]),
+            _parse_date(record["dateEcheance"]),
+            record["instrument"],
+            record["mntDemande"],
+            record["mntServi"],
+            record["taux"],
+        )
+
+
+class BTIssuance(NamedTuple):
+    """Treasury bills issuance (resultats_emissions_BT).
+
+    The 'caracteristique' field, such as '16/09/2024,1.85', is split into the maturity date
+    (dateEcheance) and the coupon rate (coupon).
+    """
+
+    dateReglement: date
+    maturite: str
+    dateEcheance: Optional[date]
+    coupon: Optional[float]
+    mntPropose: float
+    tauxPrixMin: float
+    tauxPrixMax: float
+    mntAdjuge: float
+    tauxPrixlimite: float
+    tauxPrixMoyenPondere: float
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any]) -> "BTIssuance":
+        echeance, _, coupon = (record.get("caracteristique") or "").partition(",")
+
+        return cls(
+            _parse_date(record["dateReglement"]),
+            record["maturite"],
+            datetime.strptime(echeance, "%d/%m/%Y").date() if echeance else None,
+            float(coupon) if coupon else None,
+            record["mntPropose"],
+            record["tauxPrixMin"],
+            record["tauxPrixMax"],
+            record["mntAdjuge"],
+            record["tauxPrixlimite"],
+            record["tauxPrixMoyenPondere"],
+        )
+
+
+class BTExchange(NamedTuple):
+    """Treasury bills exchange operation (resultats_oprts_echange_BT)."""
+
+    maturite: str
+    dateReglement: date
+    dateEcheance: date
+    tauxNominal: float
+    mntPropose: float
+    mntRetenu: float
+    maturiteRemp: str
+    dateEcheanceRemp: date
+    tauxNominallRemp: float
+    prixMin: float
+    prixMax: float
+    mntRetenuRemp: float
+    pmp: float
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any]) -> "BTExchange":
+        return cls(
+            record["maturite"],
+            _parse_date(record["dateReglement"]),
+            _parse_date(record["dateEcheance"]),
+            record["tauxNominal"],
+            record["mntPropose"],
+            record["mntRetenu"],
+            record["maturiteRemp"],
+            _parse_date(record["dateEcheanceRemp"]),
+            record["tauxNominallRemp"],
+            record["prixMin"],
+            record["prixMax"],
+            record["mntRetenuRemp"],
+            record["pmp"],
+        )
+
+
+# The record type of each endpoint (refer to BAMapi.constants.API).
+RECORD_TYPES = MappingProxyType(
+    {
+        "cours_BBE": FXRate,
+        "cours_virement": FXRate,
+        "courbe_BDT": BDTPoint,
+        "oprts_de_PM": PMOperation,
+        "emissions_de_BT": BTIssuance,
+        "oprts_echange_de_BT": BTExchange,
+    }
+)
+
+
+def to_records(
+    records: Iterable[Mapping[str, Any]], record_type: Union[str, _RecordType[R]]
+) -> List[R]:
+    """Convert a raw API response into a list of typed records.
+
+    Args:
+        records:
+          The list of dictionaries returned by one of the BAMapi.api functions.
+
+        record_type:
+          The record type of the endpoint, such as BDTPoint, or the name of the
+          endpoint in BAMapi.constants.API, such as "courbe_BDT".
+
+    Returns:
+        A list of records, whose dates are parsed once and for all. For instance:
+
+        >>> to_records(bam.courbe_BDT("2019-01-02"), "courbe_BDT")
+        [BDTPoint(dateEcheance=datetime.date(2046, 2, 19), dateValeur=datetime.date(2018, 12, 28),
+                  dateCourbe=datetime.date(2019, 1, 2), tmp=4.326, volume=195.25),
+         ... ]
+    """
+    if isinstance(record_type, str):
+        record_type = cast("_RecordType[R]", RECORD_TYPES[record_type])
+
+    from_dict = record_type.from_dict
+    return [from_dict(record) for record in records]
@@ -0,0 +1,106 @@
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+
+class _Call:
+    """A call in flight, waited on by the duplicate callers."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls made from several threads.
+
+    While a call is in flight for a given key, the other callers with the same key
+    wait for it and receive its result (or its exception) instead of making the call again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Call function, unless a call with the same key is already in flight.
+
+        Args:
+            key:
+              The key identifying identical calls.
+
+            function:
+              The function to call, without arguments.
+
+        Returns:
+            The value returned by the call.
+        """
+        with self._lock:
+            existing = self._calls.get(key)
+            if existing is None:
+                call = self._calls[key] = _Call()
+
+        if existing is not None:
+            call = existing
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Coalesce identical concurrent calls made from coroutines of the same event loop.
+
+    Refer to SingleFlight.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        """Await function(), unless a call with the same key is already in flight.
+
+        The call runs as a task of its own, awaited shielded by every caller, so that
+        cancelling one of the callers (the first one included) does not cancel it for the others.
+
+        Args:
+            key:
+              The key identifying identical calls.
+
+            function:
+              The coroutine function to call, without arguments.
+
+        Returns:
+            The value returned by the call.
+        """
+        import asyncio
+
+        task = self._calls.get(key)
+
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self._done(key, done))
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # Mark the exception as retrieved, should no caller be waiting for it anymore.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from BAMapi.cache import MemoryCache
+from BAMapi.constants import API
+
+
+# The endpoints returning one exchange rate per currency (Marché des changes).
+FX_ENDPOINTS = frozenset({API["cours_BBE"], API["cours_virement"]})
+
+
+class FXSnapshots:
+    """Serve per-currency exchange rates out of full tables fetched once per (endpoint, date).
+
+    Querying the exchange rates with an empty currency label returns every currency in a single
+    request. A snapshot keeps that full table, indexed by `libDevise`, so that the rates of any
+    currency for the same endpoint and date are then looked up locally. The tables expire like the
+    responses of a MemoryCache, at the next publication time of their endpoint.
+
+        >>> client = bam.BAMClient(fx_snapshots=True)
+
+    Args:
+        cache:
+          The cache holding the full tables. The default value is MemoryCache(maxsize=64).
+    """
+
+    def __init__(self, cache: Optional[MemoryCache] = None) -> None:
+        self.cache = cache if cache is not None else MemoryCache(maxsize=64)
+
+        self._lock = threading.Lock()
+        # (url, date) -> (full table, index of the table by currency label)
+        self._indexes: OrderedDict = OrderedDict()
+
+    def lookup(
+        self,
+        fetch: Callable[[dict], List[Dict]],
+        url: str,
+        currency_label: str,
+        date_time: str = "",
+    ) -> List[Dict]:
+        """Return the exchange rates of a currency, out of the full table of its endpoint and date.
+
+        Args:
+            fetch:
+              The function sending the GET request of the full table, given its query string.
+
+            url:
+              The targeted service endpoint (Product: Marché des changes)
+
+            currency_label:
+              The label of the currency, such as EUR or USD.
+
+            date_time:
+              The date (and time) of the exchange rates. The default value is "" (today).
+
+        Returns:
+            The exchange rates of the currency, or an empty list if the table does not quote it.
+        """
+        querystring = {"libDevise": "", "date": date_time}
+
+        table = self.cache.get(url, querystring)
+        if table is None:
+            table = fetch(querystring)
+            self.cache.set(url, querystring, table)
+
+        key = (url, date_time)
+
+        with self._lock:
+            entry = self._indexes.get(key)
+
+            if entry is None or entry[0] is not table:
+                index: Dict[str, List[Dict]] = {}
+                for rate in table:
+                    index.setdefault(rate["libDevise"], []).append(rate)
+                entry = self._indexes[key] = (table, index)
+
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.cache.maxsize:
+                self._indexes.popitem(last=False)
+
+        return list(entry[1].get(currency_label, []))
+
+    def invalidate(self) -> None:
+        """Drop every snapshot."""
+        with self._lock:
+            self.cache.invalidate()
+            self._indexes.clear()
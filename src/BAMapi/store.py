@@ -0,0 +1,315 @@
+import json
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from BAMapi import api
+from BAMapi.constants import API
+from BAMapi.utils import (
+    _business_days,
+    _is_valid_date_string,
+    _search_instruments_const,
+)
+
+
+# The field holding the date of the records of each endpoint.
+DATE_FIELDS = {
+    "cours_BBE": "date",
+    "cours_virement": "date",
+    "courbe_BDT": "dateCourbe",
+    "oprts_de_PM": "dateAdjudication",
+}
+
+
+def _yesterday() -> str:
+    # The current day may not be fully published yet.
+    return (date.today() - timedelta(days=1)).isoformat()
+
+
+def _shift(day: str, days: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+class SyncStore:
+    """Local store of BAM time series, synchronised incrementally.
+
+    The store remembers, per endpoint and per series (an instrument or a currency label),
+    the first and the last dates successfully ingested: its low and high-water marks. Each
+    synchronisation only fetches the days outside of these marks (the older history, should
+    an earlier start be requested, and the days after the high-water mark), so that steady-state
+    runs cost O(new data) instead of O(history). The records are appended to a SQLite database.
+
+    The high-water mark is the last date actually returned by the API, and never later than
+    yesterday, so that the days not published yet are fetched again by the next synchronisation.
+
+        >>> store = SyncStore("bam.sqlite")
+        >>> store.sync_politique_monetaire(start="2020-01-01", instrument="avances_7j")
+        >>> store.records("oprts_de_PM", "AVANCES7J", start="2023-01-01")
+
+    Args:
+        path:
+          The path of the database file. It is created if it does not exist.
+
+        max_workers:
+          The maximum number of days fetched concurrently by the day-by-day endpoints
+          (exchange rates and BDT curve). The default value is 8.
+    """
+
+    def __init__(self, path: Union[str, Path], max_workers: int = 8) -> None:
+        self.path = Path(path).expanduser()
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+
+        import sqlite3
+
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.executescript(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            "endpoint TEXT NOT NULL, "
+            "series TEXT NOT NULL, "
+            "first_date TEXT NOT NULL, "
+            "last_date TEXT NOT NULL, "
+            "PRIMARY KEY (endpoint, series));"
+            "CREATE TABLE IF NOT EXISTS records ("
+            "endpoint TEXT NOT NULL, "
+            "series TEXT NOT NULL, "
+            "date TEXT NOT NULL, "
+            "payload TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS records_by_date ON records (endpoint, series, date);"
+        )
+        self._connection.commit()
+
+    def watermarks(self, endpoint: str, series: str = "") -> Optional[Tuple[str, str]]:
+        """Return the (first, last) dates ingested for a series of an endpoint.
+
+        None is returned if the series was never synchronised.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT first_date, last_date FROM watermarks WHERE endpoint = ? AND series = ?",
+                (endpoint, series),
+            ).fetchone()
+
+        return (row[0], row[1]) if row else None
+
+    def watermark(self, endpoint: str, series: str = "") -> Optional[str]:
+        """Return the last date ingested for a series of an endpoint, or None if it was never
+        synchronised."""
+        watermarks = self.watermarks(endpoint, series)
+
+        return watermarks[1] if watermarks else None
+
+    def _gaps(
+        self, endpoint: str, series: str, start: str, end: Optional[str]
+    ) -> List[Tuple[str, str]]:
+        """Return the (first, last) ranges of days missing from a series, in date order."""
+        _is_valid_date_string(start, "%Y-%m-%d", True)
+
+        end = end or _yesterday()
+        _is_valid_date_string(end, "%Y-%m-%d", True)
+
+        if start > end:
+            return []
+
+        watermarks = self.watermarks(endpoint, series)
+        if watermarks is None:
+            return [(start, end)]
+
+        first, last = watermarks
+        gaps = []
+
+        # The gaps adjoin the watermarks, so that the ingested days stay one contiguous range:
+        # a range requested away from them is fetched along with the days in between.
+        if start < first:
+            gaps.append((start, _shift(first, -1)))
+
+        if end > last:
+            gaps.append((_shift(last, 1), end))
+
+        return gaps
+
+    def _append(
+        self, endpoint: str, series: str, gap: Tuple[str, str], records: List[Dict]
+    ) -> int:
+        """Append the records fetched for a gap and move the watermarks, in a single transaction.
+
+        The records dated after yesterday are not stored (they may be incomplete), and
+        the high-water mark only moves up to the last date returned.
+        """
+        field = DATE_FIELDS[endpoint]
+        yesterday = _yesterday()
+
+        rows = [
+            (endpoint, series, record[field][:10], json.dumps(record, ensure_ascii=False))
+            for record in records
+            if record[field][:10] <= yesterday
+        ]
+        returned = max((row[2] for row in rows), default=None)
+
+        watermarks = self.watermarks(endpoint, series)
+        if watermarks is None:
+            if returned is None:
+                # Nothing published yet: the whole gap is fetched again next time.
+                return 0
+            watermarks = (gap[0], returned)
+        else:
+            watermarks = (
+                min(watermarks[0], gap[0]),
+                max(watermarks[1], returned or watermarks[1]),
+            )
+
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT INTO records VALUES (?, ?, ?, ?)", rows)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)",
+                (endpoint, series) + watermarks,
+            )
+
+        return len(rows)
+
+    def _sync(
+        self,
+        endpoint: str,
+        series: str,
+        start: str,
+        end: Optional[str],
+        fetch: Callable[[str, str], List[Dict]],
+    ) -> int:
+        """Fetch and append each missing range of days of a series."""
+        return sum(
+            self._append(endpoint, series, gap, fetch(*gap))
+            for gap in self._gaps(endpoint, series, start, end)
+        )
+
+    def sync_politique_monetaire(
+        self, start: str, end: Optional[str] = None, instrument: str = ""
+    ) -> int:
+        """Fetch the missing monetary policy operations of an instrument.
+
+        Each missing range is fetched by a single resultat_oprts_politique_monetaire call.
+
+        Args:
+            start:
+              The first day of the history, in the ISO 8601 date format ('%Y-%m-%d').
+
+            end:
+              The last day to synchronise. The default value is yesterday.
+
+            instrument:
+              The name or acronym of an instrument (refer to BAMapi.INSTRUMENTS). If no instrument
+              is provided, the operations of all instruments are synchronised as one series.
+
+        Returns:
+            The number of records appended to the store.
+        """
+        series = _search_instruments_const(instrument)
+
+        return self._sync(
+            "oprts_de_PM",
+            series,
+            start,
+            end,
+            lambda first, last: api.resultat_oprts_politique_monetaire(first, last, series),
+        )
+
+    def sync_cours(
+        self,
+        endpoint: str,
+        start: str,
+        end: Optional[str] = None,
+        currency_label: str = "",
+    ) -> int:
+        """Fetch the missing exchange rates of a currency.
+
+        Args:
+            endpoint:
+              Either "cours_BBE" or "cours_virement".
+
+            start:
+              The first day of the history, in the ISO 8601 date format ('%Y-%m-%d').
+
+            end:
+              The last day to synchronise. The default value is yesterday.
+
+            currency_label:
+              The label of the currency, such as EUR or USD. If no currency label is provided,
+              the exchange rates of all currencies are synchronised as one series.
+
+        Returns:
+            The number of records appended to the store.
+        """
+        if endpoint not in ("cours_BBE", "cours_virement"):
+            raise ValueError(f"{endpoint} is not an exchange rates endpoint.")
+
+        def fetch(first: str, last: str) -> List[Dict]:
+            return [
+                rate
+                for _, rates in api._foreign_exchange_rates_range(
+                    API[endpoint], first, last, currency_label, self.max_workers
+                )
+                for rate in rates
+            ]
+
+        return self._sync(endpoint, currency_label, start, end, fetch)
+
+    def sync_courbe_BDT(self, start: str, end: Optional[str] = None) -> int:
+        """Fetch the missing BDT curves, one business day at a time.
+
+        Args:
+            start:
+              The first day of the history, in the ISO 8601 date format ('%Y-%m-%d').
+
+            end:
+              The last day to synchronise. The default value is yesterday.
+
+        Returns:
+            The number of records appended to the store.
+        """
+
+        def fetch(first: str, last: str) -> List[Dict]:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                days = _business_days(first, last, fx=False)
+                curves = executor.map(api.courbe_BDT, days)
+                return [point for curve in curves for point in curve]
+
+        return self._sync("courbe_BDT", "", start, end, fetch)
+
+    def records(
+        self,
+        endpoint: str,
+        series: str = "",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[Dict]:
+        """Read the stored records of a series, in date order.
+
+        Args:
+            endpoint:
+              The name of the endpoint in BAMapi.constants.API, such as "oprts_de_PM".
+
+            series:
+              The instrument acronym or the currency label of the series. The default value is "".
+
+            start:
+              The optional first day of the records to read.
+
+            end:
+              The optional last day of the records to read.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT payload FROM records WHERE endpoint = ? AND series = ? "
+                "AND date >= ? AND date <= ? ORDER BY date, rowid",
+                (endpoint, series, start or "", end or "9999-12-31"),
+            ).fetchall()
+
+        return [json.loads(payload) for (payload,) in rows]
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,159 @@
+import gzip
+import json
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from BAMapi.cache import _normalize_querystring
+
+
+# The response headers kept in the archives.
+RECORDED_HEADERS = ("Content-Type", "Retry-After", "ETag", "Last-Modified")
+
+
+def _build_response(url: str, status: int, headers: Dict[str, str], body: bytes) -> Any:
+    """Build a requests.Response out of a recorded exchange, without any connection."""
+    import requests
+
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers.update(headers)
+    response.encoding = "utf-8"
+    response.elapsed = timedelta(0)
+    response._content = body
+    response._content_consumed = True  # type: ignore[attr-defined]
+
+    return response
+
+
+class RecordingTransport:
+    """Transport sending the requests to BAM's API, and recording every exchange into an archive.
+
+    A transport replaces the requests.Session of a client (refer to BAMClient(session=...)).
+    Each exchange is appended to a gzip-compressed JSON lines archive as its url, query string,
+    status code, main headers and body, to be served later by ReplayTransport:
+
+        >>> with RecordingTransport("cassette.jsonl.gz") as transport:
+        ...     bam.set_default_client(bam.BAMClient(session=transport))
+        ...     bam.courbe_BDT("2019-01-02")
+
+    Args:
+        path:
+          The path of the archive. The exchanges are appended if it already exists.
+
+        session:
+          The requests.Session sending the requests. The default value is a new session.
+    """
+
+    def __init__(self, path: Union[str, Path], session: Optional[Any] = None) -> None:
+        if session is None:
+            import requests
+
+            session = requests.Session()
+
+        self.path = Path(path).expanduser()
+        self.session = session
+
+        self._lock = threading.Lock()
+        self._archive = gzip.open(self.path, "at", encoding="utf-8")
+
+    def get(self, url: str, headers: Dict, params: Dict, **kwargs: Any) -> Any:
+        response = self.session.get(url=url, headers=headers, params=params, **kwargs)
+
+        exchange = {
+            "url": url,
+            "querystring": params,
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS
+                if name in response.headers
+            },
+            # Lone surrogates (undecodable bytes) are escaped by json.dumps.
+            "body": response.content.decode("utf-8", "surrogateescape"),
+        }
+
+        with self._lock:
+            self._archive.write(json.dumps(exchange) + "\n")
+
+        return response
+
+    def close(self) -> None:
+        """Flush the archive and close the session."""
+        with self._lock:
+            self._archive.close()
+        self.session.close()
+
+    def __enter__(self) -> "RecordingTransport":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ReplayTransport:
+    """Transport serving the exchanges recorded by RecordingTransport, without any network.
+
+    The recorded responses go through the same checks as live ones: a 204 status code is
+    returned as an empty list, 401 raises InvalidAPIKeys and 429 RateLimitExceededError.
+    The exchanges recorded for the same url and query string are replayed in order, the last
+    one being repeated once the others are exhausted:
+
+        >>> bam.set_default_client(bam.BAMClient(session=ReplayTransport("cassette.jsonl.gz")))
+        >>> bam.courbe_BDT("2019-01-02")
+
+    Args:
+        path:
+          The path of the archive.
+
+    Raise:
+        LookupError: No exchange was recorded for a request.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path).expanduser()
+
+        self._lock = threading.Lock()
+        self._exchanges: Dict[Tuple[str, str], List[Tuple[int, Dict, bytes]]] = {}
+        self._replayed: Dict[Tuple[str, str], int] = {}
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                exchange = json.loads(line)
+                key = (exchange["url"], _normalize_querystring(exchange["querystring"]))
+                self._exchanges.setdefault(key, []).append(
+                    (
+                        exchange["status"],
+                        exchange["headers"],
+                        exchange["body"].encode("utf-8", "surrogateescape"),
+                    )
+                )
+
+    def __len__(self) -> int:
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def get(self, url: str, headers: Dict, params: Dict, **kwargs: Any) -> Any:
+        key = (url, _normalize_querystring(params))
+
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if exchanges is None:
+                raise LookupError(f"No exchange recorded for {url} with {params}.")
+
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+
+        status, recorded_headers, body = exchanges[min(index, len(exchanges) - 1)]
+
+        return _build_response(url, status, recorded_headers, body)
+
+    def close(self) -> None:
+        """Nothing to release: the archive is read once and for all."""
+
+    def __enter__(self) -> "ReplayTransport":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -1,7 +1,10 @@
-import requests
-from datetime import datetime
+import codecs
+import json
+import os
+from datetime import date, datetime, timedelta
 import re
-from typing import Any, List, Dict, Union
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 import configparser
 from pathlib import Path
 from types import MappingProxyType
@@ -10,11 +13,37 @@ from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
 
 
 CURRENCY_PATTERN = re.compile(r"^[A-Z]{3}$")
+RETRY_AFTER_PATTERN = re.compile(r"(\d+(?:\.\d+)?) seconds?")
+JSON_SEPARATORS = " \t\r\n,"
 
 _FILE_PATH: Path = Path(__file__)
 
+# The environment variables overriding the API keys of the config file.
+KEYS_ENVIRONMENT_VARIABLES = MappingProxyType(
+    {
+        "marche_adjud_des_BT": "BAMAPI_MARCHE_ADJUD_DES_BT",
+        "marche_des_changes": "BAMAPI_MARCHE_DES_CHANGES",
+        "marche_obligataire": "BAMAPI_MARCHE_OBLIGATAIRE",
+    }
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+    from BAMapi.conditional import Validators
+
 
-def _base_bam_api_get_request(sub_key: str, url: str, querystring: dict) -> List[Dict]:
+def _base_bam_api_get_request(
+    sub_key: str,
+    url: str,
+    querystring: dict,
+    session: Optional["requests.Session"] = None,
+    timeout: float = 10,
+    decoder: Optional[Callable[[bytes], Any]] = None,
+    timings: Optional[Dict[str, Any]] = None,
+    validators: Optional["Validators"] = None,
+    outcome: Optional[Dict[str, Any]] = None,
+) -> List[Dict]:
     """Base intercation function with BAM's API.
 
     Args:
@@ -27,8 +56,33 @@ def _base_bam_api_get_request(sub_key: str, url: str, querystring: dict) -> List
         - querystring:
              The query string of the URL.
 
+        - session:
+             The session used to send the request, so that its pooled connections are reused.
+             If no session is provided, a one-off connection is opened by requests.get.
+
+        - timeout:
+             The timeout of the request in seconds. The default value is 10.
+
+        - decoder:
+             The function decoding the body of the response (refer to BAMapi.decoders).
+             If no decoder is provided, the body is decoded by requests with the standard library.
+
+        - timings:
+             An optional dictionary, filled with the status code ("status_code"), the size of the
+             body in bytes ("size") and the time spent (in seconds) until the headers were received
+             ("ttfb"), downloading the body ("download") and decoding it ("decode").
+
+        - validators:
+             The optional BAMapi.conditional.Validators of the previous response to the same query.
+             The request is then conditional, and an unchanged body is not decoded again.
+
+        - outcome:
+             An optional dictionary, filled with whether the body changed since the previous
+             response to the same query ("changed"), when validators are provided.
+
     Returns:
         The query output could be either a list of dictionaries or an empty list.
+        A GET response with a status code of 204 (No Content) is returned as an empty list.
 
     Raises:
         InvalidAPIKey: Invalid API key.
@@ -40,25 +94,212 @@ def _base_bam_api_get_request(sub_key: str, url: str, querystring: dict) -> List
     headers = {
         "Ocp-Apim-Subscription-Key": f"{sub_key}",
     }
+    if validators is not None:
+        headers.update(validators.headers())
+
+    if session is None:
+        import requests
+
+    started = time.perf_counter()
 
     try:
-        response = requests.get(
-            url=url, headers=headers, params=querystring, timeout=10
+        response = (session or requests).get(
+            url=url, headers=headers, params=querystring, timeout=timeout
         )
 
-        if response.status_code == 401:
-            raise InvalidAPIKeys(
-                f"Access has been denied. Kindly verify the authenticity of the API keys that have been provided."
-            )
-        elif response.status_code == 429:
-            raise RateLimitExceededError(response.json()["message"])
+        if timings is not None:
+            # requests reads the body before returning; elapsed stops at the headers.
+            ttfb = response.elapsed.total_seconds()
+            timings["status_code"] = response.status_code
+            timings["ttfb"] = ttfb
+            timings["download"] = max(0.0, time.perf_counter() - started - ttfb)
+            timings["size"] = len(response.content or b"")
+
+        _check_bam_response(response)
+
+    except Exception as e:
+        raise e
+
+    def decode() -> List[Dict]:
+        started = time.perf_counter()
+
+        if decoder is not None:
+            records = decoder(response.content)
+        else:
+            records = response.json()
+
+        if timings is not None:
+            timings["decode"] = time.perf_counter() - started
+
+        return records
+
+    if validators is not None:
+        records, changed = validators.resolve(response, decode)
+        if outcome is not None:
+            outcome["changed"] = changed
+        return records
+
+    if response.status_code == 204:
+        return []
+
+    return decode()
+
+
+def _base_bam_api_stream_request(
+    sub_key: str,
+    url: str,
+    querystring: dict,
+    session: Optional["requests.Session"] = None,
+    timeout: float = 10,
+) -> "requests.Response":
+    """Send a GET request to BAM's API without downloading its body.
+
+    Refer to _base_bam_api_get_request for the arguments and the raised exceptions.
+
+    Returns:
+        The response, whose body is left to be consumed with
+        _iter_json_array(response.iter_content()).
+    """
+
+    headers = {
+        "Ocp-Apim-Subscription-Key": f"{sub_key}",
+    }
+
+    if session is None:
+        import requests
 
-        response.raise_for_status()
+    response = (session or requests).get(
+        url=url, headers=headers, params=querystring, timeout=timeout, stream=True
+    )
 
+    try:
+        _check_bam_response(response)
     except Exception as e:
+        response.close()
         raise e
 
-    return response.json()
+    return response
+
+
+def _iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Decode the elements of a JSON array one at a time, as the chunks of its body arrive.
+
+    Only the element being decoded is held in memory, instead of the whole body.
+    An empty body (status code 204) is an empty array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    chunks = iter(chunks)
+    buffer = ""
+    exhausted = False
+    started = False
+
+    def read() -> bool:
+        nonlocal buffer, exhausted
+        for chunk in chunks:
+            if chunk:
+                buffer += text_decoder.decode(chunk)
+                return True
+        buffer += text_decoder.decode(b"", final=True)
+        exhausted = True
+        return False
+
+    while True:
+        buffer = buffer.lstrip(JSON_SEPARATORS if started else " \t\r\n")
+
+        if not buffer:
+            if exhausted:
+                if started:
+                    raise ValueError("Unexpected end of the JSON array.")
+                return
+            read()
+            continue
+
+        if not started:
+            if buffer[0] != "[":
+                raise ValueError("The response body is not a JSON array.")
+            buffer = buffer[1:]
+            started = True
+            continue
+
+        if buffer[0] == "]":
+            return
+
+        try:
+            element, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            if exhausted:
+                raise e
+            read()
+            continue
+
+        rest = buffer[end:].lstrip(" \t\r\n")
+        if not exhausted and (not rest or rest[0] not in ",]"):
+            # The element may be cut by the end of the chunk, such as the 1. of 1.5:
+            # wait for the next one.
+            read()
+            continue
+
+        buffer = buffer[end:]
+        yield element
+
+
+def _rebase_url(url: str, base_url: Optional[str]) -> str:
+    """Point the URL of an endpoint (refer to BAMapi.constants.API) to another host."""
+    from BAMapi.constants import BASE_URL
+
+    if base_url is None or not url.startswith(BASE_URL):
+        return url
+
+    return base_url.rstrip("/") + "/" + url[len(BASE_URL) :]
+
+
+def _check_bam_response(response: Any) -> None:
+    """Map the status code of a response from BAM's API onto the package exceptions.
+
+    Args:
+        - response:
+             A requests.Response or an httpx.Response object.
+
+    Raises:
+        InvalidAPIKey: Invalid API key.
+        RateLimitExceededError: Rate limit is exceeded.
+        The HTTP error of the client library for any other 4XX/5XX status code.
+    """
+    if response.status_code == 401:
+        raise InvalidAPIKeys(
+            f"Access has been denied. Kindly verify the authenticity of the API keys that have been provided."
+        )
+    elif response.status_code == 429:
+        message = response.json()["message"]
+        raise RateLimitExceededError(
+            message,
+            retry_after=_parse_retry_after(
+                response.headers.get("Retry-After"), message
+            ),
+        )
+
+    response.raise_for_status()
+
+
+def _parse_retry_after(header: Any, message: Any) -> Optional[float]:
+    """Extract the delay before retrying from a Retry-After header or a 429 message body.
+
+    The message body of BAM's API reads like: "Rate limit is exceeded. Try again in 5 seconds."
+    """
+    if isinstance(header, str):
+        try:
+            return max(float(header), 0.0)
+        except ValueError:
+            pass
+
+    if isinstance(message, str):
+        match = RETRY_AFTER_PATTERN.search(message)
+        if match:
+            return float(match.group(1))
+
+    return None
 
 
 def _is_valid_date_string(
@@ -84,7 +325,8 @@ def _is_valid_date_string(
             pass
 
     raise ValueError(
-        f"The provided date string is not in a valid format. Please use one of the following valid date format(s): {date_formats}."
+        "The provided date string is not in a valid format. "
+        f"Please use one of the following valid date format(s): {date_formats}."
     )
 
 
@@ -123,6 +365,111 @@ def _search_instruments_const(instrument: str) -> str:
     )
 
 
+def _foreign_exchange_rates_querystring(
+    currency_label: str = "", date_time: str = ""
+) -> dict:
+    """Validate the inputs of the "Marché des changes" endpoints and build their query string."""
+    _is_valid_date_string(date_time, ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S.%fZ'"])
+    _check_currency_label(currency_label)
+
+    return {
+        "libDevise": currency_label,
+        "date": date_time,
+    }
+
+
+def _courbe_BDT_querystring(date: str = "") -> dict:
+    """Validate the inputs of the "Courbe des Taux BDT" endpoint and build its query string."""
+    _is_valid_date_string(date, "%Y-%m-%d")
+
+    return {
+        "dateCourbe": date,
+    }
+
+
+def _oprts_politique_monetaire_querystring(
+    date_adjudication_du: str, date_adjudication_au: str = "", instrument: str = ""
+) -> dict:
+    """Validate the inputs of the "Opérations de la politique monétaire" endpoint
+    and build its query string."""
+    _is_valid_date_string(date_adjudication_du, "%Y-%m-%d")
+    _is_valid_date_string(date_adjudication_au, "%Y-%m-%d")
+
+    instrument = _search_instruments_const(instrument)
+
+    return {
+        "dateAdjudicationDu": date_adjudication_du,
+        "dateAdjudicationAu": date_adjudication_au,
+        "instrument": instrument,
+    }
+
+
+def _emissions_BT_querystring(date_reglement: str) -> dict:
+    """Validate the inputs of the "Émissions de bons du Trésor" endpoint
+    and build its query string."""
+    _is_valid_date_string(date_reglement, "%Y-%m-%d", True)
+
+    return {"dateReglement": date_reglement}
+
+
+def _oprts_echange_BT_querystring(date_reglement: str) -> dict:
+    """Validate the inputs of the "Opérations d'échange de bons du Trésor" endpoint
+    and build its query string."""
+    _is_valid_date_string(date_reglement, "%Y-%m-%d")
+
+    return {
+        "dateReglement": date_reglement,
+    }
+
+
+def _business_days(start: str, end: str, fx: bool = True) -> List[str]:
+    """List the days between start and end (both included) on which data may be published.
+
+    Week-ends are left out, as well as the 25th and 26th of December, on which no exchange rates
+    are quoted, unless fx is False (the BDT curves are published on these days). Moroccan public
+    holidays are not, since the API answers them with a 204 (No Content) status code.
+    """
+    _is_valid_date_string(start, "%Y-%m-%d", True)
+    _is_valid_date_string(end, "%Y-%m-%d", True)
+
+    day = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+
+    if day > last:
+        raise ValueError(f"The start date {start} is posterior to the end date {end}.")
+
+    days = []
+    while day <= last:
+        if day.weekday() < 5 and not (fx and day.month == 12 and day.day in (25, 26)):
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+
+    return days
+
+
+def _date_windows(start: str, end: str, chunk_days: int) -> List[Tuple[str, str]]:
+    """Split the range between start and end (both included) into windows of chunk_days days."""
+    _is_valid_date_string(start, "%Y-%m-%d", True)
+    _is_valid_date_string(end, "%Y-%m-%d", True)
+
+    if chunk_days < 1:
+        raise ValueError("The number of days of a chunk must be a positive integer.")
+
+    first = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+
+    if first > last:
+        raise ValueError(f"The start date {start} is posterior to the end date {end}.")
+
+    windows = []
+    while first <= last:
+        window_end = min(first + timedelta(days=chunk_days - 1), last)
+        windows.append((first.isoformat(), window_end.isoformat()))
+        first = window_end + timedelta(days=1)
+
+    return windows
+
+
 def _initiate_config_file() -> None:
     """Initiate the default config.ini file.
 
@@ -140,22 +487,41 @@ def _initiate_config_file() -> None:
             "marche_des_changes": "",
             "marche_obligataire": "",
         }
+        config["SecondaryAPIkeys"] = {
+            "marche_adjud_des_BT": "",
+            "marche_des_changes": "",
+            "marche_obligataire": "",
+        }
 
         with open(config_file_path, "w") as f:
             config.write(f)
 
 
-def _load_api_keys() -> dict:
-    """Lead Api Keys to KEYS const."""
+def _load_api_keys(secondary: bool = False) -> dict:
+    """Load the API keys, without creating the config.ini file.
+
+    The keys of the config file (refer to BAMapi.set_api_keys) are overridden by the
+    environment variables of KEYS_ENVIRONMENT_VARIABLES, such as BAMAPI_MARCHE_DES_CHANGES.
+    A missing key is an empty string.
+
+    Args:
+        secondary:
+          Whether to load the secondary keys (the "SecondaryAPIkeys" section of the config file and
+          the environment variables suffixed with _SECONDARY) instead of the primary ones.
+          The default value is False.
+    """
     config_file_path = _FILE_PATH.with_name("config.ini")
 
-    _initiate_config_file()
     config = configparser.ConfigParser()
     config.read(config_file_path)
 
+    section = "SecondaryAPIkeys" if secondary else "APIkeys"
+    suffix = "_SECONDARY" if secondary else ""
+
     keys = dict()
-    keys["marche_adjud_des_BT"] = config["APIkeys"]["marche_adjud_des_BT"]
-    keys["marche_des_changes"] = config["APIkeys"]["marche_des_changes"]
-    keys["marche_obligataire"] = config["APIkeys"]["marche_obligataire"]
+    for service, variable in KEYS_ENVIRONMENT_VARIABLES.items():
+        keys[service] = os.environ.get(variable + suffix) or config.get(
+            section, service, fallback=""
+        )
 
     return keys
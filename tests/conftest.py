@@ -1,5 +1,5 @@
 import json
-from unittest.mock import patch
+from unittest.mock import MagicMock, PropertyMock, patch
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -20,9 +20,47 @@ class PsudoConfFileData:
 
 @pytest.fixture(scope="function")
 def mock_requests_get():
-    """Requests get method mock object."""
-    with patch.object(requests, "get") as MockResponse:
-        yield MockResponse.return_value
+    """Requests get method mock object, shared by requests.get and requests.Session.get.
+
+    The raw body of the response (content) is the JSON encoding of response.json().
+    """
+    with patch.object(requests, "get") as MockResponse, patch.object(
+        requests.Session, "get", MockResponse
+    ):
+        response = MockResponse.return_value
+        type(response).content = PropertyMock(
+            side_effect=lambda: json.dumps(response.json.return_value).encode()
+        )
+        yield response
+
+
+@pytest.fixture(scope="session")
+def make_response():
+    """Build a mocked response, such as the side effect of requests.Session.get."""
+
+    def make_response(status_code=200, body=None, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = dict(headers or {})
+        response.text = ""
+        response.json.return_value = [] if body is None else body
+        response.content = json.dumps(response.json.return_value).encode()
+        return response
+
+    return make_response
+
+
+@pytest.fixture(scope="function")
+def clock(monkeypatch):
+    """Fake monotonic clock, advanced by time.sleep."""
+    now = [1000.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+
+    def sleep(delay):
+        now[0] += delay
+
+    monkeypatch.setattr("time.sleep", sleep)
+    return now
 
 
 @pytest.fixture(scope="session", name="psudo_args_base_req")
@@ -41,7 +79,7 @@ def sample_data():
 @pytest.fixture(scope="function")
 def config_file_path(tmp_path):
     """Provied the path of the cofig file."""
-    return tmp_path.parent / "config.ini"
+    return tmp_path / "config.ini"
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from BAMapi.aio import AsyncBAMClient
+from BAMapi.constants import API
+from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
+
+
+KEYS = {
+    "marche_adjud_des_BT": "adjud-key",
+    "marche_des_changes": "changes-key",
+    "marche_obligataire": "obligataire-key",
+}
+
+
+def make_client(handler, **kwargs):
+    client = AsyncBAMClient(keys=KEYS, **kwargs)
+    client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.parametrize(
+    "method, args, url, sub_key",
+    [
+        ("cours_BBE", ("EUR", "2023-05-12"), API["cours_BBE"], "changes-key"),
+        ("cours_virement", ("", ""), API["cours_virement"], "changes-key"),
+        ("courbe_BDT", ("2019-01-02",), API["courbe_BDT"], "obligataire-key"),
+        (
+            "resultat_oprts_politique_monetaire",
+            ("2023-01-01", "", "avances_7j"),
+            API["oprts_de_PM"],
+            "adjud-key",
+        ),
+        ("resultats_emissions_BT", ("2022-04-04",), API["emissions_de_BT"], "adjud-key"),
+        (
+            "resultats_oprts_echange_BT",
+            ("2023-04-25",),
+            API["oprts_echange_de_BT"],
+            "adjud-key",
+        ),
+    ],
+)
+def test_async_endpoints(method, args, url, sub_key, sample_data):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json=sample_data)
+
+    async def main():
+        async with make_client(handler) as client:
+            return await getattr(client, method)(*args)
+
+    response = asyncio.run(main())
+
+    assert response == sample_data
+    assert str(seen[0].url).startswith(url)
+    assert seen[0].headers["Ocp-Apim-Subscription-Key"] == sub_key
+
+
+@pytest.mark.parametrize(
+    "status_code, error", [(401, InvalidAPIKeys), (429, RateLimitExceededError)]
+)
+def test_async_errors(status_code, error):
+    def handler(request):
+        return httpx.Response(status_code, json={"message": "error"})
+
+    async def main():
+        async with make_client(handler, max_retries=0) as client:
+            await client.cours_BBE()
+
+    with pytest.raises(error):
+        asyncio.run(main())
+
+
+def test_async_validation():
+    async def main():
+        async with make_client(lambda request: httpx.Response(200, json=[])) as client:
+            await client.cours_BBE("EURO")
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_async_keys_precedence(monkeypatch):
+    from BAMapi import constants
+
+    # A KEYS value left behind by another test would shadow _KEYS.
+    monkeypatch.delitem(vars(constants), "KEYS", raising=False)
+    monkeypatch.setattr(
+        "BAMapi.constants._KEYS", dict(KEYS, marche_obligataire="configured-key")
+    )
+    client = AsyncBAMClient(keys={"marche_des_changes": "explicit-key"})
+
+    # The explicit keys take precedence, the others fall back to the loaded keys.
+    assert client._sub_keys("marche_des_changes") == ("explicit-key",)
+    assert client._sub_keys("marche_obligataire") == ("configured-key",)
+
+    asyncio.run(client.aclose())
+
+
+def test_async_concurrency_limit(sample_data):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=sample_data)
+
+    async def main():
+        async with make_client(handler, concurrency=3) as client:
+            return await asyncio.gather(
+                *(client.cours_BBE("", f"2023-05-{day:02d}") for day in range(1, 13))
+            )
+
+    responses = asyncio.run(main())
+
+    assert len(responses) == 12
+    assert peak == 3
+
+
+def test_async_rate_limit_retry(sample_data):
+    responses = [
+        httpx.Response(429, json={"message": "Try again in 0 seconds."}),
+        httpx.Response(200, json=sample_data),
+    ]
+
+    async def main():
+        async with make_client(lambda request: responses.pop(0)) as client:
+            return await client.courbe_BDT()
+
+    assert asyncio.run(main()) == sample_data
+    assert responses == []
+
+
+def test_async_coalescing(sample_data):
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=sample_data)
+
+    async def main():
+        async with make_client(handler) as client:
+            return await asyncio.gather(*(client.cours_BBE("USD") for _ in range(50)))
+
+    responses = asyncio.run(main())
+
+    assert calls == 1
+    assert all(response is responses[0] for response in responses)
+
+
+def test_async_base_url(sample_data):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json=sample_data)
+
+    async def main():
+        async with make_client(handler, base_url="http://127.0.0.1:8080/") as client:
+            return await client.courbe_BDT("2019-01-02")
+
+    asyncio.run(main())
+
+    assert str(seen[0].url).startswith("http://127.0.0.1:8080/mo/Version1/api/CourbeBDT")
@@ -1,9 +1,14 @@
 import configparser
+import json
 import os
+from unittest.mock import MagicMock
+
+import requests
 
 import pytest
 from faker import Faker
 
+from BAMapi.exceptions import RateLimitExceededError
 from BAMapi.utils import _initiate_config_file, _load_api_keys
 from BAMapi.api import (
     set_api_keys,
@@ -11,8 +16,12 @@ from BAMapi.api import (
     _base_foreign_exchange_rates,
     cours_BBE,
     cours_virement,
+    cours_BBE_range,
+    cours_virement_range,
     courbe_BDT,
     resultat_oprts_politique_monetaire,
+    resultat_oprts_politique_monetaire_chunked,
+    iter_resultat_oprts_politique_monetaire,
     resultats_emissions_BT,
     resultats_oprts_echange_BT,
 )
@@ -57,6 +66,55 @@ def test_load_api_keys(config_file_path, monkeypatch):
         assert v == ""
 
 
+def test_load_api_keys_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr("BAMapi.utils._FILE_PATH", tmp_path / "utils.py")
+    monkeypatch.setenv("BAMAPI_MARCHE_DES_CHANGES", "environment-key")
+
+    api_keys = _load_api_keys()
+
+    assert api_keys["marche_des_changes"] == "environment-key"
+    assert api_keys["marche_obligataire"] == ""
+
+
+def test_load_api_keys_does_not_create_config_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("BAMapi.utils._FILE_PATH", tmp_path / "utils.py")
+
+    _load_api_keys()
+
+    assert not (tmp_path / "config.ini").exists()
+
+
+@pytest.fixture
+def unloaded_keys():
+    """Forget the loaded API keys before and after the test.
+
+    A KEYS value left behind by monkeypatch.setattr would otherwise shadow the lazy loading.
+    """
+    from BAMapi import constants
+
+    constants._reset_api_keys()
+    yield
+    constants._reset_api_keys()
+
+
+def test_keys_are_loaded_lazily(config_file_path, monkeypatch, unloaded_keys):
+    from BAMapi import constants
+
+    monkeypatch.setattr("BAMapi.utils._FILE_PATH", config_file_path)
+    monkeypatch.setenv("BAMAPI_MARCHE_OBLIGATAIRE", "first-key")
+
+    keys = constants.KEYS
+    assert keys["marche_obligataire"] == "first-key"
+
+    # Cached: the environment is not read again...
+    monkeypatch.setenv("BAMAPI_MARCHE_OBLIGATAIRE", "second-key")
+    assert constants.KEYS is keys
+
+    # ... until the keys are reset, as set_api_keys does.
+    constants._reset_api_keys()
+    assert constants.KEYS["marche_obligataire"] == "second-key"
+
+
 def test_display_api_keys(config_file_path, capsys, monkeypatch, psudo_conf_file):
 
     # Set up the monkeypatch for the config file path
@@ -111,6 +169,29 @@ def test_set_api_keys_first_time(config_file_path, psudo_conf_file, monkeypatch)
     assert KEYS == api_keys
 
 
+def test_set_secondary_api_keys(tmp_path, monkeypatch, unloaded_keys):
+    from BAMapi import constants
+
+    monkeypatch.setattr("BAMapi.utils._FILE_PATH", tmp_path / "utils.py")
+    monkeypatch.setattr("BAMapi.api._FILE_PATH", tmp_path / "api.py")
+
+    set_api_keys(
+        marche_des_changes="primary-key", marche_des_changes_secondary="secondary-key"
+    )
+
+    assert constants.KEYS["marche_des_changes"] == "primary-key"
+    assert constants.SECONDARY_KEYS["marche_des_changes"] == "secondary-key"
+    assert _load_api_keys(secondary=True)["marche_des_changes"] == "secondary-key"
+
+    monkeypatch.setenv("BAMAPI_MARCHE_DES_CHANGES_SECONDARY", "environment-key")
+    assert _load_api_keys(secondary=True)["marche_des_changes"] == "environment-key"
+
+    # The functions of BAMapi.api spread their requests over both keys.
+    from BAMapi.keypool import _stored_keys
+
+    assert _stored_keys("marche_des_changes") == ("primary-key", "secondary-key")
+
+
 def test_base_foreign_exchange_rates(faker, mock_requests_get, sample_data):
     url = faker.url()
     service_api_key = faker.ean13()
@@ -194,3 +275,204 @@ def test_resultats_oprts_echange_BT(faker, mock_requests_get, sample_data):
 
     assert all(isinstance(d, dict) for d in response)
     assert response == sample_data
+
+
+@pytest.mark.parametrize("range_function", [cours_BBE_range, cours_virement_range])
+def test_foreign_exchange_rates_range(
+    range_function, mock_requests_get, make_response, sample_data
+):
+    def get(url, headers, params, timeout):
+        # 2023-05-01 (Labour Day) is a public holiday.
+        if params["date"] == "2023-05-01":
+            return make_response(204)
+        return make_response(200, [dict(rate, date=params["date"]) for rate in sample_data])
+
+    requests.Session.get.side_effect = get
+
+    response = list(range_function("2023-04-28", "2023-05-03", ["EUR", "USD"]))
+
+    assert [day for day, _ in response] == ["2023-04-28", "2023-05-02", "2023-05-03"]
+    for day, rates in response:
+        assert {rate["libDevise"] for rate in rates} == {"EUR", "USD"}
+        assert all(rate["date"] == day for rate in rates)
+
+    # Week-ends are never requested, and the full table is fetched once per day.
+    assert requests.Session.get.call_count == 4
+    assert all(
+        call.kwargs["params"]["libDevise"] == ""
+        for call in requests.Session.get.call_args_list
+    )
+
+
+def test_foreign_exchange_rates_range_single_currency(mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data[:1]
+
+    response = list(cours_BBE_range("2023-05-12", "2023-05-12", "QAR"))
+
+    assert response == [("2023-05-12", sample_data[:1])]
+    assert requests.Session.get.call_args.kwargs["params"]["libDevise"] == "QAR"
+
+
+@pytest.mark.parametrize(
+    "start, end, currencies",
+    [
+        ("2023-05-12", "2023-05-01", ""),
+        ("", "2023-05-01", ""),
+        ("2023-05-01", "2023-05-12", ["EURO"]),
+    ],
+)
+def test_foreign_exchange_rates_range_errors(start, end, currencies):
+    with pytest.raises(ValueError):
+        cours_BBE_range(start, end, currencies)
+
+
+def test_foreign_exchange_rates_range_is_bounded(mock_requests_get, sample_data):
+    mock_requests_get.status_code = 200
+    mock_requests_get.json.return_value = sample_data
+
+    # Three years of business days, of which only the first one is consumed.
+    days = cours_BBE_range("2020-01-01", "2022-12-31", max_workers=2)
+    assert next(days)[0] == "2020-01-01"
+    days.close()
+
+    # At most 2 * max_workers days were requested ahead.
+    assert requests.Session.get.call_count <= 5
+
+
+def test_resultat_oprts_politique_monetaire_chunked(
+    mock_requests_get, make_response, monkeypatch
+):
+    attempts = {}
+    delays = []
+    monkeypatch.setattr("time.sleep", delays.append)
+
+    def get(url, headers, params, timeout):
+        chunk = (params["dateAdjudicationDu"], params["instrument"])
+        attempts[chunk] = attempts.get(chunk, 0) + 1
+
+        # The first attempt of one of the chunks times out.
+        if chunk == ("2023-01-11", "PENSLRF") and attempts[chunk] == 1:
+            raise requests.exceptions.Timeout()
+
+        return make_response(
+            200,
+            [
+                {"dateAdjudication": params["dateAdjudicationAu"], "instrument": "x"},
+                {"dateAdjudication": params["dateAdjudicationDu"], "instrument": "x"},
+            ],
+        )
+
+    requests.Session.get.side_effect = get
+
+    response = resultat_oprts_politique_monetaire_chunked(
+        "2023-01-01", "2023-01-25", ["avances_7j", "PENSLRF"], chunk_days=10
+    )
+
+    # 3 windows x 2 instruments, one of them retried after a backoff.
+    assert len(attempts) == 6
+    assert attempts[("2023-01-11", "PENSLRF")] == 2
+    assert len(delays) == 1
+
+    # Merged in date order, without duplicates.
+    assert [operation["dateAdjudication"] for operation in response] == [
+        "2023-01-01",
+        "2023-01-10",
+        "2023-01-11",
+        "2023-01-20",
+        "2023-01-21",
+        "2023-01-25",
+    ]
+
+
+def test_resultat_oprts_politique_monetaire_chunked_gives_up(mock_requests_get):
+    requests.Session.get.side_effect = requests.exceptions.ConnectionError()
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        resultat_oprts_politique_monetaire_chunked("2023-01-01", max_retries=1)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        RateLimitExceededError("Rate limit is exceeded.", retry_after=7),
+        requests.exceptions.HTTPError(response=MagicMock(status_code=404)),
+    ],
+)
+def test_resultat_oprts_politique_monetaire_chunked_not_retried(error, monkeypatch):
+    calls = []
+    delays = []
+    monkeypatch.setattr("time.sleep", delays.append)
+
+    def resultat_oprts_politique_monetaire(du, au, instrument):
+        calls.append(du)
+        raise error
+
+    monkeypatch.setattr(
+        "BAMapi.api.resultat_oprts_politique_monetaire", resultat_oprts_politique_monetaire
+    )
+
+    # The rate limit and the 4XX status codes are not transient.
+    with pytest.raises(type(error)):
+        resultat_oprts_politique_monetaire_chunked("2023-01-01", "2023-01-05")
+    assert len(calls) == 1
+    assert delays == []
+
+
+def test_resultat_oprts_politique_monetaire_chunked_server_error(monkeypatch):
+    calls = []
+    monkeypatch.setattr("time.sleep", lambda delay: None)
+
+    def resultat_oprts_politique_monetaire(du, au, instrument):
+        calls.append(du)
+        if len(calls) == 1:
+            raise requests.exceptions.HTTPError(response=MagicMock(status_code=503))
+        return [{"dateAdjudication": du}]
+
+    monkeypatch.setattr(
+        "BAMapi.api.resultat_oprts_politique_monetaire", resultat_oprts_politique_monetaire
+    )
+
+    response = resultat_oprts_politique_monetaire_chunked("2023-01-01", "2023-01-05")
+
+    assert response == [{"dateAdjudication": "2023-01-01"}]
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize(
+    "du, au, max_retries",
+    [("2023-01-05", "2023-01-01", 2), ("2023-01-01", "2023-01-05", -1)],
+)
+def test_resultat_oprts_politique_monetaire_chunked_errors(du, au, max_retries):
+    with pytest.raises(ValueError):
+        resultat_oprts_politique_monetaire_chunked(du, au, max_retries=max_retries)
+
+    with pytest.raises(ValueError):
+        resultat_oprts_politique_monetaire_chunked("2023-01-01", instruments=[])
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_iter_resultat_oprts_politique_monetaire(typed, mock_requests_get):
+    operations = [
+        {
+            "dateAdjudication": "2023-01-04",
+            "dateValeur": "2023-01-05",
+            "dateEcheance": "2023-01-12",
+            "instrument": "avances à 7 jours",
+            "mntDemande": 56990.0,
+            "mntServi": 56990.0,
+            "taux": 2.5,
+        }
+    ] * 3
+    body = json.dumps(operations).encode()
+
+    mock_requests_get.iter_content.return_value = [body[:10], body[10:]]
+
+    response = list(iter_resultat_oprts_politique_monetaire("2023-01-01", typed=typed))
+
+    assert len(response) == 3
+    if typed:
+        assert response[0].taux == 2.5
+    else:
+        assert response == operations
+    assert requests.Session.get.call_args.kwargs["stream"] is True
+    mock_requests_get.close.assert_called_once()
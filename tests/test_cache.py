@@ -0,0 +1,224 @@
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+import requests
+
+from BAMapi.cache import (
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    _is_historical,
+    _next_publication,
+    _normalize_querystring,
+    _now,
+    _timezone,
+)
+from BAMapi.client import BAMClient
+from BAMapi.constants import API
+
+
+@pytest.mark.parametrize(
+    "querystring, historical",
+    [
+        ({"dateCourbe": "2019-01-02"}, True),
+        ({"dateCourbe": ""}, False),
+        ({"dateCourbe": "2023-05-12"}, False),
+        ({"libDevise": "EUR", "date": "2023-05-11T08:30:00.000000Z"}, True),
+        ({"dateAdjudicationDu": "2023-01-01", "dateAdjudicationAu": ""}, False),
+        (
+            {"dateAdjudicationDu": "2023-01-01", "dateAdjudicationAu": "2023-02-01"},
+            True,
+        ),
+        ({"key": "value"}, False),
+    ],
+)
+def test_is_historical(querystring, historical):
+    assert _is_historical(querystring, today=date(2023, 5, 12)) is historical
+
+
+def test_normalize_querystring():
+    assert _normalize_querystring({"a": "1", "b": ""}) == _normalize_querystring(
+        {"b": "", "a": "1"}
+    )
+
+
+def test_sqlite_cache(tmp_path, sample_data):
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteCache(path, ttl=0)
+
+    historical = {"dateCourbe": "2019-01-02"}
+    today = {"dateCourbe": ""}
+
+    assert cache.get(API["courbe_BDT"], historical) is None
+
+    cache.set(API["courbe_BDT"], historical, sample_data)
+    cache.set(API["courbe_BDT"], today, sample_data)
+
+    assert cache.get(API["courbe_BDT"], historical) == sample_data
+    # Non-historical responses expire after the ttl.
+    assert cache.get(API["courbe_BDT"], today) is None
+
+    cache.close()
+
+    # The responses persist across instances.
+    cache = SQLiteCache(path)
+    assert cache.get(API["courbe_BDT"], historical) == sample_data
+
+    cache.invalidate(API["cours_BBE"])
+    assert cache.get(API["courbe_BDT"], historical) == sample_data
+
+    cache.invalidate(API["courbe_BDT"], {"dateCourbe": "2019-01-03"})
+    assert cache.get(API["courbe_BDT"], historical) == sample_data
+    cache.invalidate(API["courbe_BDT"], historical)
+    assert cache.get(API["courbe_BDT"], historical) is None
+
+    cache.set(API["courbe_BDT"], historical, sample_data)
+    cache.invalidate()
+    assert cache.get(API["courbe_BDT"], historical) is None
+
+
+def test_sqlite_cache_removes_expired_rows(tmp_path, sample_data):
+    cache = SQLiteCache(tmp_path / "cache.sqlite", ttl=0)
+
+    def count():
+        return cache._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    cache.set(API["cours_BBE"], {"libDevise": "EUR", "date": ""}, sample_data)
+    assert count() == 1
+
+    # An expired response is deleted when it is read...
+    assert cache.get(API["cours_BBE"], {"libDevise": "EUR", "date": ""}) is None
+    assert count() == 0
+
+    # ...or when another response is stored.
+    cache.set(API["cours_BBE"], {"libDevise": "EUR", "date": ""}, sample_data)
+    cache.set(API["courbe_BDT"], {"dateCourbe": "2019-01-02"}, sample_data)
+    assert count() == 1
+
+
+def test_client_with_cache(tmp_path, mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    client = BAMClient(cache=SQLiteCache(tmp_path / "cache.sqlite"))
+    querystring = {"dateCourbe": "2019-01-02"}
+
+    assert client.get("key", API["courbe_BDT"], querystring) == sample_data
+    assert client.get("key", API["courbe_BDT"], querystring) == sample_data
+
+    assert requests.Session.get.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "endpoint, now, publication",
+    [
+        ("cours_BBE", datetime(2023, 5, 12, 8), datetime(2023, 5, 12, 8, 30)),
+        ("cours_BBE", datetime(2023, 5, 12, 8, 30), datetime(2023, 5, 13, 8, 30)),
+        ("cours_virement", datetime(2023, 5, 12, 9), datetime(2023, 5, 12, 12, 30)),
+        ("courbe_BDT", datetime(2023, 5, 12, 9), datetime(2023, 5, 13)),
+        ("oprts_de_PM", datetime(2023, 5, 12, 9), None),
+    ],
+)
+def test_next_publication(endpoint, now, publication):
+    assert _next_publication(endpoint, now) == publication
+
+
+def test_next_publication_in_casablanca_time():
+    # 07:45 UTC is 08:45 in Casablanca (UTC+1): cours_BBE was published 15 minutes ago.
+    now = datetime(2023, 5, 12, 7, 45, tzinfo=timezone.utc)
+    publication = _next_publication("cours_BBE", now)
+
+    assert publication.tzinfo is _timezone()
+    assert publication.replace(tzinfo=None) == datetime(2023, 5, 13, 8, 30)
+    assert publication == datetime(2023, 5, 13, 7, 30, tzinfo=timezone.utc)
+
+    # The default now is the current time in Casablanca, not the host's.
+    assert _now().tzinfo is _timezone()
+    assert _next_publication("cours_BBE") > _now()
+
+
+def test_memory_cache_lru(sample_data):
+    cache = MemoryCache(maxsize=2)
+
+    for day in ["2019-01-02", "2019-01-03"]:
+        cache.set(API["courbe_BDT"], {"dateCourbe": day}, sample_data)
+
+    # Refresh the first response, so that the second one is the least recently used.
+    assert cache.get(API["courbe_BDT"], {"dateCourbe": "2019-01-02"}) is sample_data
+
+    cache.set(API["courbe_BDT"], {"dateCourbe": "2019-01-04"}, sample_data)
+
+    assert len(cache) == 2
+    assert cache.get(API["courbe_BDT"], {"dateCourbe": "2019-01-03"}) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 2}
+
+
+def test_memory_cache_expiration(sample_data, monkeypatch):
+    cache = MemoryCache(ttl=60, ttls={"cours_virement": 0})
+    open_range = {"dateAdjudicationDu": "2023-01-01", "dateAdjudicationAu": ""}
+
+    cache.set(API["cours_virement"], {"libDevise": "EUR", "date": ""}, sample_data)
+    cache.set(API["oprts_de_PM"], open_range, sample_data)
+    cache.set(API["cours_BBE"], {"libDevise": "EUR", "date": ""}, sample_data)
+
+    assert cache.get(API["cours_virement"], {"libDevise": "EUR", "date": ""}) is None
+    assert cache.get(API["oprts_de_PM"], open_range)
+
+    # A day later, both the ttl and the next publication time have passed.
+    now = time.time() + 86400
+    monkeypatch.setattr("BAMapi.cache.time.time", lambda: now)
+
+    assert cache.get(API["oprts_de_PM"], open_range) is None
+    assert cache.get(API["cours_BBE"], {"libDevise": "EUR", "date": ""}) is None
+
+
+def test_memory_cache_invalidate(sample_data):
+    cache = MemoryCache()
+
+    for label in ["EUR", "USD"]:
+        cache.set(API["cours_BBE"], {"libDevise": label, "date": ""}, sample_data)
+    cache.set(API["courbe_BDT"], {"dateCourbe": ""}, sample_data)
+
+    cache.invalidate(API["cours_BBE"], {"libDevise": "EUR", "date": ""})
+    assert len(cache) == 2
+
+    cache.invalidate(API["cours_BBE"])
+    assert len(cache) == 1
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_tiered_cache(tmp_path, sample_data):
+    memory = MemoryCache()
+    sqlite = SQLiteCache(tmp_path / "cache.sqlite")
+    cache = TieredCache(memory, sqlite)
+
+    querystring = {"dateCourbe": "2019-01-02"}
+
+    sqlite.set(API["courbe_BDT"], querystring, sample_data)
+
+    assert cache.get(API["courbe_BDT"], querystring) == sample_data
+    assert memory.get(API["courbe_BDT"], querystring) == sample_data
+
+    cache.invalidate()
+    assert cache.get(API["courbe_BDT"], querystring) is None
+
+    cache.set(API["courbe_BDT"], querystring, sample_data)
+    assert sqlite.get(API["courbe_BDT"], querystring) == sample_data
+
+    cache.invalidate(API["courbe_BDT"], querystring)
+    assert memory.get(API["courbe_BDT"], querystring) is None
+    assert sqlite.get(API["courbe_BDT"], querystring) is None
+
+
+def test_tiered_cache_promotes_historical_responses(tmp_path, sample_data):
+    memory = MemoryCache()
+    sqlite = SQLiteCache(tmp_path / "cache.sqlite")
+    cache = TieredCache(memory, sqlite)
+
+    # A response that expires is not copied, so that its expiration time is kept.
+    sqlite.set(API["cours_BBE"], {"libDevise": "EUR", "date": ""}, sample_data)
+
+    assert cache.get(API["cours_BBE"], {"libDevise": "EUR", "date": ""}) == sample_data
+    assert len(memory) == 0
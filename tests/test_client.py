@@ -0,0 +1,180 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from BAMapi.constants import API
+from BAMapi.client import BAMClient, get_default_client, set_default_client
+
+
+def test_client_mounts_pooled_adapter():
+    client = BAMClient(pool_connections=3, pool_maxsize=7, pool_block=True)
+
+    adapter = client.session.get_adapter("https://api.centralbankofmorocco.ma/")
+
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    assert adapter._pool_block is True
+    assert client.session.headers["Connection"] == "keep-alive"
+
+
+def test_client_without_keep_alive():
+    client = BAMClient(keep_alive=False)
+
+    assert client.session.headers["Connection"] == "close"
+
+
+def test_client_get(mock_requests_get, psudo_args_base_req, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    with BAMClient(timeout=3) as client:
+        response = client.get(*psudo_args_base_req)
+
+    assert response == sample_data
+
+    sub_key, url, querystring = psudo_args_base_req
+    requests.Session.get.assert_called_once_with(
+        url=url,
+        headers={"Ocp-Apim-Subscription-Key": sub_key},
+        params=querystring,
+        timeout=3,
+    )
+
+
+def test_default_client_is_shared(monkeypatch):
+    monkeypatch.setattr("BAMapi.client._DEFAULT_CLIENT", None)
+
+    client = get_default_client()
+
+    assert isinstance(client, BAMClient)
+    assert get_default_client() is client
+
+    other = BAMClient()
+    set_default_client(other)
+
+    assert get_default_client() is other
+
+
+def test_default_client_is_created_once(monkeypatch):
+    monkeypatch.setattr("BAMapi.client._DEFAULT_CLIENT", None)
+    created = []
+
+    def slow_client():
+        time.sleep(0.05)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr("BAMapi.client.BAMClient", slow_client)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        clients = list(executor.map(lambda _: get_default_client(), range(4)))
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+
+
+def test_client_keys_are_immutable():
+    keys = {"marche_des_changes": "tenant-key"}
+    client = BAMClient(keys=keys)
+
+    keys["marche_des_changes"] = "other-key"
+
+    assert client.keys["marche_des_changes"] == ("tenant-key",)
+    with pytest.raises(TypeError):
+        client.keys["marche_des_changes"] = "other-key"
+
+
+def test_clients_of_several_tenants(mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    tenants = [
+        BAMClient(keys={"marche_obligataire": f"tenant-{i}"}, coalesce=False)
+        for i in range(8)
+    ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(
+            executor.map(lambda client: client.courbe_BDT("2019-01-02"), tenants)
+        )
+
+    assert responses == [sample_data] * 8
+    sub_keys = {
+        call.kwargs["headers"]["Ocp-Apim-Subscription-Key"]
+        for call in requests.Session.get.call_args_list
+    }
+    assert sub_keys == {f"tenant-{i}" for i in range(8)}
+
+
+@pytest.mark.parametrize(
+    "method, args, url, sub_key",
+    [
+        ("cours_BBE", ("EUR", "2023-05-12"), API["cours_BBE"], "changes-key"),
+        ("cours_virement", ("", ""), API["cours_virement"], "changes-key"),
+        ("courbe_BDT", ("2019-01-02",), API["courbe_BDT"], "obligataire-key"),
+        (
+            "resultat_oprts_politique_monetaire",
+            ("2023-01-01", "2023-02-01", "avances_7j"),
+            API["oprts_de_PM"],
+            "adjud-key",
+        ),
+        ("resultats_emissions_BT", ("2023-04-25",), API["emissions_de_BT"], "adjud-key"),
+        (
+            "resultats_oprts_echange_BT",
+            ("2023-04-25",),
+            API["oprts_echange_de_BT"],
+            "adjud-key",
+        ),
+    ],
+)
+def test_client_endpoints(method, args, url, sub_key, mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    client = BAMClient(
+        keys={
+            "marche_adjud_des_BT": "adjud-key",
+            "marche_des_changes": "changes-key",
+            "marche_obligataire": "obligataire-key",
+        }
+    )
+
+    assert getattr(client, method)(*args) == sample_data
+
+    call = requests.Session.get.call_args
+    assert call.kwargs["url"] == url
+    assert call.kwargs["headers"]["Ocp-Apim-Subscription-Key"] == sub_key
+
+
+def test_client_with_session(mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+    session = MagicMock(wraps=requests.Session())
+
+    with BAMClient(session=session) as client:
+        client.get("sub-key", "https://invalid_url.BAMAPI", {})
+
+    assert client.session is session
+    session.get.assert_called_once()
+    session.close.assert_not_called()
+
+
+def test_client_base_url(mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    client = BAMClient(base_url="http://127.0.0.1:8080")
+    client.courbe_BDT("2019-01-02")
+
+    assert (
+        requests.Session.get.call_args.kwargs["url"]
+        == "http://127.0.0.1:8080/mo/Version1/api/CourbeBDT"
+    )
+
+
+def test_client_base_url_connections():
+    client = BAMClient(base_url="http://127.0.0.1:8080")
+    rebased = "http://127.0.0.1:8080/mo/Version1/api/CourbeBDT"
+    pool = client.session.get_adapter(rebased).poolmanager.connection_from_url(rebased)
+
+    # The connections are counted on the pool of the host the requests are sent to.
+    pool.num_connections = 3
+    assert client._connections(API["courbe_BDT"]) == 3
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from BAMapi.columnar import ColumnarResult
+
+
+OPERATIONS = [
+    {
+        "dateAdjudication": "2023-01-04",
+        "dateValeur": "2023-01-05",
+        "dateEcheance": "2023-01-12",
+        "instrument": "avances à 7 jours",
+        "mntDemande": 56990.0,
+        "mntServi": 56990.0,
+        "taux": 2.5,
+    },
+    {
+        "dateAdjudication": "2023-01-23",
+        "dateValeur": "2023-01-26",
+        "dateEcheance": "2024-01-25",
+        "instrument": "prêt garanti",
+        "mntDemande": 95,
+        "mntServi": None,
+        "taux": 1.25,
+    },
+]
+
+
+def test_columnar_from_records():
+    result = ColumnarResult.from_records(OPERATIONS)
+
+    assert len(result) == 2
+    assert result.fields == list(OPERATIONS[0])
+    assert result["dateAdjudication"].dtype == np.dtype("datetime64[s]")
+    assert result["dateAdjudication"][0] == np.datetime64("2023-01-04")
+    assert result["mntDemande"].dtype == np.float64
+    assert np.isnan(result["mntServi"][1])
+    assert result["taux"].tolist() == [2.5, 1.25]
+    assert result["instrument"].tolist() == ["avances à 7 jours", "prêt garanti"]
+
+
+def test_columnar_from_json(sample_data):
+    result = ColumnarResult.from_json(json.dumps(sample_data))
+
+    assert len(result) == len(sample_data)
+    assert result["uniteDevise"].dtype == np.int64
+    assert result["libDevise"].tolist() == [rate["libDevise"] for rate in sample_data]
+    assert len(ColumnarResult.from_json(b"")) == 0
+
+
+def test_columnar_exports():
+    result = ColumnarResult.from_records(OPERATIONS)
+
+    arrays = result.to_numpy()
+    # The arrays are not copied.
+    assert arrays["taux"] is result["taux"]
+
+    records = result.to_records()
+    assert records[0]["dateEcheance"] == datetime(2023, 1, 12)
+    assert records[0]["taux"] == 2.5
+
+
+def test_columnar_to_pandas():
+    pytest.importorskip("pandas")
+
+    frame = ColumnarResult.from_records(OPERATIONS).to_pandas(index="dateAdjudication")
+
+    assert list(frame["taux"]) == [2.5, 1.25]
+    assert frame.index[1] == datetime(2023, 1, 23)
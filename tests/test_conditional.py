@@ -0,0 +1,113 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from BAMapi.cache import MemoryCache
+from BAMapi.client import BAMClient
+from BAMapi.conditional import Validators
+from BAMapi.constants import API
+
+
+RATES = [{"date": "2023-05-11T12:30:00", "libDevise": "EUR", "moyen": 10.9884, "uniteDevise": 1}]
+
+
+@pytest.fixture
+def decoded():
+    return []
+
+
+@pytest.fixture
+def client(mock_requests_get, decoded):
+    mock_requests_get.status_code = 200
+    mock_requests_get.headers = {}
+    mock_requests_get.json.return_value = RATES
+
+    def decoder(content):
+        decoded.append(content)
+        return json.loads(content)
+
+    return BAMClient(keys={"marche_des_changes": "key"}, decoder=decoder)
+
+
+def _sent_headers():
+    return requests.Session.get.call_args.kwargs["headers"]
+
+
+def test_poll_detects_unchanged_bodies(client, mock_requests_get, decoded):
+    first = client.poll_cours_virement()
+    assert first.changed and first.data == RATES
+    assert "If-None-Match" not in _sent_headers()
+
+    # Without validators from the server, the body is hashed, and not decoded again.
+    second = client.poll_cours_virement()
+    assert not second.changed
+    assert second.data is first.data
+    assert len(decoded) == 1
+
+    mock_requests_get.json.return_value = [dict(RATES[0], moyen=10.99)]
+    third = client.poll_cours_virement()
+    assert third.changed and third.data[0]["moyen"] == 10.99
+    assert len(decoded) == 2
+
+    # Each query has its own validators.
+    assert client.poll_cours_virement("EUR").changed
+    assert client.poll_cours_BBE().changed
+
+
+def test_poll_sends_conditional_requests(client, mock_requests_get, decoded):
+    mock_requests_get.headers = {
+        "ETag": '"0x8DB5"',
+        "Last-Modified": "Thu, 11 May 2023 12:30:00 GMT",
+    }
+    first = client.poll_cours_BBE("", "2023-05-11")
+
+    mock_requests_get.status_code = 304
+    second = client.poll_cours_BBE("", "2023-05-11")
+
+    assert _sent_headers()["If-None-Match"] == '"0x8DB5"'
+    assert _sent_headers()["If-Modified-Since"] == "Thu, 11 May 2023 12:30:00 GMT"
+    assert not second.changed
+    assert second.data is first.data
+    assert len(decoded) == 1
+
+
+def test_poll_of_empty_responses(client, mock_requests_get):
+    mock_requests_get.status_code = 204
+    mock_requests_get.json.return_value = None
+
+    assert client.poll_cours_BBE() == ([], True)
+    assert client.poll_cours_BBE() == ([], False)
+
+
+def test_poll_updates_the_cache(mock_requests_get):
+    mock_requests_get.status_code = 200
+    mock_requests_get.headers = {}
+    mock_requests_get.json.return_value = RATES
+    client = BAMClient(keys={"marche_des_changes": "key"}, cache=MemoryCache())
+
+    client.poll_cours_BBE()
+    client.poll_cours_BBE()
+    # The polls bypass the cache, whose reads are then served locally.
+    assert requests.Session.get.call_count == 2
+    assert client.cache.get(API["cours_BBE"], {"libDevise": "", "date": ""}) == RATES
+
+
+def test_poll_rejects_a_304_without_previous_response(client, mock_requests_get, decoded):
+    mock_requests_get.status_code = 304
+
+    with pytest.raises(ValueError):
+        client.poll_cours_BBE()
+    assert decoded == []
+
+
+def test_validators_resolve_each_response():
+    validators = Validators()
+    first = MagicMock(status_code=200, headers={}, content=b"[1]")
+    second = MagicMock(status_code=200, headers={}, content=b"[2]")
+
+    # Each response gets its own outcome, whatever the other responses resolved since.
+    assert validators.resolve(first, lambda: [1]) == ([1], True)
+    assert validators.resolve(second, lambda: [2]) == ([2], True)
+    assert validators.resolve(second, lambda: [2]) == ([2], False)
@@ -0,0 +1,215 @@
+import json
+from datetime import date
+from unittest.mock import PropertyMock
+
+import pytest
+import requests
+
+np = pytest.importorskip("numpy")
+
+from BAMapi.api import courbe_BDT_panel
+from BAMapi.client import BAMClient
+from BAMapi.curve import TENORS, BDTCurve, BDTPanel
+
+
+POINTS = [
+    ("2019-01-10", 2.18, 120.0),
+    ("2019-04-04", 2.25, 310.5),
+    ("2020-01-02", 2.39, 75.0),
+    ("2021-12-31", 2.62, 12.3),
+    ("2024-01-05", 2.98, 240.1),
+    ("2028-12-28", 3.41, 80.0),
+    ("2033-07-18", 3.704, 155.11),
+    ("2046-02-19", 4.326, 195.25),
+]
+
+RECORDS = [
+    {
+        "dateEcheance": maturity,
+        "dateValeur": "2018-12-28",
+        "dateCourbe": "2019-01-02",
+        "tmp": rate,
+        "volume": volume,
+    }
+    for maturity, rate, volume in reversed(POINTS)
+]
+
+
+@pytest.fixture
+def curve():
+    return BDTCurve.from_records(RECORDS)
+
+
+def test_curve_from_records(curve):
+    assert len(curve) == len(POINTS)
+    assert curve.date == "2019-01-02"
+    # The points are sorted by maturity.
+    assert np.all(np.diff(curve.maturities) > 0)
+    assert curve.maturities[0] == pytest.approx(8 / 365)
+    assert curve.rates.tolist() == pytest.approx([rate for _, rate, _ in POINTS])
+
+    with pytest.raises(ValueError):
+        BDTCurve.from_records([])
+    with pytest.raises(ValueError):
+        BDTCurve.from_records(RECORDS + [dict(RECORDS[0], dateCourbe="2019-01-03")])
+
+
+def test_curve_merges_the_points_of_a_maturity():
+    curve = BDTCurve([1, 2, 1], [2.0, 3.0, 4.0], volumes=[300, 10, 100])
+
+    assert curve.maturities.tolist() == [1, 2]
+    assert curve.rates.tolist() == pytest.approx([2.5, 3.0])
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_curve_interpolations(curve, method):
+    # The interpolations go through the points, and are flat beyond them.
+    assert curve.rates_at(curve.maturities, method) == pytest.approx(curve.rates)
+    assert curve.rates_at(0.0, method) == pytest.approx(curve.rates[0])
+    assert curve.rates_at(100.0, method) == pytest.approx(curve.rates[-1])
+
+    maturities = np.linspace(0, 30, 5000).reshape(100, 50)
+    rates = curve.rates_at(maturities, method)
+    assert rates.shape == maturities.shape
+    assert rates.min() >= 2.0 and rates.max() <= 4.5
+
+
+def test_curve_cubic_spline_is_smooth(curve):
+    t = np.linspace(curve.maturities[0], curve.maturities[-1], 20001)
+    slopes = np.diff(curve.rates_at(t, "cubic")) / np.diff(t)
+
+    # The first derivative is continuous at the knots.
+    assert np.max(np.abs(np.diff(slopes))) < 1e-3
+
+
+@pytest.mark.parametrize("method", ["nelson_siegel", "svensson"])
+def test_curve_parametric_fits(curve, method):
+    rates = curve.rates_at(curve.maturities, method)
+    assert np.max(np.abs(rates - curve.rates)) < 0.1
+
+    parameters = curve.parameters(method)
+    assert len(parameters["taus"]) == (2 if method == "svensson" else 1)
+    # The long-term rate, then the short-term rate, of the model.
+    assert curve.rates_at(1e6, method) == pytest.approx(parameters["betas"][0], abs=1e-3)
+    assert curve.rates_at(0.0, method) == pytest.approx(sum(parameters["betas"][:2]))
+
+    # The model is fitted once.
+    assert curve.parameters(method) == parameters
+    assert curve._fits[method] is curve._fit(method)
+
+
+def test_curve_invalid_methods(curve):
+    with pytest.raises(ValueError):
+        curve.rates_at(1.0, "quadratic")
+    with pytest.raises(ValueError):
+        curve.parameters("linear")
+    with pytest.raises(ValueError):
+        BDTCurve([1, 2, 3], [2.0, 2.5, 3.0]).rates_at(1.0, "svensson")
+
+
+def test_curve_year_fractions(curve):
+    fractions = curve.year_fractions(["2019-01-02", "2020-01-02"])
+
+    assert fractions.tolist() == [0.0, 1.0]
+    assert curve.rates_at(fractions[1]) == pytest.approx(2.39)
+
+
+def test_client_caches_the_curves(mock_requests_get):
+    mock_requests_get.status_code = 200
+    mock_requests_get.json.return_value = RECORDS
+    client = BAMClient(keys={"marche_obligataire": "key"})
+
+    curve = client.courbe_BDT_curve("2019-01-02")
+    assert curve.date == "2019-01-02"
+    assert client.courbe_BDT_curve("2019-01-02") is curve
+    # A curve is kept per dateCourbe, be it requested with or without its date.
+    assert client.courbe_BDT_curve() is curve
+    assert requests.Session.get.call_count == 2
+
+    mock_requests_get.json.return_value = []
+    with pytest.raises(ValueError):
+        client.courbe_BDT_curve("2019-01-03")
+
+
+def _records(day, shift):
+    """The records of the curve of a day, shifted by `shift` percent."""
+    return [dict(record, dateCourbe=day, tmp=record["tmp"] + shift) for record in RECORDS]
+
+
+def test_panel_from_responses():
+    panel = BDTPanel.from_responses(
+        [_records("2023-01-03", 0.1), [], _records("2023-01-02", 0.0), _records("2023-01-03", 9)]
+    )
+
+    assert len(panel) == 2
+    assert panel.dates.tolist() == [date(2023, 1, 2), date(2023, 1, 3)]
+    assert panel.rates.shape == (2, len(TENORS))
+    assert panel.offsets.tolist() == [0, len(POINTS), 2 * len(POINTS)]
+    # The first response of a date is kept.
+    assert panel.point_rates[len(POINTS) :] == pytest.approx(
+        panel.point_rates[: len(POINTS)] + 0.1
+    )
+    assert np.all(np.diff(panel.points("2023-01-02")[0]) > 0)
+
+    curve = panel.curve("2023-01-03")
+    assert curve.rates_at(TENORS) == pytest.approx(panel.rates[1])
+    assert "2023-01-02" in panel and "2023-01-04" not in panel
+    with pytest.raises(KeyError):
+        panel.points("2023-01-04")
+
+
+def test_panel_slice_and_extend():
+    days = ["2023-01-02", "2023-01-03", "2023-01-04", "2023-01-05"]
+    panel = BDTPanel.from_responses(_records(day, i) for i, day in enumerate(days))
+
+    part = panel.slice("2023-01-03", "2023-01-04")
+    assert part.dates.tolist() == [date(2023, 1, 3), date(2023, 1, 4)]
+    assert np.shares_memory(part.rates, panel.rates)
+    assert part.points("2023-01-04")[1] == pytest.approx(panel.points("2023-01-04")[1])
+    assert len(panel.slice("2023-01-06")) == 0
+    assert len(panel.slice(end="2023-01-02")) == 1
+
+    extended = panel.slice(end="2023-01-02").extend(panel.slice("2023-01-04")).extend(part)
+    assert extended.dates.tolist() == panel.dates.tolist()
+    assert extended.rates == pytest.approx(panel.rates)
+    assert extended.point_rates == pytest.approx(panel.point_rates)
+
+    with pytest.raises(ValueError):
+        panel.extend(BDTPanel.from_responses([], tenors=(1.0, 2.0)))
+
+
+def test_panel_to_pandas():
+    pytest.importorskip("pandas")
+
+    days = ["2023-01-02", "2023-01-03", "2023-01-04", "2023-01-05"]
+    panel = BDTPanel.from_responses(_records(day, i) for i, day in enumerate(days))
+
+    frame = panel.to_pandas()
+    assert frame.shape == (4, len(TENORS))
+    assert frame.loc["2023-01-05", 10.0] == panel.rates[3, TENORS.index(10.0)]
+
+
+def test_courbe_BDT_panel(mock_requests_get, monkeypatch):
+    mock_requests_get.status_code = 200
+    type(mock_requests_get).content = PropertyMock(
+        side_effect=lambda: json.dumps(
+            _records(requests.Session.get.call_args.kwargs["params"]["dateCourbe"], 0.0)
+        ).encode()
+    )
+    monkeypatch.setattr(
+        "BAMapi.client._DEFAULT_CLIENT",
+        BAMClient(keys={"marche_obligataire": "key"}, coalesce=False),
+    )
+
+    # Week-ends are not requested.
+    panel = courbe_BDT_panel("2023-01-02", "2023-01-08", max_workers=1)
+    assert len(panel) == 5
+    assert requests.Session.get.call_count == 5
+
+    panel = courbe_BDT_panel("2023-01-02", "2023-01-10", panel=panel, max_workers=1)
+    assert len(panel) == 7
+    assert requests.Session.get.call_count == 7
+
+    # Unlike the exchange rates, the curves of the 25th and 26th of December are requested.
+    december = courbe_BDT_panel("2023-12-22", "2023-12-26", max_workers=1)
+    assert december.dates.tolist() == [date(2023, 12, 22), date(2023, 12, 25), date(2023, 12, 26)]
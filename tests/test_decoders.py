@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from BAMapi.client import BAMClient
+from BAMapi.decoders import BACKENDS, decode_records, get_decoder
+from BAMapi.records import FXRate
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_decoders(backend, sample_data):
+    if backend != "json":
+        pytest.importorskip(backend)
+
+    payload = json.dumps(sample_data).encode()
+
+    assert get_decoder(backend)(payload) == sample_data
+
+
+def test_default_decoder(sample_data):
+    assert get_decoder()(json.dumps(sample_data)) == sample_data
+
+
+def test_unknown_decoder():
+    with pytest.raises(ValueError):
+        get_decoder("yaml")
+
+
+def test_decode_records(sample_data, monkeypatch):
+    rates = decode_records(json.dumps(sample_data).encode(), FXRate)
+
+    assert rates == [FXRate.from_dict(rate) for rate in sample_data]
+    assert decode_records(b"", FXRate) == []
+
+    # Without orjson, the records fall back to the standard library rather than msgspec.
+    loaded = []
+
+    def load_backend(name):
+        loaded.append(name)
+        if name == "orjson":
+            raise ImportError(name)
+        return json.loads
+
+    monkeypatch.setattr("BAMapi.decoders._load_backend", load_backend)
+
+    assert decode_records(json.dumps(sample_data).encode(), FXRate) == rates
+    assert loaded == ["orjson", "json"]
+
+
+def test_client_decoder(mock_requests_get, sample_data):
+    calls = []
+
+    def decoder(payload):
+        calls.append(payload)
+        return json.loads(payload)
+
+    mock_requests_get.json.return_value = sample_data
+
+    client = BAMClient(decoder=decoder)
+
+    assert client.get("key", "https://invalid_url.BAMAPI", {}) == sample_data
+    assert len(calls) == 1
+    assert BAMClient(decoder="json").decoder is json.loads
@@ -0,0 +1,130 @@
+import pytest
+import requests
+
+np = pytest.importorskip("numpy")
+
+from BAMapi.client import BAMClient
+from BAMapi.fx import FXConverter
+
+
+TRANSFERS = [
+    {"date": "2023-05-11T12:30:00", "libDevise": "EUR", "moyen": 10.9884, "uniteDevise": 1},
+    {"date": "2023-05-11T12:30:00", "libDevise": "USD", "moyen": 10.0319, "uniteDevise": 1},
+    {"date": "2023-05-11T12:30:00", "libDevise": "NOK", "moyen": 93.52, "uniteDevise": 100},
+]
+
+
+@pytest.fixture
+def converter(sample_data):
+    return FXConverter.from_records(sample_data)
+
+
+def test_converter_from_records(converter, sample_data):
+    # The sample quotes some currencies twice.
+    assert len(converter) == len({rate["libDevise"] for rate in sample_data}) + 1
+    assert converter.currencies[0] == "MAD"
+    assert converter.date == "2023-05-12T08:30:00"
+
+    nok = next(rate for rate in sample_data if rate["libDevise"] == "NOK")
+    # The quotes are per 100 NOK.
+    assert converter.rate("NOK", "MAD", "buy") == pytest.approx(nok["achatClientele"] / 100)
+    assert converter.rate("MAD", "NOK", "buy") == pytest.approx(100 / nok["venteClientele"])
+
+    with pytest.raises(ValueError):
+        FXConverter.from_records([])
+
+
+def test_converter_matrices(converter):
+    mid, buy, sell = (converter.matrix(side) for side in ("mid", "buy", "sell"))
+
+    assert mid.shape == (len(converter), len(converter))
+    assert np.diag(buy).tolist() == [1.0] * len(converter)
+    # The cross rates are consistent: EUR -> USD -> MAD is EUR -> MAD.
+    eur, usd = converter.currencies.index("EUR"), converter.currencies.index("USD")
+    assert mid[eur, usd] * mid[usd, 0] == pytest.approx(mid[eur, 0])
+    assert mid[eur, usd] * mid[usd, eur] == pytest.approx(1.0)
+    # A round trip costs the spread, and buying costs more than selling.
+    assert buy[eur, usd] * buy[usd, eur] < 1.0
+    assert sell == pytest.approx(1 / buy.T)
+    assert np.all(buy <= mid + 1e-12) and np.all(sell >= mid - 1e-12)
+
+    with pytest.raises(ValueError):
+        converter.matrix("ask")
+    with pytest.raises(ValueError):
+        mid[0, 0] = 2.0
+
+
+def test_converter_convert(converter):
+    assert converter.convert(100.0, "EUR", "EUR") == 100.0
+    assert converter.convert(100.0, "EUR", "USD") == pytest.approx(
+        100 * converter.rate("EUR", "USD")
+    )
+
+    amounts = np.arange(1, 100001, dtype=np.float64)
+    currencies = np.array(converter.currencies)
+    sources = currencies[np.arange(len(amounts)) % len(currencies)]
+    targets = currencies[(np.arange(len(amounts)) * 7) % len(currencies)]
+
+    converted = converter.convert(amounts, sources, targets, side="sell")
+    assert converted.shape == amounts.shape
+    for i in (0, 5, 99999):
+        assert converted[i] == pytest.approx(
+            amounts[i] * converter.rate(sources[i], targets[i], "sell")
+        )
+
+    codes = converter.codes(sources)
+    assert codes.dtype.kind == "i"
+    assert converter.convert(amounts, codes, converter.codes(targets), "sell").tolist() == (
+        converted.tolist()
+    )
+
+    assert converter.convert([[1.0, 2.0]], "USD", "MAD").shape == (1, 2)
+    with pytest.raises(ValueError):
+        converter.convert(amounts[:2], ["EUR", "XXX"], "MAD")
+
+
+def test_converter_of_mid_rates():
+    converter = FXConverter.from_records(TRANSFERS)
+
+    assert converter.rate("NOK", "MAD") == pytest.approx(0.9352)
+    assert converter.rate("EUR", "USD", "buy") == converter.rate("EUR", "USD")
+
+
+def test_converter_to_pandas():
+    pytest.importorskip("pandas")
+
+    converter = FXConverter.from_records(TRANSFERS)
+
+    assert converter.to_pandas().loc["EUR", "MAD"] == pytest.approx(10.9884)
+
+
+def test_client_caches_the_converters(mock_requests_get, sample_data):
+    mock_requests_get.status_code = 200
+    mock_requests_get.json.return_value = sample_data
+    client = BAMClient(keys={"marche_des_changes": "key"})
+
+    converter = client.cours_BBE_converter("2023-05-12")
+    assert client.cours_BBE_converter("2023-05-12") is converter
+    # A converter is kept per publication date, be it requested with or without its date.
+    assert client.cours_BBE_converter() is converter
+    assert requests.Session.get.call_count == 2
+    assert requests.Session.get.call_args.kwargs["params"]["libDevise"] == ""
+
+    mock_requests_get.json.return_value = TRANSFERS
+    assert client.cours_virement_converter() is not converter
+
+    # Requested before its publication, a date gets the table of the previous day...
+    mock_requests_get.json.return_value = sample_data
+    assert client.cours_BBE_converter("2023-05-15") is converter
+    # ... which is not kept as the one of the date, once it is published.
+    mock_requests_get.json.return_value = [
+        dict(rate, date="2023-05-15T08:30:00") for rate in sample_data
+    ]
+    published = client.cours_BBE_converter("2023-05-15")
+    assert published is not converter
+    assert published.date == "2023-05-15T08:30:00"
+    assert client.cours_BBE_converter("2023-05-15") is published
+
+    mock_requests_get.json.return_value = []
+    with pytest.raises(ValueError):
+        client.cours_BBE_converter("2023-05-13")
@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+
+
+# Imports BAMapi in a fresh interpreter, and reports what the import cost.
+IMPORT_SCRIPT = """
+import importlib.util, json, pathlib, sys, time
+
+package = pathlib.Path(importlib.util.find_spec("BAMapi").origin).parent
+config_existed = (package / "config.ini").exists()
+
+start = time.perf_counter()
+import BAMapi
+elapsed = time.perf_counter() - start
+
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": sorted(sys.modules),
+    "config_created": not config_existed and (package / "config.ini").exists(),
+}))
+"""
+
+
+def _import_bamapi() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_is_lazy():
+    report = _import_bamapi()
+
+    # The HTTP stack, asyncio and the optional backends are imported on first use.
+    for module in ("requests", "urllib3", "asyncio", "httpx", "numpy", "orjson", "sqlite3"):
+        assert module not in report["modules"]
+
+    # Neither is the config file read nor created.
+    assert not report["config_created"]
+
+
+def test_import_time():
+    # Best of 3 cold starts, to smooth out the noise of the machine.
+    seconds = min(_import_bamapi()["seconds"] for _ in range(3))
+
+    assert seconds < 0.5, f"import BAMapi took {seconds * 1000:.1f} ms"
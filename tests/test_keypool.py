@@ -0,0 +1,117 @@
+import pytest
+import requests
+
+from BAMapi.client import BAMClient
+from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
+from BAMapi.keypool import KeyPool
+
+
+KEYS = ("primary", "secondary")
+
+
+def test_key_pool_round_robin(clock):
+    pool = KeyPool()
+
+    assert [pool.next_key(KEYS) for _ in range(4)] == [
+        "primary",
+        "secondary",
+        "primary",
+        "secondary",
+    ]
+    assert pool.next_key(("single",)) == "single"
+
+
+def test_key_pool_cooldown(clock):
+    pool = KeyPool(cooldown=60)
+
+    pool.report_failure("primary")
+
+    assert not pool.is_healthy("primary")
+    assert [pool.next_key(KEYS) for _ in range(3)] == ["secondary"] * 3
+    assert pool.health() == {"primary": {"failures": 1, "cooldown": 60.0}}
+
+    clock[0] += 60
+
+    assert pool.is_healthy("primary")
+    assert pool.choose(KEYS, exclude=["secondary"]) == "primary"
+
+    pool.report_success("primary")
+    assert pool.health() == {}
+
+
+def test_key_pool_every_key_cooling_down(clock):
+    pool = KeyPool()
+
+    pool.report_failure("primary", cooldown=10)
+    pool.report_failure("secondary", cooldown=5)
+
+    # The key available first is used rather than none.
+    assert pool.choose(KEYS) is None
+    assert pool.next_key(KEYS) == "secondary"
+    assert pool.next_key(KEYS, tried=["secondary"]) == "primary"
+
+
+@pytest.mark.parametrize(
+    "error, cooldown",
+    [
+        (InvalidAPIKeys(), 300.0),
+        (RateLimitExceededError(retry_after=7), 7.0),
+        (RateLimitExceededError(), 1.0),
+    ],
+)
+def test_key_pool_fail_over(error, cooldown, clock):
+    pool = KeyPool()
+
+    assert pool.fail_over(KEYS, ["primary"], "primary", error)
+    assert pool.health()["primary"]["cooldown"] == cooldown
+
+    assert not pool.fail_over(KEYS, KEYS, "secondary", error)
+    assert not pool.fail_over(("single",), ["single"], "single", error)
+
+
+def test_client_fails_over_on_invalid_key(mock_requests_get, make_response, clock):
+    def get(url, headers, params, timeout):
+        key = headers["Ocp-Apim-Subscription-Key"]
+        return make_response(401 if key == "primary" else 200)
+
+    requests.Session.get.side_effect = get
+    client = BAMClient(keys={"marche_obligataire": KEYS}, coalesce=False)
+
+    for _ in range(3):
+        assert client.courbe_BDT("2019-01-02") == []
+
+    used = [
+        call.kwargs["headers"]["Ocp-Apim-Subscription-Key"]
+        for call in requests.Session.get.call_args_list
+    ]
+    # The rejected key is taken out of the rotation after its first failure.
+    assert used == ["primary", "secondary", "secondary", "secondary"]
+    assert not client.key_pool.is_healthy("primary")
+
+
+def test_client_raises_when_every_key_is_invalid(mock_requests_get, clock):
+    mock_requests_get.status_code = 401
+
+    client = BAMClient(keys={"marche_obligataire": KEYS})
+
+    with pytest.raises(InvalidAPIKeys):
+        client.courbe_BDT("2019-01-02")
+
+    assert requests.Session.get.call_count == 2
+
+
+def test_client_fails_over_on_rate_limit(mock_requests_get, make_response, clock):
+    def get(url, headers, params, timeout):
+        key = headers["Ocp-Apim-Subscription-Key"]
+        if key == "primary":
+            return make_response(429, {"message": "Rate limit is exceeded."})
+        return make_response()
+
+    requests.Session.get.side_effect = get
+    client = BAMClient(keys={"marche_obligataire": KEYS})
+
+    assert client.courbe_BDT("2019-01-02") == []
+
+    # No backoff: the request went straight to the secondary key.
+    assert clock[0] == 1000.0
+    assert requests.Session.get.call_count == 2
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+
+from BAMapi.cache import MemoryCache
+from BAMapi.client import BAMClient
+from BAMapi.constants import API
+from BAMapi.exceptions import InvalidAPIKeys
+from BAMapi.metrics import MetricsAggregator, RequestEvent, _quantile
+
+
+def test_quantile():
+    ordered = [float(i) for i in range(1, 101)]
+
+    assert _quantile(ordered, 0.5) == pytest.approx(50.5)
+    assert _quantile(ordered, 0.99) == pytest.approx(99.01)
+    assert _quantile([3.0], 0.95) == 3.0
+
+
+def test_metrics_aggregator():
+    metrics = MetricsAggregator()
+
+    for total in range(1, 101):
+        metrics(RequestEvent("courbe_BDT", {}, False, 200, total=total / 100, size=10))
+    metrics(RequestEvent("cours_BBE", {}, False, 200, total=0.5))
+    metrics(RequestEvent("cours_BBE", {}, True, total=0.001))
+    metrics(RequestEvent("cours_BBE", {}, False, 401, retries=1, error="InvalidAPIKeys"))
+
+    assert metrics.endpoints == ["courbe_BDT", "cours_BBE"]
+    assert metrics.percentiles("courbe_BDT") == {
+        "p50": pytest.approx(0.505),
+        "p95": pytest.approx(0.9505),
+        "p99": pytest.approx(0.9901),
+    }
+
+    summary = metrics.summary()
+    assert summary["courbe_BDT"]["count"] == 100
+    assert summary["courbe_BDT"]["bytes"] == 1000
+    assert summary["cours_BBE"]["cache_hits"] == 1
+    # The cache hits are counted, but left out of the latencies.
+    assert summary["cours_BBE"]["count"] == 3
+    assert metrics.percentiles("cours_BBE")["p50"] == pytest.approx(0.25)
+    assert summary["cours_BBE"]["errors"] == 1
+    assert summary["cours_BBE"]["retries"] == 1
+
+    metrics.reset()
+    assert metrics.summary() == {}
+
+
+def test_metrics_to_prometheus():
+    metrics = MetricsAggregator()
+    metrics(RequestEvent("courbe_BDT", {}, False, 200, total=0.25, size=512))
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE bamapi_request_duration_seconds summary" in text
+    assert 'bamapi_request_duration_seconds{endpoint="courbe_BDT",quantile="0.95"} 0.25' in text
+    assert 'bamapi_request_duration_seconds_count{endpoint="courbe_BDT"} 1' in text
+    assert "# TYPE bamapi_response_bytes_total counter" in text
+    assert 'bamapi_response_bytes_total{endpoint="courbe_BDT"} 512' in text
+    assert not text.endswith("# EOF\n")
+
+    openmetrics = metrics.to_prometheus(openmetrics=True)
+
+    assert "# TYPE bamapi_response_bytes counter" in openmetrics
+    assert openmetrics.endswith("# EOF\n")
+
+
+def test_client_hooks(mock_requests_get, sample_data):
+    mock_requests_get.status_code = 200
+    mock_requests_get.json.return_value = sample_data
+    mock_requests_get.elapsed = timedelta(milliseconds=30)
+
+    events = []
+    client = BAMClient(hooks=[events.append], cache=MemoryCache())
+
+    client.courbe_BDT("2019-01-02")
+    client.courbe_BDT("2019-01-02")
+
+    sent, cached = events
+    assert sent.endpoint == "courbe_BDT"
+    assert sent.querystring == {"dateCourbe": "2019-01-02"}
+    assert sent.cache_hit is False
+    assert sent.status_code == 200
+    assert sent.retries == 0
+    assert sent.reused_connection is True
+    assert sent.ttfb == pytest.approx(0.03)
+    assert sent.decode >= 0
+    assert sent.size == len(mock_requests_get.content)
+    assert sent.total > 0
+    assert sent.dns is None and sent.connect is None and sent.tls is None
+
+    assert cached.cache_hit is True
+    assert cached.status_code is None
+
+
+def test_client_hooks_report_errors(mock_requests_get):
+    mock_requests_get.status_code = 401
+    mock_requests_get.json.return_value = []
+    mock_requests_get.elapsed = timedelta(milliseconds=5)
+
+    metrics = MetricsAggregator()
+    client = BAMClient(hooks=[metrics])
+
+    with pytest.raises(InvalidAPIKeys):
+        client.get("sub-key", API["oprts_de_PM"], {"dateAdjudicationDu": "2023-01-01"})
+
+    assert metrics.summary()["oprts_de_PM"]["errors"] == 1
+
+
+def test_client_hooks_errors_are_logged(mock_requests_get, sample_data, caplog):
+    mock_requests_get.json.return_value = sample_data
+    mock_requests_get.elapsed = timedelta(milliseconds=5)
+
+    def failing_hook(event):
+        raise RuntimeError("hook")
+
+    events = []
+    client = BAMClient(hooks=[failing_hook, events.append])
+
+    # The request succeeds, and the next hooks are still called.
+    assert client.courbe_BDT("2019-01-02")
+    assert len(events) == 1
+    assert "failing_hook" in caplog.text
+
+
+def test_client_without_hooks_is_not_timed(mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    client = BAMClient()
+    client.courbe_BDT("2019-01-02")
+
+    # The mocked elapsed attribute was never read.
+    assert not mock_requests_get.elapsed.total_seconds.called
@@ -0,0 +1,143 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from BAMapi.cache import MemoryCache
+from BAMapi.client import BAMClient
+from BAMapi.constants import API
+from BAMapi.prefetch import Prefetcher
+
+
+# A Friday, after the publication of the exchange rates of the banknotes.
+NOW = datetime(2023, 5, 12, 9, 0)
+
+RATES = [
+    {
+        "achatClientele": 9.9878,
+        "date": "2023-05-12T08:30:00",
+        "libDevise": "EUR",
+        "uniteDevise": 1,
+        "venteClientele": 11.6074,
+    }
+]
+
+
+@pytest.fixture
+def client(mock_requests_get):
+    mock_requests_get.status_code = 200
+    mock_requests_get.json.return_value = RATES
+    return BAMClient(keys={"marche_des_changes": "key"}, cache=MemoryCache(), fx_snapshots=True)
+
+
+def test_prefetcher_requires_a_cache():
+    with pytest.raises(ValueError):
+        Prefetcher(BAMClient())
+    with pytest.raises(ValueError):
+        Prefetcher(BAMClient(cache=MemoryCache()), endpoints=["oprts_de_PM"])
+
+
+def test_prefetcher_poll(client, mock_requests_get):
+    prefetcher = Prefetcher(client, endpoints=["cours_BBE"])
+    notifications = []
+    prefetcher.subscribe(lambda endpoint, data: notifications.append((endpoint, data)))
+    prefetcher.subscribe(lambda *args: notifications.append("BDT"), ["courbe_BDT"])
+
+    assert prefetcher.poll("cours_BBE", NOW)
+    assert notifications == [("cours_BBE", RATES)]
+    # The data is notified once per publication.
+    assert prefetcher.poll("cours_BBE", NOW)
+    assert len(notifications) == 1
+
+    calls = requests.Session.get.call_count
+    # Both the query without a date and the one with the date of the data are served locally.
+    assert client.cours_BBE() == RATES
+    assert client.cours_BBE(date_time="2023-05-12") == RATES
+    assert client.cours_BBE("EUR", "2023-05-12") == RATES
+    assert requests.Session.get.call_count == calls
+
+    # The data of the previous day is not cached as the data of the day.
+    mock_requests_get.json.return_value = [dict(RATES[0], date="2023-05-11T08:30:00")]
+    assert not prefetcher.poll("cours_BBE", NOW + timedelta(days=3))
+    mock_requests_get.json.return_value = []
+    assert not prefetcher.poll("cours_BBE", NOW + timedelta(days=3))
+
+
+def test_prefetcher_schedule(client):
+    prefetcher = Prefetcher(client, jitter=0, backoff=30, max_backoff=100, deadline=3600)
+    publication = datetime(2023, 5, 12, 8, 30)
+
+    # The polls back off until the data is available.
+    delays = [
+        prefetcher._schedule("cours_BBE", publication, available=False) - publication
+        for _ in range(4)
+    ]
+    assert delays == [timedelta(seconds=seconds) for seconds in (30, 60, 100, 100)]
+    assert prefetcher._schedule(
+        "cours_BBE", publication, False, retry_after=500
+    ) == publication + timedelta(seconds=500)
+
+    # Then wait for the next publication, or until the deadline.
+    tomorrow = datetime(2023, 5, 13, 8, 30)
+    assert prefetcher._schedule("cours_BBE", publication, available=True) == tomorrow
+    assert prefetcher._schedule("cours_BBE", publication + timedelta(hours=2), False) == tomorrow
+    assert prefetcher._attempts["cours_BBE"] == 0
+
+    # Before its publication time, an endpoint is polled at its publication time.
+    early = datetime(2023, 5, 12, 7, 0)
+    assert prefetcher._schedule("cours_BBE", early, available=False) == publication
+    # No exchange rates are published on week-ends.
+    saturday = datetime(2023, 5, 13, 9, 0)
+    assert prefetcher._schedule("cours_BBE", saturday, False) == datetime(2023, 5, 14, 8, 30)
+
+
+def test_prefetcher_run_pending(client, mock_requests_get):
+    prefetcher = Prefetcher(client, endpoints=["cours_BBE", "cours_virement"], jitter=0)
+
+    next_run = prefetcher.run_pending(NOW)
+    # cours_BBE is published, cours_virement is polled at 12:30.
+    assert next_run == datetime(2023, 5, 12, 12, 30)
+    status = prefetcher.status()
+    assert status["cours_BBE"]["published"] == NOW.date()
+    assert status["cours_BBE"]["next_run"] == datetime(2023, 5, 13, 8, 30)
+
+    calls = requests.Session.get.call_count
+    assert prefetcher.run_pending(NOW) == next_run
+    assert requests.Session.get.call_count == calls
+
+    mock_requests_get.status_code = 429
+    mock_requests_get.headers = {"Retry-After": "120"}
+    mock_requests_get.json.return_value = {"statusCode": 429, "message": "Rate limit is exceeded."}
+    client.max_retries = 0
+    prefetcher.run_pending(datetime(2023, 5, 12, 12, 30))
+
+    status = prefetcher.status()["cours_virement"]
+    assert "RateLimitExceededError" in status["error"]
+    assert status["next_run"] == datetime(2023, 5, 12, 12, 32)
+
+
+def test_prefetcher_in_casablanca_time(client):
+    prefetcher = Prefetcher(client, endpoints=["cours_BBE", "cours_virement"], jitter=0)
+    # 07:45 UTC is 08:45 in Casablanca (UTC+1): the rates of the day are published.
+    now = datetime(2023, 5, 12, 7, 45, tzinfo=timezone.utc)
+
+    next_run = prefetcher.run_pending(now)
+    assert prefetcher.status()["cours_BBE"]["published"] == date(2023, 5, 12)
+    # cours_virement is polled at 12:30 in Casablanca.
+    assert next_run == datetime(2023, 5, 12, 11, 30, tzinfo=timezone.utc)
+
+
+def test_prefetcher_thread(client, monkeypatch):
+    monkeypatch.setattr("BAMapi.prefetch._now", lambda: NOW)
+    published = threading.Event()
+    prefetcher = Prefetcher(client, endpoints=["cours_BBE"])
+    prefetcher.subscribe(lambda endpoint, data: published.set())
+    prefetcher.subscribe(lambda endpoint, data: 1 / 0)
+
+    with prefetcher:
+        assert published.wait(5)
+
+    assert prefetcher._thread is None
+    assert "ZeroDivisionError" in prefetcher.status()["cours_BBE"]["error"]
+    assert client.cache.get(API["cours_BBE"], {"libDevise": "", "date": ""}) == RATES
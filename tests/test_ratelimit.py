@@ -0,0 +1,77 @@
+import pytest
+import requests
+
+from BAMapi.client import BAMClient
+from BAMapi.exceptions import RateLimitExceededError
+from BAMapi.ratelimit import RateLimiter, TokenBucket, _backoff_delay
+
+
+def test_token_bucket(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock[0] += 10
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_penalize(clock):
+    bucket = TokenBucket(rate=1)
+
+    bucket.penalize(3)
+    assert bucket.reserve() == pytest.approx(4)
+
+    bucket.acquire()
+    assert clock[0] == pytest.approx(1005)
+
+
+def test_rate_limiter_buckets_per_key():
+    limiter = RateLimiter(rate=1, rates={"fast": 10})
+
+    assert limiter.bucket("key") is limiter.bucket("key")
+    assert limiter.bucket("key") is not limiter.bucket("other")
+    assert limiter.bucket("fast").rate == 10
+
+    limiter.acquire("key")
+    # The first key's quota does not affect the other keys.
+    assert limiter.reserve("key") > 0
+    assert limiter.reserve("other") == 0
+
+
+def test_backoff_delay():
+    for attempt in range(4):
+        assert 0 <= _backoff_delay(attempt, 0.5) <= 0.5 * 2**attempt
+
+    assert 5 <= _backoff_delay(0, 0.5, retry_after=5) <= 5.5
+
+
+RATE_LIMITED = {"message": "Rate limit is exceeded. Try again in 2 seconds."}
+
+
+def test_client_retries_rate_limited_requests(
+    clock, mock_requests_get, make_response, sample_data
+):
+    mock_requests_get.json.return_value = sample_data
+    requests.Session.get.side_effect = [make_response(429, RATE_LIMITED), mock_requests_get]
+
+    client = BAMClient(rate_limiter=RateLimiter(rate=10))
+
+    assert client.get("key", "https://invalid_url.BAMAPI", {}) == sample_data
+    assert requests.Session.get.call_count == 2
+    # The delay given by the message body has been honoured.
+    assert clock[0] >= 1002
+
+
+def test_client_gives_up_after_max_retries(clock, mock_requests_get, make_response):
+    requests.Session.get.side_effect = lambda **kwargs: make_response(429, RATE_LIMITED)
+
+    client = BAMClient(max_retries=2)
+
+    with pytest.raises(RateLimitExceededError) as e:
+        client.get("key", "https://invalid_url.BAMAPI", {})
+
+    assert e.value.retry_after == 2
+    assert requests.Session.get.call_count == 3
@@ -0,0 +1,124 @@
+from datetime import date, datetime
+
+import pytest
+
+from BAMapi.records import (
+    BDTPoint,
+    BTExchange,
+    BTIssuance,
+    FXRate,
+    PMOperation,
+    RECORD_TYPES,
+    to_records,
+)
+
+
+def test_fx_rates(sample_data):
+    rates = to_records(sample_data, FXRate)
+
+    assert len(rates) == len(sample_data)
+    assert rates[0].date == datetime(2023, 5, 12, 8, 30)
+    assert rates[0].libDevise == "QAR"
+    assert rates[0].achatClientele == 2.5086
+    assert rates[0].moyen is None
+    assert not hasattr(rates[0], "__dict__")
+
+    virement = FXRate.from_dict(
+        {
+            "date": "2023-05-11T12:30:00",
+            "libDevise": "EUR",
+            "moyen": 10.9884,
+            "uniteDevise": 1,
+        }
+    )
+    assert virement.moyen == 10.9884
+    assert virement.achatClientele is None
+
+
+def test_bdt_points():
+    (point,) = to_records(
+        [
+            {
+                "dateEcheance": "2046-02-19",
+                "dateValeur": "2018-12-28",
+                "dateCourbe": "2019-01-02",
+                "tmp": 4.326,
+                "volume": 195.25,
+            }
+        ],
+        "courbe_BDT",
+    )
+
+    assert point == BDTPoint(
+        date(2046, 2, 19), date(2018, 12, 28), date(2019, 1, 2), 4.326, 195.25
+    )
+
+
+def test_pm_operations():
+    operation = PMOperation.from_dict(
+        {
+            "dateAdjudication": "2023-01-04",
+            "dateValeur": "2023-01-05",
+            "dateEcheance": "2023-01-12",
+            "instrument": "avances à 7 jours",
+            "mntDemande": 56990.0,
+            "mntServi": 56990.0,
+            "taux": 2.5,
+        }
+    )
+
+    assert operation.dateEcheance == date(2023, 1, 12)
+    assert operation.taux == 2.5
+
+
+@pytest.mark.parametrize(
+    "caracteristique, echeance, coupon",
+    [("16/09/2024,1.85", date(2024, 9, 16), 1.85), ("", None, None)],
+)
+def test_bt_issuances(caracteristique, echeance, coupon):
+    issuance = BTIssuance.from_dict(
+        {
+            "dateReglement": "2022-04-04T00:00:00",
+            "maturite": "2 ans",
+            "caracteristique": caracteristique,
+            "mntPropose": 1560.0,
+            "tauxPrixMin": 99.62,
+            "tauxPrixMax": 99.92,
+            "mntAdjuge": 0.0,
+            "tauxPrixlimite": 0.0,
+            "tauxPrixMoyenPondere": 0.0,
+        }
+    )
+
+    assert issuance.dateReglement == date(2022, 4, 4)
+    assert issuance.dateEcheance == echeance
+    assert issuance.coupon == coupon
+
+
+def test_bt_exchanges():
+    exchange = BTExchange.from_dict(
+        {
+            "maturite": "5 ans",
+            "dateReglement": "2023-04-25T00:00:00",
+            "dateEcheance": "2024-04-15T00:00:00",
+            "tauxNominal": 2.85,
+            "mntPropose": 855.0,
+            "mntRetenu": 855.0,
+            "maturiteRemp": "2 ans",
+            "dateEcheanceRemp": "2025-09-15T00:00:00",
+            "tauxNominallRemp": 3.9,
+            "prixMin": 99.74,
+            "prixMax": 99.75,
+            "mntRetenuRemp": 852.3,
+            "pmp": 100.42,
+        }
+    )
+
+    assert exchange.dateEcheanceRemp == date(2025, 9, 15)
+    assert exchange.pmp == 100.42
+
+
+def test_record_types_cover_endpoints():
+    from BAMapi.constants import API
+
+    assert set(RECORD_TYPES) <= set(API)
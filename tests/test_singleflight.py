@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from BAMapi.client import BAMClient
+from BAMapi.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_coalesces_threads():
+    single_flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def function():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        leader = executor.submit(single_flight.do, "key", function)
+        started.wait()
+        followers = [executor.submit(single_flight.do, "key", function) for _ in range(9)]
+
+        results = [leader.result()] + [follower.result() for follower in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+    # Once the call is over, a new call is made.
+    single_flight.do("key", function)
+    assert len(calls) == 2
+
+
+def test_single_flight_shares_errors():
+    single_flight = SingleFlight()
+    started = threading.Event()
+
+    def function():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("error")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "key", function)
+        started.wait()
+        follower = executor.submit(single_flight.do, "key", function)
+
+        for future in [leader, follower]:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_async_single_flight():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def function():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def failing():
+        raise ValueError("error")
+
+    async def main():
+        results = await asyncio.gather(
+            *(single_flight.do("key", function) for _ in range(10))
+        )
+        with pytest.raises(ValueError):
+            await single_flight.do("other", failing)
+        return results
+
+    assert asyncio.run(main()) == [1] * 10
+
+
+def test_client_coalesces_identical_requests(mock_requests_get, sample_data):
+    def get(**kwargs):
+        time.sleep(0.05)
+        return mock_requests_get
+
+    mock_requests_get.json.return_value = sample_data
+    requests.Session.get.side_effect = get
+
+    client = BAMClient()
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        results = list(
+            executor.map(
+                lambda _: client.get("key", "https://invalid_url.BAMAPI", {"a": "1"}),
+                range(20),
+            )
+        )
+
+    assert all(result == sample_data for result in results)
+    assert requests.Session.get.call_count < 20
+
+
+def test_async_single_flight_survives_leader_cancellation():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def function():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.ensure_future(single_flight.do("key", function))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do("key", function))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await follower
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 1
@@ -0,0 +1,53 @@
+import requests
+
+from BAMapi.client import BAMClient
+from BAMapi.constants import API
+from BAMapi.snapshot import FXSnapshots
+
+
+def test_fx_snapshots_lookup(sample_data):
+    snapshots = FXSnapshots()
+    queries = []
+
+    def fetch(querystring):
+        queries.append(querystring)
+        return sample_data
+
+    eur = snapshots.lookup(fetch, API["cours_BBE"], "EUR", "2023-05-12")
+    usd = snapshots.lookup(fetch, API["cours_BBE"], "USD", "2023-05-12")
+
+    assert eur == [rate for rate in sample_data if rate["libDevise"] == "EUR"]
+    assert usd == [rate for rate in sample_data if rate["libDevise"] == "USD"]
+    assert snapshots.lookup(fetch, API["cours_BBE"], "XXX", "2023-05-12") == []
+
+    # The full table is fetched once per endpoint and date.
+    assert queries == [{"libDevise": "", "date": "2023-05-12"}]
+
+    snapshots.lookup(fetch, API["cours_virement"], "EUR", "2023-05-12")
+    snapshots.lookup(fetch, API["cours_BBE"], "EUR", "2023-05-11")
+    assert len(queries) == 3
+
+    snapshots.invalidate()
+    snapshots.lookup(fetch, API["cours_BBE"], "EUR", "2023-05-12")
+    assert len(queries) == 4
+
+
+def test_client_with_fx_snapshots(mock_requests_get, sample_data):
+    mock_requests_get.json.return_value = sample_data
+
+    client = BAMClient(fx_snapshots=True)
+
+    for label in ["EUR", "USD", "CAD", "QAR"]:
+        rates = client.get("key", API["cours_BBE"], {"libDevise": label, "date": ""})
+        assert rates
+        assert all(rate["libDevise"] == label for rate in rates)
+
+    assert requests.Session.get.call_count == 1
+    assert requests.Session.get.call_args.kwargs["params"] == {
+        "libDevise": "",
+        "date": "",
+    }
+
+    # The other endpoints are left untouched.
+    client.get("key", API["courbe_BDT"], {"dateCourbe": ""})
+    assert requests.Session.get.call_count == 2
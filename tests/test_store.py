@@ -0,0 +1,189 @@
+import pytest
+
+from BAMapi.store import SyncStore
+
+
+def operation(day):
+    return {
+        "dateAdjudication": day,
+        "dateValeur": day,
+        "dateEcheance": day,
+        "instrument": "avances à 7 jours",
+        "mntDemande": 100.0,
+        "mntServi": 100.0,
+        "taux": 2.5,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SyncStore(tmp_path / "store.sqlite")
+    yield store
+    store.close()
+
+
+def test_sync_politique_monetaire(store, monkeypatch):
+    calls = []
+
+    def resultat_oprts_politique_monetaire(du, au, instrument):
+        calls.append((du, au, instrument))
+        return [operation(du), operation(au)]
+
+    monkeypatch.setattr(
+        "BAMapi.store.api.resultat_oprts_politique_monetaire",
+        resultat_oprts_politique_monetaire,
+    )
+
+    assert store.sync_politique_monetaire("2023-01-01", "2023-01-31", "avances_7j") == 2
+    assert store.watermark("oprts_de_PM", "AVANCES7J") == "2023-01-31"
+
+    # Up to date: nothing is fetched.
+    assert store.sync_politique_monetaire("2023-01-01", "2023-01-31", "AVANCES7J") == 0
+
+    # Only the gap is fetched, in a single call.
+    assert store.sync_politique_monetaire("2023-01-01", "2023-02-28", "AVANCES7J") == 2
+    assert calls == [
+        ("2023-01-01", "2023-01-31", "AVANCES7J"),
+        ("2023-02-01", "2023-02-28", "AVANCES7J"),
+    ]
+
+    records = store.records("oprts_de_PM", "AVANCES7J")
+    assert [record["dateAdjudication"] for record in records] == [
+        "2023-01-01",
+        "2023-01-31",
+        "2023-02-01",
+        "2023-02-28",
+    ]
+    february = store.records("oprts_de_PM", "AVANCES7J", "2023-02-01", "2023-02-27")
+    assert len(february) == 1
+    assert store.records("oprts_de_PM") == []
+
+
+def test_sync_watermarks(store, monkeypatch):
+    calls = []
+    published = {"2023-01-02", "2023-01-09"}
+
+    def resultat_oprts_politique_monetaire(du, au, instrument):
+        calls.append((du, au))
+        return [operation(day) for day in sorted(published) if du <= day <= au]
+
+    monkeypatch.setattr(
+        "BAMapi.store.api.resultat_oprts_politique_monetaire",
+        resultat_oprts_politique_monetaire,
+    )
+    monkeypatch.setattr("BAMapi.store._yesterday", lambda: "2023-01-15")
+
+    # Nothing published yet: no watermark is set.
+    assert store.sync_politique_monetaire("2023-01-01", "2023-01-01") == 0
+    assert store.watermarks("oprts_de_PM") is None
+
+    # The high-water mark is the last date returned, and never later than yesterday.
+    published.add("2023-01-16")
+    assert store.sync_politique_monetaire("2023-01-01", "2023-01-16") == 2
+    assert store.watermarks("oprts_de_PM") == ("2023-01-01", "2023-01-09")
+
+    # The days after it are fetched again, such as a late publication.
+    published.add("2023-01-12")
+    assert store.sync_politique_monetaire("2023-01-01", "2023-01-16") == 1
+    assert store.watermarks("oprts_de_PM") == ("2023-01-01", "2023-01-12")
+
+    # An earlier start backfills the older history.
+    published.add("2022-12-26")
+    assert store.sync_politique_monetaire("2022-12-01", "2023-01-12") == 1
+    assert store.watermarks("oprts_de_PM") == ("2022-12-01", "2023-01-12")
+    assert store.sync_politique_monetaire("2022-12-01", "2023-01-12") == 0
+
+    assert calls == [
+        ("2023-01-01", "2023-01-01"),
+        ("2023-01-01", "2023-01-16"),
+        ("2023-01-10", "2023-01-16"),
+        ("2022-12-01", "2022-12-31"),
+    ]
+    assert [record["dateAdjudication"] for record in store.records("oprts_de_PM")] == [
+        "2022-12-26",
+        "2023-01-02",
+        "2023-01-09",
+        "2023-01-12",
+    ]
+
+
+def test_sync_non_contiguous_ranges(store, monkeypatch):
+    calls = []
+
+    def resultat_oprts_politique_monetaire(du, au, instrument):
+        calls.append((du, au))
+        return [operation(du), operation(au)]
+
+    monkeypatch.setattr(
+        "BAMapi.store.api.resultat_oprts_politique_monetaire",
+        resultat_oprts_politique_monetaire,
+    )
+    monkeypatch.setattr("BAMapi.store._yesterday", lambda: "2023-03-31")
+
+    store.sync_politique_monetaire("2023-01-01", "2023-01-10")
+    # The hole between the ranges is fetched along with the later range...
+    store.sync_politique_monetaire("2023-02-01", "2023-02-10")
+    # ... and so is the one before an earlier range.
+    store.sync_politique_monetaire("2022-12-01", "2022-12-10")
+    assert store.sync_politique_monetaire("2022-12-01", "2023-02-10") == 0
+
+    assert calls == [
+        ("2023-01-01", "2023-01-10"),
+        ("2023-01-11", "2023-02-10"),
+        ("2022-12-01", "2022-12-31"),
+    ]
+    assert store.watermarks("oprts_de_PM") == ("2022-12-01", "2023-02-10")
+
+
+def test_sync_cours(store, monkeypatch, sample_data):
+    days = []
+
+    def foreign_exchange_rates_range(url, start, end, currencies, max_workers):
+        days.append((start, end))
+        for day in (start, end):
+            yield day, [dict(rate, date=day + "T08:30:00") for rate in sample_data[:2]]
+
+    monkeypatch.setattr(
+        "BAMapi.store.api._foreign_exchange_rates_range", foreign_exchange_rates_range
+    )
+
+    assert store.sync_cours("cours_BBE", "2023-05-01", "2023-05-05") == 4
+    assert store.sync_cours("cours_BBE", "2023-05-01", "2023-05-12") == 4
+    assert days == [("2023-05-01", "2023-05-05"), ("2023-05-06", "2023-05-12")]
+
+    assert store.watermark("cours_BBE") == "2023-05-12"
+    assert store.watermark("cours_virement") is None
+
+    with pytest.raises(ValueError):
+        store.sync_cours("courbe_BDT", "2023-05-01")
+
+
+def test_sync_courbe_BDT(store, monkeypatch):
+    def courbe_BDT(day):
+        if day == "2023-05-01":
+            return []
+        return [{"dateEcheance": "2030-01-01", "dateCourbe": day, "tmp": 3.0}]
+
+    monkeypatch.setattr("BAMapi.store.api.courbe_BDT", courbe_BDT)
+
+    # Friday to Tuesday: the week-end is skipped, and so is the holiday.
+    assert store.sync_courbe_BDT("2023-04-28", "2023-05-02") == 2
+    assert [point["dateCourbe"] for point in store.records("courbe_BDT")] == [
+        "2023-04-28",
+        "2023-05-02",
+    ]
+
+
+def test_sync_courbe_BDT_at_christmas(store, monkeypatch):
+    monkeypatch.setattr(
+        "BAMapi.store.api.courbe_BDT",
+        lambda day: [{"dateEcheance": "2030-01-01", "dateCourbe": day, "tmp": 3.0}],
+    )
+
+    # Unlike the exchange rates, the curves of the 25th and 26th of December are fetched.
+    assert store.sync_courbe_BDT("2023-12-22", "2023-12-26") == 3
+    assert [point["dateCourbe"] for point in store.records("courbe_BDT")] == [
+        "2023-12-22",
+        "2023-12-25",
+        "2023-12-26",
+    ]
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from BAMapi.client import BAMClient
+from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
+from BAMapi.records import PMOperation
+from BAMapi.transport import RecordingTransport, ReplayTransport, _build_response
+
+
+RATE_LIMITED = json.dumps(
+    {"statusCode": 429, "message": "Rate limit is exceeded. Try again in 0 seconds."}
+).encode()
+
+
+class FakeSession:
+    """Session answering with a scripted sequence of (status, body) per date."""
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = 0
+
+    def get(self, url, headers, params, **kwargs):
+        self.calls += 1
+        date = next(value for name, value in params.items() if name.startswith("date"))
+        status, body = self.script[date].pop(0)
+        return _build_response(url, status, {"Content-Type": "application/json"}, body)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def archive(tmp_path, sample_data):
+    path = tmp_path / "cassette.jsonl.gz"
+    payload = json.dumps(sample_data).encode()
+
+    session = FakeSession(
+        {
+            "2019-01-02": [(200, payload)],
+            "2019-01-05": [(204, b"")],
+            "2019-01-07": [(401, b'{"statusCode": 401}')],
+            "2019-01-08": [(429, RATE_LIMITED), (200, payload)],
+            "2023-01-01": [(200, json.dumps(OPERATIONS).encode())],
+        }
+    )
+
+    with RecordingTransport(path, session=session) as transport:
+        client = BAMClient(session=transport, max_retries=1, backoff_factor=0)
+
+        assert client.courbe_BDT("2019-01-02") == sample_data
+        assert client.courbe_BDT("2019-01-05") == []
+        with pytest.raises(InvalidAPIKeys):
+            client.courbe_BDT("2019-01-07")
+        assert client.courbe_BDT("2019-01-08") == sample_data
+        assert len(list(client.iter_resultat_oprts_politique_monetaire("2023-01-01"))) == 2
+
+    assert session.calls == 6
+    return path
+
+
+OPERATIONS = [
+    {
+        "dateAdjudication": "2023-01-04",
+        "dateValeur": "2023-01-05",
+        "dateEcheance": "2023-01-12",
+        "instrument": "avances à 7 jours",
+        "mntDemande": 56990.0,
+        "mntServi": 56990.0,
+        "taux": 2.5,
+    }
+] * 2
+
+
+def test_replay(archive, sample_data):
+    transport = ReplayTransport(archive)
+    client = BAMClient(session=transport, max_retries=1, backoff_factor=0)
+
+    assert len(transport) == 6
+
+    assert client.courbe_BDT("2019-01-02") == sample_data
+    # Replayed as many times as needed.
+    assert client.courbe_BDT("2019-01-02") == sample_data
+
+    assert client.courbe_BDT("2019-01-05") == []
+
+    with pytest.raises(InvalidAPIKeys):
+        client.courbe_BDT("2019-01-07")
+
+    # The recorded 429 is retried, then the recorded 200 is served.
+    assert client.courbe_BDT("2019-01-08") == sample_data
+
+    operations = list(
+        client.iter_resultat_oprts_politique_monetaire(
+            "2023-01-01", record_type=PMOperation
+        )
+    )
+    assert [operation.taux for operation in operations] == [2.5, 2.5]
+
+
+def test_replay_rate_limit(archive):
+    client = BAMClient(session=ReplayTransport(archive), max_retries=0)
+
+    with pytest.raises(RateLimitExceededError) as e:
+        client.courbe_BDT("2019-01-08")
+
+    assert e.value.retry_after == 0
+
+
+def test_replay_missing_exchange(archive):
+    client = BAMClient(session=ReplayTransport(archive))
+
+    with pytest.raises(LookupError):
+        client.courbe_BDT("2020-01-02")
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from BAMapi.exceptions import InvalidAPIKeys, RateLimitExceededError
@@ -7,6 +9,10 @@ from BAMapi.utils import (
     _is_valid_date_string,
     _check_currency_label,
     _search_instruments_const,
+    _business_days,
+    _parse_retry_after,
+    _date_windows,
+    _iter_json_array,
 )
 
 
@@ -30,6 +36,26 @@ def test_base_bam_api_get_request_raises_errors(
         _base_bam_api_get_request(*psudo_args_base_req)
 
 
+def test_base_bam_api_get_request_no_content(mock_requests_get, psudo_args_base_req):
+    mock_requests_get.status_code = 204
+
+    assert _base_bam_api_get_request(*psudo_args_base_req) == []
+    mock_requests_get.json.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "header, message, retry_after",
+    [
+        ("7", "Rate limit is exceeded. Try again in 5 seconds.", 7),
+        (None, "Rate limit is exceeded. Try again in 5 seconds.", 5),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", "Try again in 1 second.", 1),
+        (None, "Rate limit is exceeded.", None),
+    ],
+)
+def test_parse_retry_after(header, message, retry_after):
+    assert _parse_retry_after(header, message) == retry_after
+
+
 @pytest.mark.parametrize(
     "date, date_format",
     [
@@ -94,3 +120,66 @@ def test_search_instruments_const_empty_string(search_key):
 def test_search_instruments_const_error(search_key):
     with pytest.raises(ValueError):
         _search_instruments_const(search_key)
+
+
+def test_business_days():
+    assert _business_days("2022-12-22", "2022-12-28") == [
+        "2022-12-22",
+        "2022-12-23",
+        "2022-12-27",
+        "2022-12-28",
+    ]
+    # The BDT curves are published on the 25th and 26th of December.
+    assert _business_days("2023-12-22", "2023-12-27", fx=False) == [
+        "2023-12-22",
+        "2023-12-25",
+        "2023-12-26",
+        "2023-12-27",
+    ]
+
+
+def test_date_windows():
+    assert _date_windows("2023-01-01", "2023-01-25", 10) == [
+        ("2023-01-01", "2023-01-10"),
+        ("2023-01-11", "2023-01-20"),
+        ("2023-01-21", "2023-01-25"),
+    ]
+    assert _date_windows("2023-01-01", "2023-01-01", 10) == [("2023-01-01", "2023-01-01")]
+
+    with pytest.raises(ValueError):
+        _date_windows("2023-01-01", "2023-01-25", 0)
+    with pytest.raises(ValueError):
+        _date_windows("2023-01-25", "2023-01-01", 10)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_iter_json_array(sample_data, chunk_size):
+    body = json.dumps(sample_data + [12345, "é", [1, 2]], indent=1).encode()
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    assert list(_iter_json_array(chunks)) == sample_data + [12345, "é", [1, 2]]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"[1.5]",
+        b"[1e5, -2.5E-3]",
+        b'[true, null, "a\\"b", {"c": [1.25]}]',
+        json.dumps([12.5, 1e-7, -3, "\u00e9", {"d": 0.125}], ensure_ascii=False).encode(),
+    ],
+)
+def test_iter_json_array_split_anywhere(body):
+    for i in range(len(body) + 1):
+        assert list(_iter_json_array([body[:i], body[i:]])) == json.loads(body)
+
+
+@pytest.mark.parametrize("body", [b"", b" [ ] "])
+def test_iter_json_array_empty(body):
+    assert list(_iter_json_array([body])) == []
+
+
+@pytest.mark.parametrize("body", [b'{"a": 1}', b'[{"a": 1}, {"a"', b"[1, 2"])
+def test_iter_json_array_errors(body):
+    with pytest.raises(ValueError):
+        list(_iter_json_array([body]))